@@ -55,7 +55,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.WhiteNoiseMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -70,8 +73,16 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Parse each template once per process. Django picks this by default;
+            # it's spelled out so adding a loader doesn't silently drop the cache.
+            # In development templates still reload when they change.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -90,11 +101,140 @@ WSGI_APPLICATION = 'ayush_solar.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'core.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep connections open between requests (seconds; 0 closes after each request).
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Applied to every new SQLite connection by core.db.configure_sqlite.
+# WAL keeps readers unblocked while a lead is being inserted; synchronous=NORMAL
+# is durable across application crashes in WAL mode (only an OS crash or power
+# loss can drop the last commits).
+# The journal mode is stored in the database file itself, so WAL rewrites the
+# header of the committed db.sqlite3 and adds -wal/-shm files next to it. It is
+# therefore only the default outside DEBUG; set SQLITE_JOURNAL_MODE=WAL to opt in.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'DELETE' if DEBUG else 'WAL'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000')),
+    'cache_size': -int(os.getenv('SQLITE_CACHE_SIZE_KB', '20000')),
+    'mmap_size': int(os.getenv('SQLITE_MMAP_SIZE', str(128 * 1024 * 1024))),
+    'temp_store': 'MEMORY',
+}
+
+# How core.backends.sqlite3 begins transactions. IMMEDIATE takes the write
+# lock at BEGIN so concurrent form posts queue on busy_timeout; with DEFERRED
+# they can fail with "database is locked" under load.
+SQLITE_TRANSACTION_MODE = os.getenv('SQLITE_TRANSACTION_MODE', 'IMMEDIATE').upper()
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+# CACHE_BACKEND=locmem suits a single process; use CACHE_BACKEND=file so that
+# every gunicorn worker shares (and invalidates) the same rendered pages.
+
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'locmem').lower()
+
+if CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.getenv('CACHE_LOCATION', str(BASE_DIR / '.cache')),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': os.getenv('CACHE_LOCATION', 'ayush-solar'),
+        }
+    }
+
+# Rendered landing page lifetime in seconds; FAQ edits invalidate it immediately.
+HOME_PAGE_CACHE_TIMEOUT = int(os.getenv('HOME_PAGE_CACHE_TIMEOUT', '3600'))
+
+# Bumped on every deploy so cached pages never outlive the templates they came from.
+RELEASE_VERSION = os.getenv('RELEASE_VERSION', '1')
+
+# core.middleware.CompressionMiddleware: minify text/html and compress text
+# responses with brotli (when installed) or gzip, whichever the client accepts.
+# Bodies with an ETag are cached per encoding, so each page version is only
+# minified and compressed once.
+HTML_MINIFY = os.getenv('HTML_MINIFY', 'True').lower() in ('true', '1', 't')
+COMPRESS_RESPONSES = os.getenv('COMPRESS_RESPONSES', 'True').lower() in ('true', '1', 't')
+BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', '5'))
+
+# Cache the rendered landing-page partials ({% cached_include %}, {% section %})
+# once per RELEASE_VERSION; _faqs.html also keys on the FAQ data. Off by
+# default with DEBUG so template edits show up without bumping the release.
+TEMPLATE_FRAGMENT_CACHE = os.getenv('TEMPLATE_FRAGMENT_CACHE', str(not DEBUG)).lower() in ('true', '1', 't')
+
+# Pre-rendered landing page (manage.py export_home). With STATIC_EXPORT_ON_CHANGE
+# enabled, FAQ edits re-export the page as soon as they are committed.
+STATIC_EXPORT_ROOT = Path(os.getenv('STATIC_EXPORT_ROOT', str(BASE_DIR / 'export')))
+STATIC_EXPORT_ON_CHANGE = os.getenv('STATIC_EXPORT_ON_CHANGE', 'False').lower() in ('true', '1', 't')
+
+
+# Lead notifications are queued in the database and delivered by
+# `manage.py process_notifications`, so submitting the form never waits on them.
+LEAD_NOTIFIERS = [n.strip() for n in os.getenv('LEAD_NOTIFIERS', 'core.notifications.ConsoleNotifier').split(',') if n.strip()]
+LEAD_NOTIFICATION_FILE = os.getenv('LEAD_NOTIFICATION_FILE', str(BASE_DIR / 'lead_notifications.jsonl'))
+NOTIFICATION_MAX_ATTEMPTS = int(os.getenv('NOTIFICATION_MAX_ATTEMPTS', '5'))
+NOTIFICATION_RETRY_BASE_SECONDS = int(os.getenv('NOTIFICATION_RETRY_BASE_SECONDS', '30'))
+NOTIFICATION_STALE_SECONDS = int(os.getenv('NOTIFICATION_STALE_SECONDS', '600'))
+
+# LEAD_INGEST_MODE=batched group-commits concurrent form posts into one
+# bulk_create per window (LEAD_BATCH_MAX_SIZE rows or LEAD_BATCH_MAX_WAIT_MS).
+# A lead is always committed before its request gets a success response.
+# Only useful with threaded workers (gunicorn --threads) or ASGI.
+LEAD_INGEST_MODE = os.getenv('LEAD_INGEST_MODE', 'direct').lower()
+LEAD_BATCH_MAX_SIZE = int(os.getenv('LEAD_BATCH_MAX_SIZE', '50'))
+LEAD_BATCH_MAX_WAIT_MS = int(os.getenv('LEAD_BATCH_MAX_WAIT_MS', '20'))
+
+# A submission with the same mobile number and PIN as a lead from the last
+# LEAD_DEDUP_WINDOW_SECONDS returns that lead instead of creating another one
+# (and another round of notifications). 0 disables deduplication.
+LEAD_DEDUP_WINDOW_SECONDS = int(os.getenv('LEAD_DEDUP_WINDOW_SECONDS', str(24 * 60 * 60)))
+LEAD_DEDUP_CACHE_SIZE = int(os.getenv('LEAD_DEDUP_CACHE_SIZE', '10000'))
+
+# Token-bucket limits for /submit-consultation/ as "<burst>/<seconds>" (the
+# bucket refills at burst/seconds tokens per second); empty disables a limit.
+# RATELIMIT_BACKEND=memory is per process; use cache with CACHE_BACKEND=file
+# to share buckets between gunicorn workers.
+RATELIMIT_BACKEND = os.getenv('RATELIMIT_BACKEND', 'memory')
+RATELIMIT_IP = os.getenv('RATELIMIT_IP', '10/600')
+RATELIMIT_MOBILE = os.getenv('RATELIMIT_MOBILE', '5/3600')
+# Proxies in front of the app that append to X-Forwarded-For (1 on Render).
+RATELIMIT_TRUSTED_PROXIES = int(os.getenv('RATELIMIT_TRUSTED_PROXIES', '1'))
+
+
+# FAQ_LAZY_LOAD=True renders only the first page of General FAQs into the
+# landing page; other tabs and further pages come from /faqs/<category>/.
+FAQ_LAZY_LOAD = os.getenv('FAQ_LAZY_LOAD', 'False').lower() in ('true', '1', 't')
+FAQ_PAGE_SIZE = int(os.getenv('FAQ_PAGE_SIZE', '10'))
+
+# ASYNC_VIEWS=True routes the landing page and the consultation form to
+# native async views. Only worth it under ASGI (ayush_solar/asgi.py, e.g.
+# uvicorn); under WSGI each async view runs in its own event loop.
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'False').lower() in ('true', '1', 't')
+
+# Solar calculator API (core/calculator.py)
+CALCULATOR_GRID_PATH = BASE_DIR / 'static' / 'build' / 'calculator' / 'grid.json'
+CALCULATOR_MAX_BATCH = int(os.getenv('CALCULATOR_MAX_BATCH', '10000'))
+# Upper limits for one input: monthly bill in ₹ and roof area in sq ft.
+CALCULATOR_MAX_BILL = float(os.getenv('CALCULATOR_MAX_BILL', '1000000'))
+CALCULATOR_MAX_AREA = float(os.getenv('CALCULATOR_MAX_AREA', '1000000'))
+# An admin edit bumps a version token in the cache, which only reaches other
+# gunicorn workers with a shared cache (CACHE_BACKEND=file). So each worker
+# also compares the rule sets' latest updated_at every RULES_RECHECK_SECONDS.
+RULES_RECHECK_SECONDS = int(os.getenv('RULES_RECHECK_SECONDS', '30'))
+
+# Per-view latency, query, template and response-size metrics, served to
+# staff at /metrics/ in the Prometheus text format (core/metrics.py).
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() in ('true', '1', 't')
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -134,6 +274,38 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Outside DEBUG, `collectstatic` writes content-hashed copies of every file plus
+# .gz/.br variants, and WhiteNoise serves the hashed names with a far-future,
+# immutable Cache-Control. Run build_images/build_css before collectstatic.
+STATIC_MANIFEST = os.getenv('STATIC_MANIFEST', str(not DEBUG)).lower() in ('true', '1', 't')
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': (
+            'whitenoise.storage.CompressedManifestStaticFilesStorage' if STATIC_MANIFEST
+            else 'django.contrib.staticfiles.storage.StaticFilesStorage'
+        ),
+    },
+}
+
+# Output of `manage.py build_images`, read by the {% picture %} template tag.
+IMAGE_BUILD_DIR = BASE_DIR / 'static' / 'build' / 'images'
+IMAGE_VARIANT_WIDTHS = [64, 160, 320, 640, 960, 1280]
+
+# TAILWIND_MODE=cdn compiles styles in the browser (handy while editing templates);
+# TAILWIND_MODE=build serves the purged stylesheet written by `manage.py build_css`.
+TAILWIND_MODE = os.getenv('TAILWIND_MODE', 'cdn').lower()
+TAILWIND_CLI = os.getenv('TAILWIND_CLI', 'tailwindcss')
+CSS_BUILD_DIR = BASE_DIR / 'static' / 'build' / 'css'
+
+# Render only the navbar/hero inline (with critical CSS when TAILWIND_MODE=build)
+# and fetch the remaining sections from /sections/<name>/ as they scroll into view.
+DEFER_BELOW_FOLD = os.getenv('DEFER_BELOW_FOLD', 'False').lower() in ('true', '1', 't')
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
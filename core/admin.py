@@ -1,12 +1,73 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .leads import search_leads
+from .models import (
+    ConsultationRequest, NotificationJob, GeneralFAQ, SubsidyFAQ, TechnicalFAQ, InstallationFAQ,
+    SubsidySlab, TariffRuleSet,
+)
+
+
+class EstimatedCountPaginator(Paginator):
+    """Skip the full-table COUNT(*) on unfiltered changelists.
+
+    MAX(id) is a single index lookup; it over-counts by the number of deleted
+    rows, which only matters on the last page. Filtered lists use the exact
+    (indexed) count.
+    """
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is not None and not query.where:
+            return self.object_list.model._default_manager.using(self.object_list.db).aggregate(
+                estimate=Max('pk'),
+            )['estimate'] or 0
+        return super().count
 
-from .models import ConsultationRequest, GeneralFAQ, SubsidyFAQ, TechnicalFAQ, InstallationFAQ
 
 @admin.register(ConsultationRequest)
 class ConsultationRequestAdmin(admin.ModelAdmin):
     list_display = ('full_name', 'mobile_number', 'district', 'created_at')
     search_fields = ('full_name', 'mobile_number')
+    search_help_text = "Name (any words, prefixes match) or mobile number (full or leading digits)."
     list_filter = ('district', 'created_at')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        results = search_leads(queryset, search_term)
+        if results is None:
+            return super().get_search_results(request, queryset, search_term)
+        return results, False
+
+@admin.register(NotificationJob)
+class NotificationJobAdmin(admin.ModelAdmin):
+    list_display = ('event', 'backend', 'status', 'attempts', 'run_after', 'created_at')
+    list_filter = ('status', 'event', 'backend')
+    readonly_fields = ('payload', 'attempts', 'last_error', 'created_at', 'updated_at')
+    actions = ['retry_jobs']
+
+    @admin.action(description="Retry selected jobs now")
+    def retry_jobs(self, request, queryset):
+        updated = queryset.exclude(status=NotificationJob.DONE).update(
+            status=NotificationJob.PENDING, attempts=0, run_after=timezone.now(),
+        )
+        self.message_user(request, f"{updated} job(s) queued for retry.")
+
+class SubsidySlabInline(admin.TabularInline):
+    model = SubsidySlab
+    extra = 0
+
+@admin.register(TariffRuleSet)
+class TariffRuleSetAdmin(admin.ModelAdmin):
+    list_display = ('name', 'district', 'discom', 'tariff', 'cost_per_kw', 'is_active', 'updated_at')
+    list_filter = ('is_active',)
+    search_fields = ('name', 'district', 'discom')
+    inlines = [SubsidySlabInline]
 
 @admin.register(GeneralFAQ)
 class GeneralFAQAdmin(admin.ModelAdmin):
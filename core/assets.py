@@ -0,0 +1,153 @@
+import hashlib
+import json
+import logging
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.templatetags.static import static
+
+logger = logging.getLogger(__name__)
+
+TAILWIND_DIRECTIVES = "@tailwind base;\n@tailwind components;\n@tailwind utilities;\n"
+
+_manifest_cache = {'key': None, 'data': {}}
+_critical_cache = {'key': None, 'css': ''}
+
+
+def css_manifest_path():
+    return Path(settings.CSS_BUILD_DIR) / 'manifest.json'
+
+
+def load_css_manifest():
+    """Return {'site.css': 'build/css/site.<hash>.css'}, re-reading only on change."""
+    path = css_manifest_path()
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return {}
+    if _manifest_cache['key'] != (path, mtime):
+        _manifest_cache['data'] = json.loads(path.read_text(encoding='utf-8'))
+        _manifest_cache['key'] = (path, mtime)
+    return _manifest_cache['data']
+
+
+def site_css_url():
+    """URL of the built stylesheet, or None when base.html should use the Tailwind CDN."""
+    if settings.TAILWIND_MODE != 'build':
+        return None
+    built = load_css_manifest().get('site.css')
+    if built is None:
+        logger.warning("TAILWIND_MODE is 'build' but %s is missing; run manage.py build_css.", css_manifest_path())
+        return None
+    return static(built)
+
+
+def tailwind_input(custom_css):
+    """Tailwind entry point: the framework layers followed by our own styles."""
+    return TAILWIND_DIRECTIVES + "\n" + custom_css
+
+
+def write_hashed_css(css, output_dir):
+    """Write css as site.<hash>.css and point the manifest at it. Returns the path."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    data = css.encode('utf-8')
+    path = output_dir / f"site.{hashlib.md5(data).hexdigest()[:12]}.css"
+    path.write_bytes(data)
+    static_root = Path(settings.STATICFILES_DIRS[0])
+    manifest = {'site.css': path.relative_to(static_root).as_posix()}
+    (output_dir / 'manifest.json').write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+    return path
+
+
+# A CSS identifier, escapes included: hex (\32 or \000032 plus one optional
+# space) and literal (\[, \#, \:).
+IDENT = r'(?:\\[0-9a-fA-F]{1,6}[ \t\r\n\f]?|\\[^\r\n\f0-9a-fA-F]|[\w-])+'
+# Class/id selectors. Quoted attribute values and stray escapes (\. or \#
+# outside an identifier) are matched only to be skipped.
+SELECTOR_RE = re.compile(r'([.#])(' + IDENT + r')|"[^"]*"|\'[^\']*\'|\\.')
+ESCAPE_RE = re.compile(r'\\([0-9a-fA-F]{1,6})[ \t\r\n\f]?|\\(.)', re.S)
+HTML_CLASS_RE = re.compile(r'class="([^"]*)"')
+HTML_ID_RE = re.compile(r'id="([^"]*)"')
+
+
+def html_tokens(html):
+    """Class names and ids used by an HTML fragment."""
+    classes = {c for attr in HTML_CLASS_RE.findall(html) for c in attr.split()}
+    ids = set(HTML_ID_RE.findall(html))
+    return classes, ids
+
+
+def _split_blocks(css):
+    """Yield (prelude, body) for each top-level block, matching nested braces."""
+    depth, start, prelude = 0, 0, None
+    for i, char in enumerate(css):
+        if char == '{':
+            if depth == 0:
+                # Drop any brace-less statements (@import ...;) that preceded the block.
+                prelude, start = css[start:i].rsplit(';', 1)[-1].strip(), i + 1
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                yield prelude, css[start:i]
+                start = i + 1
+
+
+def _unescape(ident):
+    """Decode CSS escapes, e.g. '\\32xl\\:p-4' -> '2xl:p-4'."""
+    return ESCAPE_RE.sub(_unescape_match, ident)
+
+
+def _unescape_match(match):
+    if match.group(1) is None:
+        return match.group(2)
+    code = int(match.group(1), 16)
+    return chr(code) if 0 < code <= 0x10FFFF else '\ufffd'
+
+
+def _selector_matches(selector, classes, ids):
+    needed_classes, needed_ids = set(), set()
+    for match in SELECTOR_RE.finditer(selector):
+        kind, name = match.groups()
+        if kind == '.':
+            needed_classes.add(_unescape(name))
+        elif kind == '#':
+            needed_ids.add(_unescape(name))
+    return needed_classes <= classes and needed_ids <= ids
+
+
+def extract_critical_css(css, classes, ids):
+    """Keep only the rules whose selectors can match the given classes and ids.
+
+    Rules without class or id selectors (resets, element styles), @font-face
+    and @keyframes are always kept; @media/@supports blocks are filtered
+    recursively and dropped when empty.
+    """
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    # Statements such as @charset/@import never contain braces before their semicolon.
+    output = re.findall(r'@(?:charset|import)[^;{]*;', css)
+    for prelude, body in _split_blocks(css):
+        if prelude.startswith(('@media', '@supports')):
+            inner = extract_critical_css(body, classes, ids)
+            if inner:
+                output.append(f"{prelude}{{{inner}}}")
+        elif prelude.startswith('@'):
+            output.append(f"{prelude}{{{body}}}")
+        elif any(_selector_matches(s, classes, ids) for s in prelude.split(',')):
+            output.append(f"{prelude}{{{body.strip()}}}")
+    return ''.join(output)
+
+
+def critical_css():
+    """Contents of the critical stylesheet written by build_css, or ''."""
+    path = Path(settings.CSS_BUILD_DIR) / 'critical.css'
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return ''
+    if _critical_cache['key'] != (path, mtime):
+        _critical_cache['css'] = path.read_text(encoding='utf-8')
+        _critical_cache['key'] = (path, mtime)
+    return _critical_cache['css']
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """Django's SQLite backend, starting transactions with settings.SQLITE_TRANSACTION_MODE.
+
+    A plain (DEFERRED) BEGIN only asks for the write lock at the first
+    INSERT. If another connection committed in between, SQLite fails that
+    statement with "database is locked" at once instead of honouring
+    busy_timeout. BEGIN IMMEDIATE takes the lock up front, so concurrent
+    writers wait their turn. Django 5.1 offers this as OPTIONS['transaction_mode'].
+
+    Read-only atomic blocks (the admin wraps change views in one, GETs
+    included) take the lock too and hold off writers until they finish.
+    Page and API reads run in autocommit and are unaffected.
+    """
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f"BEGIN {settings.SQLITE_TRANSACTION_MODE}")
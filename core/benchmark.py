@@ -0,0 +1,251 @@
+"""Throughput and latency benchmarks for the landing page and the consultation form.
+
+Requests go either through Django's test client (no sockets) or through a
+local threaded WSGI server standing in for gunicorn. `manage.py benchmark`
+runs them against a throwaway database seeded with synthetic FAQs and leads,
+so the numbers are repeatable and real data is never touched.
+"""
+import http.client
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from http.cookies import SimpleCookie
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from urllib.parse import urlencode
+
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.core.wsgi import get_wsgi_application
+from django.db import connection, connections
+from django.test import Client
+from django.urls import reverse
+
+from .models import FAQ, ConsultationRequest
+
+ENDPOINTS = ('home', 'submit_consultation')
+MODES = ('client', 'server')
+PERCENTILES = (50, 95, 99)
+
+DISTRICTS = ('Kolkata', 'Howrah', 'Hooghly', 'Nadia', 'Bardhaman', 'Siliguri')
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(latencies, errors, wall_seconds):
+    """Requests/sec and latency percentiles (in ms) for one endpoint run."""
+    latencies = sorted(latencies)
+    summary = {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / wall_seconds, 1) if wall_seconds else 0.0,
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+    }
+    for pct in PERCENTILES:
+        summary[f'p{pct}_ms'] = round(percentile(latencies, pct) * 1000, 3)
+    summary['max_ms'] = round(latencies[-1] * 1000, 3) if latencies else 0.0
+    return summary
+
+
+def seed(faqs, leads, batch_size=1000):
+    """Insert `faqs` active FAQs spread over every category and `leads` consultation requests."""
+    categories = [value for value, _ in FAQ.CATEGORY_CHOICES]
+    FAQ.objects.bulk_create([
+        FAQ(
+            category=categories[i % len(categories)],
+            question=f"Benchmark question {i} about rooftop solar?",
+            answer=f"Benchmark answer {i}. " + "Net metering, subsidy and installation details. " * 4,
+        )
+        for i in range(faqs)
+    ], batch_size=batch_size)
+    for start in range(0, leads, batch_size):
+        ConsultationRequest.objects.bulk_create([
+            ConsultationRequest(
+                full_name=f"Seed Lead {i}", mobile_number=f"8{i:09d}", district=DISTRICTS[i % len(DISTRICTS)],
+                pin_code=f"{700001 + i % 1000}", message="Seeded for benchmarking",
+            )
+            for i in range(start, min(start + batch_size, leads))
+        ])
+
+
+@contextmanager
+def benchmark_database():
+    """Create a migrated, empty SQLite test database in a temp dir and remove it afterwards."""
+    with TemporaryDirectory() as tmp:
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        previous = test_settings.get('NAME')
+        test_settings['NAME'] = str(Path(tmp) / 'benchmark.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            yield
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            test_settings['NAME'] = previous
+
+
+class LeadFactory:
+    """Unique, valid form submissions, so duplicate detection never short-circuits a post."""
+
+    def __init__(self):
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            i = next(self._ids)
+        return {
+            'full_name': f"Benchmark Lead {i}", 'mobile_number': f"9{i:09d}",
+            'district': DISTRICTS[i % len(DISTRICTS)], 'pin_code': f"{711001 + i % 1000}",
+            'message': "Load test",
+        }
+
+
+class ClientSession:
+    """One simulated visitor using the in-process test client."""
+
+    def __init__(self):
+        self.client = Client()
+
+    def get(self, path):
+        return self.client.get(path).status_code
+
+    def post(self, path, data):
+        return self.client.post(path, data).status_code
+
+    def close(self):
+        connections.close_all()  # Only closes the calling thread's connections.
+
+
+class HTTPSession:
+    """One simulated visitor talking HTTP to the local server, with a CSRF cookie like the browser."""
+
+    def __init__(self, host, port):
+        self.host, self.port = host, port
+        self.cookies = SimpleCookie()
+        self.get(reverse('core:csrf'))
+
+    def _request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{k}={m.value}' for k, m in self.cookies.items())
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            for header in response.headers.get_all('Set-Cookie') or ():
+                self.cookies.load(header)
+            return response.status
+        finally:
+            conn.close()
+
+    def get(self, path):
+        return self._request('GET', path)
+
+    def post(self, path, data):
+        token = self.cookies['csrftoken'].value if 'csrftoken' in self.cookies else ''
+        return self._request('POST', path, body=urlencode(data), headers={
+            'Content-Type': 'application/x-www-form-urlencoded', 'X-CSRFToken': token,
+        })
+
+    def close(self):
+        pass
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def local_server():
+    """Serve the WSGI app on an ephemeral loopback port from a background thread; yields (host, port)."""
+    server = ThreadedWSGIServer(('127.0.0.1', 0), QuietRequestHandler)
+    server.set_app(get_wsgi_application())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.server_address[:2]
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def _send(session, endpoint, make_lead):
+    if endpoint == 'home':
+        return session.get(reverse('core:home'))
+    return session.post(reverse('core:submit_consultation'), make_lead())
+
+
+def run_endpoint(make_session, endpoint, requests, concurrency=1, warmup=0):
+    """Send `requests` requests to `endpoint` from `concurrency` sessions and summarize them.
+
+    With concurrency=1 everything runs in the calling thread. Any response
+    other than 200 counts as an error; its latency is still recorded.
+    """
+    if endpoint not in ENDPOINTS:
+        raise ValueError(f"Unknown endpoint {endpoint!r}; choose from {', '.join(ENDPOINTS)}.")
+    make_lead = LeadFactory()
+    session = make_session()
+    for _ in range(warmup):
+        _send(session, endpoint, make_lead)
+
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+
+    def worker(count, session):
+        local, failed = [], 0
+        for _ in range(count):
+            start = time.perf_counter()
+            status = _send(session, endpoint, make_lead)
+            local.append(time.perf_counter() - start)
+            failed += status != 200
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    concurrency = max(1, min(concurrency, requests))
+    shares = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+    if concurrency == 1:
+        start = time.perf_counter()
+        worker(shares[0], session)
+        return summarize(latencies, errors[0], time.perf_counter() - start)
+
+    def threaded_worker(count, session):
+        try:
+            worker(count, session)
+        finally:
+            session.close()  # This thread's DB connections.
+
+    sessions = [make_session() for _ in shares]
+    threads = [threading.Thread(target=threaded_worker, args=(count, s)) for count, s in zip(shares, sessions)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, errors[0], time.perf_counter() - start)
+
+
+def compare(results, baseline):
+    """Percent change per endpoint for rps and latency percentiles; positive means worse."""
+    changes = {}
+    for endpoint, current in results.items():
+        before = baseline.get(endpoint)
+        if not before:
+            continue
+        changes[endpoint] = {}
+        for key in ('rps',) + tuple(f'p{pct}_ms' for pct in PERCENTILES):
+            if not before.get(key):
+                continue
+            delta = (current[key] - before[key]) / before[key] * 100
+            changes[endpoint][key] = round(-delta if key == 'rps' else delta, 1)
+    return changes
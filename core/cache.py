@@ -0,0 +1,96 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from .models import FAQ
+
+HOME_PAGE_KEY = 'page:home'
+FAQ_STATE_KEY = 'faq:state'
+RULES_VERSION_KEY = 'rules:version'
+
+
+def _versioned(key):
+    """Namespace a cache key with the current release."""
+    return f"{key}:{settings.RELEASE_VERSION}"
+
+
+def get_cached_page(key):
+    """Return the cached HTML for a page, or None on a miss."""
+    return cache.get(_versioned(key))
+
+
+def set_cached_page(key, content):
+    """Store rendered HTML for a page."""
+    cache.set(_versioned(key), content, settings.HOME_PAGE_CACHE_TIMEOUT)
+
+
+async def aget_cached_page(key):
+    return await cache.aget(_versioned(key))
+
+
+async def aset_cached_page(key, content):
+    await cache.aset(_versioned(key), content, settings.HOME_PAGE_CACHE_TIMEOUT)
+
+
+def section_key(name):
+    """Cache key for a below-the-fold fragment."""
+    return f'section:{name}'
+
+
+def variant_key(path, etag, encoding):
+    """Cache key for a minified/compressed response body; the ETag changes with the content."""
+    return f'variant:{path}:{etag}:{encoding}'
+
+
+def fragment_key(template_name, version=''):
+    """Cache key for a partial rendered by {% cached_include %}; `version` identifies its data."""
+    return f'fragment:{template_name}:{version}'
+
+
+def get_faq_state():
+    """Return {'count', 'last_modified'} for all FAQ rows.
+
+    Computed with one aggregate query and cached until the next FAQ edit, so
+    conditional GETs can be answered without touching the database.
+    """
+    state = cache.get(_versioned(FAQ_STATE_KEY))
+    if state is None:
+        aggregate = FAQ.objects.aggregate(count=Count('id'), last_modified=Max('updated_at'))
+        state = {'count': aggregate['count'], 'last_modified': aggregate['last_modified']}
+        cache.set(_versioned(FAQ_STATE_KEY), state, settings.HOME_PAGE_CACHE_TIMEOUT)
+    return state
+
+
+async def aget_faq_state():
+    """get_faq_state() for async views."""
+    state = await cache.aget(_versioned(FAQ_STATE_KEY))
+    if state is None:
+        aggregate = await FAQ.objects.aaggregate(count=Count('id'), last_modified=Max('updated_at'))
+        state = {'count': aggregate['count'], 'last_modified': aggregate['last_modified']}
+        await cache.aset(_versioned(FAQ_STATE_KEY), state, settings.HOME_PAGE_CACHE_TIMEOUT)
+    return state
+
+
+def invalidate_faq_caches():
+    """Drop everything derived from FAQ rows: the landing page, its FAQ fragment and the FAQ state."""
+    cache.delete_many([_versioned(key) for key in (HOME_PAGE_KEY, section_key('faqs'), FAQ_STATE_KEY)])
+
+
+def get_rules_version():
+    """Token that changes whenever tariff/subsidy rules are edited.
+
+    Kept in the shared cache so every worker notices an admin edit and
+    recompiles its in-memory rules.
+    """
+    key = _versioned(RULES_VERSION_KEY)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def bump_rules_version():
+    cache.set(_versioned(RULES_VERSION_KEY), uuid.uuid4().hex, None)
@@ -0,0 +1,163 @@
+"""Rooftop solar sizing, subsidy and payback, vectorized over many (bill, area) inputs.
+
+Mirrors calculateSolar() in static/js/scripts.js, whose constants match
+rules.DEFAULT_RULES; tariffs and subsidies per district come from core.rules.
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+from django.conf import settings
+
+from .rules import DEFAULT_RULES, get_rule_book, normalize_district
+
+# The calculator sliders in templates/partials/_calculator.html: (min, max, step)
+BILL_RANGE = (500, 10000, 100)
+AREA_RANGE = (100, 2000, 50)
+
+FIELDS = ('capacity_kw', 'subsidy', 'total_cost', 'investment', 'yearly_savings', 'recovery_years')
+
+
+def recommended_kw(bill, area, rules=DEFAULT_RULES):
+    """System size for monthly bill(s) and roof area(s): consumption-based, capped by the roof, at least 1 kW."""
+    bill, area = np.broadcast_arrays(np.asarray(bill, dtype=float), np.asarray(area, dtype=float))
+    # floor(x + 0.5) rounds halves up like Math.round (np.round rounds half to even).
+    required = np.floor(bill / rules.tariff / rules.generation_per_kw + 0.5)
+    max_by_roof = np.floor(area / rules.area_per_kw)
+    return np.maximum(np.minimum(required, max_by_roof), 1).astype(np.int64)
+
+
+def outcomes_for_kw(kw, rules=DEFAULT_RULES):
+    """Subsidy, cost and payback columns for system size(s) in kW."""
+    kw = np.asarray(kw, dtype=np.int64)
+    subsidy = rules.subsidy(kw)
+    total_cost = kw * rules.cost_per_kw
+    investment = total_cost - subsidy
+    yearly_savings = kw * rules.generation_per_kw * rules.tariff * 12
+    return {
+        'capacity_kw': kw,
+        'subsidy': subsidy,
+        'total_cost': total_cost,
+        'investment': investment,
+        'yearly_savings': yearly_savings,
+        'recovery_years': np.round(investment / yearly_savings, 1),
+    }
+
+
+def calculate(bill, area, rules=DEFAULT_RULES):
+    """Return a dict of FIELDS -> NumPy arrays for broadcastable bill/area inputs."""
+    return outcomes_for_kw(recommended_kw(bill, area, rules), rules)
+
+
+def calculate_by_district(bills, areas, districts, book=None):
+    """Like calculate(), but each input uses its own district's rules (one vectorized pass per district)."""
+    book = book or get_rule_book()
+    districts = np.array([normalize_district(d) for d in districts], dtype=object)
+    columns = None
+    for district in set(districts.tolist()):
+        mask = districts == district
+        result = calculate(bills[mask], areas[mask], book.for_district(district))
+        if columns is None:
+            columns = {field: np.empty(len(bills), dtype=values.dtype) for field, values in result.items()}
+        for field, values in result.items():
+            columns[field][mask] = values
+    return columns
+
+
+def as_records(columns):
+    """Columns of arrays -> list of plain-Python dicts, ready for JSON."""
+    lists = [np.atleast_1d(columns[field]).tolist() for field in FIELDS]
+    return [dict(zip(FIELDS, row)) for row in zip(*lists)]
+
+
+def slider_values(value_range):
+    start, stop, step = value_range
+    return np.arange(start, stop + step, step)
+
+
+def build_grid(rules=None):
+    """Precompute every slider position for the default rules.
+
+    Only the system size depends on (bill, area); everything else is a
+    function of the size, so the table stores a kW matrix (rows = bill,
+    columns = area) plus one outcome row per distinct size.
+    """
+    rules = rules or get_rule_book().default
+    bills, areas = slider_values(BILL_RANGE), slider_values(AREA_RANGE)
+    kw = recommended_kw(bills[:, None], areas[None, :], rules)
+    sizes = np.unique(kw)
+    by_kw = as_records(outcomes_for_kw(sizes, rules))
+    return {
+        'rules': rules.signature,
+        'bill': dict(zip(('min', 'max', 'step'), BILL_RANGE)),
+        'area': dict(zip(('min', 'max', 'step'), AREA_RANGE)),
+        'kw': kw.tolist(),
+        'by_kw': {str(row['capacity_kw']): row for row in by_kw},
+    }
+
+
+def parse_inputs(data, max_batch, max_bill, max_area):
+    """Validate an API payload and return (bills, areas, districts, is_batch).
+
+    Accepts {"bill": 3000, "area": 300}, {"bill": [...], "area": [...]}
+    or {"inputs": [{"bill": ..., "area": ...}, ...]}, each with an optional
+    "district" (top-level, per input, or a list). Bills and areas above
+    max_bill/max_area are rejected so the kW sizes stay within int64.
+    Raises ValueError.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object.")
+    if 'inputs' in data:
+        inputs = data['inputs']
+        if not isinstance(inputs, list) or not all(isinstance(item, dict) for item in inputs):
+            raise ValueError("'inputs' must be a list of {\"bill\", \"area\"} objects.")
+        bills, areas = [item.get('bill') for item in inputs], [item.get('area') for item in inputs]
+        districts = [item.get('district', data.get('district')) for item in inputs]
+    elif 'bill' in data and 'area' in data:
+        bills, areas, districts = data['bill'], data['area'], data.get('district')
+    else:
+        raise ValueError("Provide 'bill' and 'area', or a list of 'inputs'.")
+
+    is_batch = isinstance(bills, list) or isinstance(areas, list)
+    try:
+        bills = np.atleast_1d(np.asarray(bills, dtype=float))
+        areas = np.atleast_1d(np.asarray(areas, dtype=float))
+    except (TypeError, ValueError):
+        raise ValueError("'bill' and 'area' must be numbers.")
+    if bills.ndim != 1 or bills.shape != areas.shape:
+        raise ValueError("'bill' and 'area' must have the same length.")
+    if not 0 < bills.size <= max_batch:
+        raise ValueError(f"Send between 1 and {max_batch} inputs.")
+    if not (np.isfinite(bills).all() and np.isfinite(areas).all()) or (bills <= 0).any() or (areas < 0).any():
+        raise ValueError("'bill' must be positive and 'area' zero or more.")
+    if (bills > max_bill).any() or (areas > max_area).any():
+        raise ValueError(f"'bill' can be at most {max_bill:g} and 'area' at most {max_area:g}.")
+    if not isinstance(districts, list):
+        districts = [districts] * bills.size
+    if len(districts) != bills.size or not all(d is None or isinstance(d, str) for d in districts):
+        raise ValueError("'district' must be a name or a list with one name per input.")
+    return bills, areas, districts, is_batch
+
+
+_grid_cache = {'key': None, 'data': None}
+
+
+def load_grid():
+    """The table written by `manage.py build_calculator_grid`.
+
+    Computed afresh instead if the file is missing or was built with rules
+    that have since been edited in the admin.
+    """
+    rules = get_rule_book().default
+    path = Path(settings.CALCULATOR_GRID_PATH)
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        mtime = None
+    key = (path, mtime, rules.signature)
+    if _grid_cache['data'] is None or _grid_cache['key'] != key:
+        data = json.loads(path.read_text(encoding='utf-8')) if mtime is not None else None
+        if data is None or data.get('rules') != rules.signature:
+            data = build_grid(rules)
+        _grid_cache.update(key=key, data=data)
+    return _grid_cache['data']
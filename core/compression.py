@@ -0,0 +1,117 @@
+"""HTML minification and gzip/brotli compression for CompressionMiddleware and export_home."""
+import re
+import zlib
+
+from django.conf import settings
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; responses fall back to gzip without it
+    brotli = None
+
+# Elements kept byte for byte, comments, and any other tag (quoted attribute
+# values may contain '>'). Only the text between these tokens is collapsed.
+TOKEN_RE = re.compile(
+    r'<(pre|textarea|script|style)\b.*?</\1\s*>'
+    r'|<!--.*?-->'
+    r'|<[a-zA-Z/!][^>"\']*(?:(?:"[^"]*"|\'[^\']*\')[^>"\']*)*>',
+    re.IGNORECASE | re.DOTALL,
+)
+# HTML whitespace only; \s would also eat non-breaking spaces.
+WHITESPACE_RE = re.compile(r'[ \t\r\n\f]+')
+
+COMPRESSIBLE_TYPES = frozenset((
+    'text/html', 'text/plain', 'text/css', 'text/csv', 'text/javascript', 'application/javascript',
+    'application/json', 'application/x-ndjson', 'image/svg+xml',
+))
+
+# Same BREACH mitigation as Django's GZipMiddleware: pad gzip headers with random bytes.
+MAX_RANDOM_BYTES = 100
+
+
+def minify_html(html):
+    """Drop comments and collapse whitespace runs in text between tags.
+
+    Tags (attribute values included) and the contents of <pre>, <textarea>,
+    <script> and <style> are left as they are. A run containing a newline
+    becomes a single newline and any other run a single space, which browsers
+    render identically.
+    """
+    parts, text, pos = [], [], 0
+    for match in TOKEN_RE.finditer(html):
+        text.append(html[pos:match.start()])
+        pos = match.end()
+        token = match.group(0)
+        # Conditional comments (<!--[if ...]>) are markup for old IE, not notes.
+        if token.startswith('<!--') and not token.startswith('<!--[if'):
+            continue  # Text on both sides of a dropped comment is one run.
+        parts.append(_collapse(''.join(text)))
+        parts.append(token)
+        text = []
+    text.append(html[pos:])
+    parts.append(_collapse(''.join(text)))
+    return ''.join(parts).strip()
+
+
+def _collapse(text):
+    return WHITESPACE_RE.sub(_whitespace, text)
+
+
+def _whitespace(match):
+    return '\n' if '\n' in match.group() else ' '
+
+
+def choose_encoding(accept_encoding):
+    """'br', 'gzip' or None for an Accept-Encoding header, preferring brotli at equal quality."""
+    accepted = {}
+    for item in accept_encoding.split(','):
+        coding, _, params = item.strip().lower().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            accepted[coding] = q
+    available = ('br', 'gzip') if brotli is not None else ('gzip',)
+    ranked = [(accepted.get(coding, accepted.get('*', 0.0)), -i, coding) for i, coding in enumerate(available)]
+    q, _, coding = max(ranked)
+    return coding if q > 0 else None
+
+
+def compress(data, encoding):
+    """Compress a whole body with 'br' or 'gzip'."""
+    if encoding == 'br':
+        return brotli.compress(data, mode=brotli.MODE_TEXT, quality=settings.BROTLI_QUALITY)
+    return compress_string(data, max_random_bytes=MAX_RANDOM_BYTES)
+
+
+def _compressor(encoding):
+    if encoding == 'br':
+        compressor = brotli.Compressor(mode=brotli.MODE_TEXT, quality=settings.BROTLI_QUALITY)
+        return compressor.process, compressor.finish
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    return compressor.compress, compressor.flush
+
+
+def compress_stream(chunks, encoding):
+    """Compress an iterable of byte chunks as one stream."""
+    process, finish = _compressor(encoding)
+    for chunk in chunks:
+        data = process(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+async def acompress_stream(chunks, encoding):
+    """compress_stream() for async iterators (async views under ASGI)."""
+    process, finish = _compressor(encoding)
+    async for chunk in chunks:
+        data = process(chunk)
+        if data:
+            yield data
+    yield finish()
@@ -0,0 +1,23 @@
+from django.conf import settings
+
+
+def configure_sqlite(raw_connection, pragmas=None):
+    """Apply settings.SQLITE_PRAGMAS to a DB-API sqlite3 connection.
+
+    journal_mode=WAL lets readers keep reading while a writer commits, and
+    busy_timeout makes writers wait for the lock instead of failing with
+    "database is locked". Both are per-connection (WAL also sticks to the
+    file), so this runs for every new connection.
+    """
+    pragmas = settings.SQLITE_PRAGMAS if pragmas is None else pragmas
+    cursor = raw_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+
+def on_connection_created(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite':
+        configure_sqlite(connection.connection)
@@ -0,0 +1,138 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .leads import normalize_mobile
+from .models import ConsultationRequest
+
+
+class RecentLeadIndex:
+    """Bounded LRU of dedup key -> (value, expiry), safe to share between threads."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def add(self, key, value, age=0.0):
+        """Remember a lead that was created `age` seconds ago."""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl - age)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Process-wide index, rebuilt if the dedup settings change."""
+    global _index
+    maxsize, ttl = settings.LEAD_DEDUP_CACHE_SIZE, settings.LEAD_DEDUP_WINDOW_SECONDS
+    with _index_lock:
+        if _index is None or (_index.maxsize, _index.ttl) != (maxsize, ttl):
+            _index = RecentLeadIndex(maxsize, ttl)
+        return _index
+
+
+def reset():
+    """Forget all remembered leads (used by tests)."""
+    get_index().clear()
+
+
+def dedup_key(lead):
+    """(mobile, PIN) for a lead, or None when dedup is disabled."""
+    if settings.LEAD_DEDUP_WINDOW_SECONDS <= 0:
+        return None
+    mobile = normalize_mobile(lead.mobile_number or '') or lead.mobile_number
+    return (mobile, (lead.pin_code or '').strip())
+
+
+def find_duplicate(lead):
+    """Return an existing lead submitted within the dedup window with the same key, or None.
+
+    A hit in this process's index is confirmed with a primary-key lookup,
+    since the lead may have been deleted (by any worker) since; the lead
+    returned then only has id, mobile_number, pin_code and created_at loaded.
+    Otherwise the database is searched (indexed on mobile_number), since
+    another worker may have taken the first submission.
+    """
+    key = dedup_key(lead)
+    if key is None:
+        return None
+    indexed = get_index().get(key)
+    if indexed is not None:
+        if ConsultationRequest.objects.filter(pk=indexed[0]).exists():
+            return _indexed_lead(key, *indexed)
+        get_index().discard(key)
+    existing = _recent_lead(key).first()
+    if existing is not None:
+        remember(existing)
+    return existing
+
+
+async def afind_duplicate(lead):
+    """find_duplicate() for async views."""
+    key = dedup_key(lead)
+    if key is None:
+        return None
+    indexed = get_index().get(key)
+    if indexed is not None:
+        if await ConsultationRequest.objects.filter(pk=indexed[0]).aexists():
+            return _indexed_lead(key, *indexed)
+        get_index().discard(key)
+    existing = await _recent_lead(key).afirst()
+    if existing is not None:
+        remember(existing)
+    return existing
+
+
+def _indexed_lead(key, lead_id, created_at):
+    # Other fields are deferred, so reading them loads the row.
+    known = {'id': lead_id, 'mobile_number': key[0], 'pin_code': key[1], 'created_at': created_at}
+    fields = [f.attname for f in ConsultationRequest._meta.concrete_fields if f.attname in known]
+    return ConsultationRequest.from_db('default', fields, [known[name] for name in fields])
+
+
+def _recent_lead(key):
+    window = timedelta(seconds=settings.LEAD_DEDUP_WINDOW_SECONDS)
+    return ConsultationRequest.objects.filter(
+        mobile_number=key[0], pin_code=key[1], created_at__gte=timezone.now() - window,
+    ).order_by('-pk')
+
+
+def remember(lead):
+    key = dedup_key(lead)
+    if key is not None:
+        age = (timezone.now() - lead.created_at).total_seconds() if lead.created_at else 0.0
+        get_index().add(key, (lead.pk, lead.created_at), age)
@@ -0,0 +1,52 @@
+import gzip
+import os
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.template.loader import render_to_string
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; only the .gz variant is written without it
+    brotli = None
+
+from .compression import minify_html
+from .views import get_home_context
+
+
+def _write_atomic(path, data):
+    """Write bytes so the web tier never serves a half-written file."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def export_home_page(output_dir=None):
+    """Render the landing page to index.html plus .gz/.br siblings.
+
+    Returns the list of files written.
+    """
+    output_dir = Path(output_dir or settings.STATIC_EXPORT_ROOT)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    html = render_to_string('index.html', get_home_context())
+    if settings.HTML_MINIFY:
+        html = minify_html(html)
+    html = html.encode('utf-8')
+    variants = {'index.html': html, 'index.html.gz': gzip.compress(html, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['index.html.br'] = brotli.compress(html, mode=brotli.MODE_TEXT, quality=11)
+
+    written = []
+    for name, data in variants.items():
+        path = output_dir / name
+        _write_atomic(path, data)
+        written.append(path)
+    return written
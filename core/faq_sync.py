@@ -0,0 +1,97 @@
+import json
+from pathlib import Path
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import FAQ
+from .signals import faq_changed
+
+DEFAULT_FAQ_FILE = Path(__file__).resolve().parent / 'data' / 'faqs.json'
+
+
+def load_faq_file(path):
+    """Read {category: [{'question', 'answer'}, ...]} from a .json or .yaml/.yml file."""
+    path = Path(path)
+    text = path.read_text(encoding='utf-8')
+    if path.suffix.lower() in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("PyYAML is required to read YAML files: pip install PyYAML")
+        try:
+            data = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid YAML: {e}")
+    else:
+        data = json.loads(text)
+
+    categories = {code for code, _ in FAQ.CATEGORY_CHOICES}
+    if not isinstance(data, dict):
+        raise ValueError("Expected a mapping of category to a list of FAQs.")
+    for category, items in data.items():
+        if category not in categories:
+            raise ValueError(f"Unknown category {category!r}; expected one of {', '.join(sorted(categories))}.")
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            raise ValueError(f"{category} must be a list of {{question, answer}} objects.")
+        for item in items:
+            if not isinstance(item.get('question'), str) or not isinstance(item.get('answer'), str):
+                raise ValueError(f"Every {category} FAQ needs a question and an answer.")
+    return data
+
+
+def sync_faqs(data, dry_run=False):
+    """Make the active FAQs match `data`, matching rows on (category, question).
+
+    Changed answers are updated in place and reactivated, new questions are
+    inserted and questions missing from `data` are deactivated rather than
+    deleted, so ids stay stable. Everything runs in one transaction with one
+    bulk_create and one bulk_update; unchanged rows aren't written at all.
+    Returns {'created', 'updated', 'deactivated', 'unchanged'} counts.
+    """
+    # Questions are compared stripped on both sides. If several rows then share
+    # a key, the active (else oldest) one is matched and the rest deactivated.
+    existing, duplicates = {}, []
+    for faq in FAQ.objects.order_by('-is_active', 'id'):
+        key = (faq.category, faq.question.strip())
+        if key in existing:
+            duplicates.append(faq)
+        else:
+            existing[key] = faq
+    now = timezone.now()
+    to_create, to_update, seen = [], [], set()
+
+    for category, items in data.items():
+        for item in items:
+            key = (category, item['question'].strip())
+            if key in seen:
+                continue
+            seen.add(key)
+            faq = existing.get(key)
+            answer = item['answer'].strip()
+            if faq is None:
+                to_create.append(FAQ(category=category, question=key[1], answer=answer))
+            elif faq.answer != answer or faq.question != key[1] or not faq.is_active:
+                faq.question, faq.answer, faq.is_active, faq.updated_at = key[1], answer, True, now
+                to_update.append(faq)
+
+    to_deactivate = [faq for key, faq in existing.items() if key not in seen and faq.is_active]
+    to_deactivate += [faq for faq in duplicates if faq.is_active]
+    for faq in to_deactivate:
+        faq.is_active, faq.updated_at = False, now
+
+    counts = {
+        'created': len(to_create),
+        'updated': len(to_update),
+        'deactivated': len(to_deactivate),
+        'unchanged': len(seen) - len(to_create) - len(to_update),
+    }
+    if dry_run or not (to_create or to_update or to_deactivate):
+        return counts
+
+    with transaction.atomic():
+        FAQ.objects.bulk_create(to_create)
+        FAQ.objects.bulk_update(to_update + to_deactivate, ['question', 'answer', 'is_active', 'updated_at'])
+        # Bulk operations don't send post_save, so invalidate once here.
+        faq_changed(sender=FAQ)
+    return counts
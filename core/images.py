@@ -0,0 +1,94 @@
+import hashlib
+import json
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+
+try:
+    from PIL import Image, features
+except ImportError:  # Pillow is only needed to build variants, not to serve them
+    Image = features = None
+
+# Most preferred first; this is also the <source> order inside <picture>.
+FORMATS = ('avif', 'webp')
+
+SAVE_OPTIONS = {
+    'avif': {'quality': 55},
+    'webp': {'quality': 78, 'method': 6},
+}
+
+_manifest_cache = {'key': None, 'data': {}}
+
+
+def manifest_path():
+    return Path(settings.IMAGE_BUILD_DIR) / 'manifest.json'
+
+
+def load_manifest():
+    """Return the variant manifest, re-reading it only when the file changes."""
+    path = manifest_path()
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return {}
+    if _manifest_cache['key'] != (path, mtime):
+        _manifest_cache['data'] = json.loads(path.read_text(encoding='utf-8'))
+        _manifest_cache['key'] = (path, mtime)
+    return _manifest_cache['data']
+
+
+def supported_formats():
+    """Formats the installed Pillow can encode."""
+    if Image is None:
+        return ()
+    return tuple(fmt for fmt in FORMATS if features.check(fmt))
+
+
+def build_variants(source_dir, output_dir, widths, formats=None):
+    """Write resized, content-hashed variants of every PNG/JPEG in source_dir.
+
+    Returns the manifest, keyed by static path (e.g. 'images/logo.png'),
+    and writes it to output_dir/manifest.json.
+    """
+    if Image is None:
+        raise RuntimeError("Pillow is required to build image variants.")
+    source_dir, output_dir = Path(source_dir), Path(output_dir)
+    static_root = Path(settings.STATICFILES_DIRS[0])
+    formats = formats or supported_formats()
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest = {}
+    for source in sorted(source_dir.iterdir()):
+        if source.suffix.lower() not in ('.png', '.jpg', '.jpeg'):
+            continue
+        with Image.open(source) as original:
+            original.load()
+            width, height = original.size
+            entry = {'width': width, 'height': height, 'variants': {}}
+            targets = sorted({w for w in widths if w < width} | {width})
+            for fmt in formats:
+                entry['variants'][fmt] = []
+                for target in targets:
+                    resized = original.resize((target, round(height * target / width)), Image.LANCZOS)
+                    data = _encode(resized, fmt)
+                    digest = hashlib.md5(data).hexdigest()[:12]
+                    path = output_dir / f"{source.stem}-{target}.{digest}.{fmt}"
+                    if not path.exists():
+                        path.write_bytes(data)
+                    entry['variants'][fmt].append({
+                        'width': target,
+                        'path': path.relative_to(static_root).as_posix(),
+                    })
+        manifest[source.relative_to(static_root).as_posix()] = entry
+
+    (output_dir / 'manifest.json').write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+    return manifest
+
+
+def _encode(image, fmt):
+    buffer = BytesIO()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+    image.save(buffer, format=fmt.upper(), **SAVE_OPTIONS[fmt])
+    return buffer.getvalue()
@@ -0,0 +1,171 @@
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections, transaction
+
+from .dedup import afind_duplicate, dedup_key, find_duplicate, remember
+from .models import ConsultationRequest
+from .notifications import enqueue_lead_notifications
+
+
+class _PendingLead:
+    def __init__(self, lead):
+        self.lead = lead
+        self.error = None
+        self.is_leader = False
+        self.wake = threading.Event()
+
+
+class LeadBatcher:
+    """Group-commit ConsultationRequest inserts from concurrent request threads.
+
+    The first thread to submit becomes the leader: it waits up to `max_wait`
+    seconds (or until `max_batch_size` leads are queued), then inserts the
+    whole batch and its notification jobs with one bulk_create in one
+    transaction, and wakes the other submitters. Leadership passes to the
+    next queued lead, so there is at most one writer per process.
+
+    Durability: submit() only returns after the transaction holding that
+    lead has committed, and raises if it failed. Nothing is acknowledged
+    while it exists only in memory, so a crash loses only requests whose
+    clients never received a success response.
+    """
+
+    def __init__(self, max_batch_size, max_wait):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batches_flushed = 0
+        self._pending = []
+        self._has_leader = False
+        self._cond = threading.Condition()
+
+    def submit(self, lead):
+        """Save an unsaved ConsultationRequest as part of a batch and return it."""
+        item = _PendingLead(lead)
+        with self._cond:
+            self._pending.append(item)
+            if not self._has_leader:
+                self._has_leader = item.is_leader = True
+            elif len(self._pending) >= self.max_batch_size:
+                self._cond.notify()
+        if not item.is_leader:
+            item.wake.wait()
+        if item.is_leader:
+            self._lead()
+        if item.error is not None:
+            raise item.error
+        return item.lead
+
+    def _lead(self):
+        deadline = time.monotonic() + self.max_wait
+        with self._cond:
+            while len(self._pending) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+        try:
+            self._flush(batch)
+        finally:
+            with self._cond:
+                if self._pending:
+                    successor = self._pending[0]
+                    successor.is_leader = True
+                    successor.wake.set()
+                else:
+                    self._has_leader = False
+            for item in batch:
+                item.wake.set()
+
+    def _flush(self, batch):
+        # Repeat submissions that landed in the same batch share the first one's row.
+        first_by_key, unique = {}, []
+        for item in batch:
+            key = dedup_key(item.lead)
+            if key is None or key not in first_by_key:
+                first_by_key.setdefault(key, item)
+                unique.append(item)
+        try:
+            with transaction.atomic():
+                leads = ConsultationRequest.objects.bulk_create([item.lead for item in unique])
+                enqueue_lead_notifications(leads)
+            for item in batch:
+                key = dedup_key(item.lead)
+                if key is not None:
+                    item.lead = first_by_key[key].lead
+        except Exception as exc:
+            for item in batch:
+                item.error = exc
+        self.batches_flushed += 1
+
+
+_batcher = None
+_batcher_lock = threading.Lock()
+
+
+def get_batcher():
+    """Process-wide batcher, rebuilt if the batch settings change."""
+    global _batcher
+    max_batch_size = settings.LEAD_BATCH_MAX_SIZE
+    max_wait = settings.LEAD_BATCH_MAX_WAIT_MS / 1000
+    with _batcher_lock:
+        if _batcher is None or (_batcher.max_batch_size, _batcher.max_wait) != (max_batch_size, max_wait):
+            _batcher = LeadBatcher(max_batch_size, max_wait)
+        return _batcher
+
+
+def save_lead(form):
+    """Persist a valid ConsultationForm and queue its notifications.
+
+    A repeat of a recent submission (same mobile number and PIN) returns the
+    existing lead without inserting or notifying again. LEAD_INGEST_MODE=batched
+    group-commits concurrent submissions; either way the lead is committed
+    before this returns.
+    """
+    lead = form.save(commit=False)
+    existing = find_duplicate(lead)
+    if existing is not None:
+        return existing
+    if settings.LEAD_INGEST_MODE == 'batched':
+        lead = get_batcher().submit(lead)
+    else:
+        _save_direct(lead)
+    remember(lead)
+    return lead
+
+
+async def asave_lead(form):
+    """save_lead() for async views.
+
+    The duplicate check uses the async ORM. The insert and its notification
+    jobs must share a transaction, which Django only runs in sync code, so
+    that part goes through sync_to_async. In batched mode each submission
+    waits in its own worker thread, letting concurrent requests share a batch.
+    """
+    lead = form.save(commit=False)
+    existing = await afind_duplicate(lead)
+    if existing is not None:
+        return existing
+    if settings.LEAD_INGEST_MODE == 'batched':
+        lead = await sync_to_async(_submit_batched, thread_sensitive=False)(lead)
+    else:
+        await sync_to_async(_save_direct)(lead)
+    remember(lead)
+    return lead
+
+
+def _save_direct(lead):
+    with transaction.atomic():
+        lead.save()
+        enqueue_lead_notifications([lead])
+
+
+def _submit_batched(lead):
+    try:
+        return get_batcher().submit(lead)
+    finally:
+        connections.close_all()  # This worker thread's own connection.
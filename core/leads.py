@@ -0,0 +1,151 @@
+import csv
+import json
+import re
+from datetime import datetime, time, timedelta
+
+from django.db import connections
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import ConsultationRequest
+
+LEAD_FTS_TABLE = 'core_consultationrequest_fts'
+
+_fts_tables = {}
+
+
+def normalize_mobile(term):
+    """Return the 10-digit-or-shorter national number in `term`, or None if it isn't a phone number.
+
+    Accepts what staff paste from WhatsApp/call logs: spaces, dashes, +91 or a leading 0.
+    """
+    digits = re.sub(r'[\s\-()]', '', term)
+    if digits.startswith('+91'):
+        digits = digits[3:]
+    elif len(digits) == 12 and digits.startswith('91'):
+        digits = digits[2:]
+    elif len(digits) == 11 and digits.startswith('0'):
+        digits = digits[1:]
+    if not digits.isdigit() or len(digits) > 10:
+        return None
+    return digits
+
+
+def mobile_filter(digits):
+    """Exact match for a full number, otherwise an index range scan for the prefix.
+
+    SQLite can't use an index for `LIKE 'x%' ESCAPE '\\'` (Django's startswith),
+    but >= / < on the same column can.
+    """
+    if len(digits) == 10:
+        return {'mobile_number': digits}
+    upper = digits[:-1] + chr(ord(digits[-1]) + 1)
+    return {'mobile_number__gte': digits, 'mobile_number__lt': upper}
+
+
+def fts_query(term):
+    """Turn free text into an FTS5 query: every word must match as a prefix."""
+    words = re.findall(r'\w+', term)
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def has_fts(using='default'):
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    key = (using, str(connection.settings_dict['NAME']))
+    if key not in _fts_tables:
+        _fts_tables[key] = LEAD_FTS_TABLE in connection.introspection.table_names()
+    return _fts_tables[key]
+
+
+def search_leads(queryset, term):
+    """Filter ConsultationRequests by mobile number or name using indexes only.
+
+    Returns None when the term can't be answered from an index (e.g. no FTS5),
+    so the caller can fall back to a plain icontains search.
+    """
+    term = term.strip()
+    if not term:
+        return queryset
+    digits = normalize_mobile(term)
+    if digits:
+        return queryset.filter(**mobile_filter(digits))
+    query = fts_query(term)
+    if not query or not has_fts(queryset.db):
+        return None
+    return queryset.filter(pk__in=RawSQL(
+        f"SELECT rowid FROM {LEAD_FTS_TABLE} WHERE {LEAD_FTS_TABLE} MATCH %s", [query],
+    ))
+
+
+EXPORT_FIELDS = ('id', 'full_name', 'mobile_number', 'district', 'pin_code', 'message', 'created_at')
+EXPORT_FORMATS = ('csv', 'jsonl')
+EXPORT_CHUNK_SIZE = 2000
+
+
+def _day_start(value, name):
+    day = parse_date(value) if isinstance(value, str) else value
+    if day is None:
+        raise ValueError(f"'{name}' must be a date (YYYY-MM-DD).")
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def export_queryset(since=None, until=None, district=None, after_id=None):
+    """Leads to export, oldest first, as value tuples of EXPORT_FIELDS.
+
+    `since`/`until` are inclusive dates; `after_id` resumes an interrupted
+    export from the last id received. Raises ValueError for bad input.
+    """
+    queryset = ConsultationRequest.objects.order_by('id')
+    if since:
+        queryset = queryset.filter(created_at__gte=_day_start(since, 'since'))
+    if until:
+        queryset = queryset.filter(created_at__lt=_day_start(until, 'until') + timedelta(days=1))
+    if district:
+        queryset = queryset.filter(district=district)
+    if after_id:
+        try:
+            queryset = queryset.filter(id__gt=int(after_id))
+        except ValueError:
+            raise ValueError("'after_id' must be an integer.")
+    return queryset.values_list(*EXPORT_FIELDS)
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+
+# Spreadsheets treat a cell starting with one of these as a formula.
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def spreadsheet_safe(value):
+    """Prefix a quote to text a spreadsheet would otherwise evaluate (CSV injection)."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def iter_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow([spreadsheet_safe(value) for value in row[:-1]] + [row[-1].isoformat()])
+
+
+def iter_jsonl(rows):
+    for row in rows:
+        record = dict(zip(EXPORT_FIELDS, row))
+        record['created_at'] = record['created_at'].isoformat()
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def stream_leads(queryset, fmt):
+    """Yield the export as text chunks; rows are fetched EXPORT_CHUNK_SIZE at a time."""
+    rows = queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    return iter_csv(rows) if fmt == 'csv' else iter_jsonl(rows)
@@ -0,0 +1,107 @@
+import json
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from core import benchmark, ratelimit
+
+# Recorded with every run so results are only compared like for like.
+RECORDED_SETTINGS = (
+    'CACHE_BACKEND', 'LEAD_INGEST_MODE', 'FAQ_LAZY_LOAD', 'DEFER_BELOW_FOLD', 'METRICS_ENABLED', 'RELEASE_VERSION',
+    'SQLITE_TRANSACTION_MODE',
+)
+
+
+class Command(BaseCommand):
+    help = "Measure requests/sec and p50/p95/p99 latency of the landing page and the consultation form."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoint', dest='endpoints', action='append', choices=benchmark.ENDPOINTS,
+                            help="Endpoint to benchmark; repeat for several. Defaults to all.")
+        parser.add_argument('--mode', choices=benchmark.MODES, default='client',
+                            help="client: in-process test client. server: HTTP to a local threaded WSGI server.")
+        parser.add_argument('--requests', type=int, default=500, help="Timed requests per endpoint.")
+        parser.add_argument('--concurrency', type=int, default=1)
+        parser.add_argument('--warmup', type=int, default=20, help="Untimed requests per endpoint first.")
+        parser.add_argument('--faqs', type=int, default=50, help="FAQs to seed.")
+        parser.add_argument('--leads', type=int, default=10000, help="Leads to seed.")
+        parser.add_argument('--no-cache', action='store_true', help="Use a dummy cache so every request renders.")
+        parser.add_argument('--output', help="Write the results as JSON to this file.")
+        parser.add_argument('--compare', help="Results file from an earlier run to compare against.")
+        parser.add_argument('--max-regression', type=float,
+                            help="With --compare, fail if rps or a latency percentile is this many percent worse.")
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError("--requests must be at least 1.")
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare'], encoding='utf-8') as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Can't read {options['compare']}: {e}")
+
+        endpoints = options['endpoints'] or list(benchmark.ENDPOINTS)
+        overrides = {
+            'ALLOWED_HOSTS': ['testserver', '127.0.0.1', 'localhost'],
+            # Thousands of posts from one address would otherwise be throttled.
+            'RATELIMIT_IP': '', 'RATELIMIT_MOBILE': '',
+        }
+        if options['no_cache']:
+            overrides['CACHES'] = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+        results = {}
+        with benchmark.benchmark_database(), override_settings(**overrides):
+            self.stderr.write(f"Seeding {options['faqs']} FAQ(s) and {options['leads']} lead(s)...")
+            benchmark.seed(options['faqs'], options['leads'])
+            cache.clear()
+            ratelimit.reset()
+            for endpoint in endpoints:
+                if options['mode'] == 'server':
+                    with benchmark.local_server() as (host, port):
+                        results[endpoint] = self.run(partial(benchmark.HTTPSession, host, port), endpoint, options)
+                else:
+                    results[endpoint] = self.run(benchmark.ClientSession, endpoint, options)
+
+        report = {
+            'created_at': timezone.now().isoformat(),
+            'mode': options['mode'],
+            'concurrency': options['concurrency'],
+            'dataset': {'faqs': options['faqs'], 'leads': options['leads']},
+            'cache': not options['no_cache'],
+            'settings': {name: getattr(settings, name, None) for name in RECORDED_SETTINGS},
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+            self.stderr.write(self.style.SUCCESS(f"Wrote results to {options['output']}"))
+
+        if baseline is not None:
+            self.report_changes(results, baseline, options['max_regression'])
+
+    def run(self, make_session, endpoint, options):
+        summary = benchmark.run_endpoint(
+            make_session, endpoint, options['requests'], options['concurrency'], options['warmup'],
+        )
+        self.stdout.write(
+            f"{endpoint:<20} {summary['requests']:>6} req  {summary['rps']:>8.1f} req/s  "
+            f"p50 {summary['p50_ms']:.2f} ms  p95 {summary['p95_ms']:.2f} ms  p99 {summary['p99_ms']:.2f} ms  "
+            f"errors {summary['errors']}"
+        )
+        return summary
+
+    def report_changes(self, results, baseline, max_regression):
+        regressions = []
+        for endpoint, changes in benchmark.compare(results, baseline.get('results', {})).items():
+            parts = [f"{key} {change:+.1f}%" for key, change in changes.items()]
+            self.stdout.write(f"{endpoint:<20} vs baseline (positive is worse): {', '.join(parts)}")
+            if max_regression is not None:
+                regressions += [f"{endpoint} {key}" for key, change in changes.items() if change > max_regression]
+        if regressions:
+            raise CommandError(f"Regressed by more than {max_regression}%: {', '.join(regressions)}")
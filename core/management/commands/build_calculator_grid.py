@@ -0,0 +1,28 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.calculator import build_grid
+
+
+class Command(BaseCommand):
+    help = "Precompute the calculator for every slider position into settings.CALCULATOR_GRID_PATH."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=settings.CALCULATOR_GRID_PATH, help="Where to write the JSON table.")
+
+    def handle(self, *args, **options):
+        grid = build_grid()
+        path = Path(options['output'])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + '.tmp')
+        tmp.write_text(json.dumps(grid, separators=(',', ':')), encoding='utf-8')
+        tmp.replace(path)
+
+        cells = len(grid['kw']) * len(grid['kw'][0])
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {cells} slider positions ({len(grid['by_kw'])} system sizes, "
+            f"{path.stat().st_size // 1024} KB) to {path}"
+        ))
@@ -0,0 +1,74 @@
+import re
+import shlex
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import render_to_string
+
+from core.assets import extract_critical_css, html_tokens, tailwind_input, write_hashed_css
+from core.sections import ABOVE_FOLD_TEMPLATES
+
+
+class Command(BaseCommand):
+    help = (
+        "Compile a purged, minified Tailwind stylesheet (merged with static/css/styles.css) "
+        "to a content-hashed file for TAILWIND_MODE=build."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cli', default=settings.TAILWIND_CLI,
+            help="Tailwind CLI command, e.g. the standalone 'tailwindcss' binary or 'npx tailwindcss' after npm install.",
+        )
+
+    def handle(self, *args, **options):
+        cli = shlex.split(options['cli'])
+        if not shutil.which(cli[0]):
+            raise CommandError(
+                f"Tailwind CLI '{cli[0]}' not found. Install the standalone binary or set TAILWIND_CLI."
+            )
+
+        static_dir = Path(settings.STATICFILES_DIRS[0])
+        custom_css = (static_dir / 'css' / 'styles.css').read_text(encoding='utf-8')
+
+        with tempfile.TemporaryDirectory() as tmp:
+            input_path = Path(tmp) / 'input.css'
+            output_path = Path(tmp) / 'output.css'
+            input_path.write_text(tailwind_input(custom_css), encoding='utf-8')
+            result = subprocess.run(
+                cli + [
+                    '--config', str(settings.BASE_DIR / 'tailwind.config.js'),
+                    '--input', str(input_path),
+                    '--output', str(output_path),
+                    '--minify',
+                ],
+                cwd=settings.BASE_DIR, capture_output=True, text=True,
+            )
+            if result.returncode != 0:
+                raise CommandError(f"Tailwind build failed:\n{result.stderr}")
+            css = output_path.read_text(encoding='utf-8')
+
+        path = write_hashed_css(css, settings.CSS_BUILD_DIR)
+        self.stdout.write(f"Wrote {path} ({len(css.encode('utf-8')) // 1024} KB)")
+
+        critical = self.build_critical_css(css, static_dir)
+        critical_path = Path(settings.CSS_BUILD_DIR) / 'critical.css'
+        critical_path.write_text(critical, encoding='utf-8')
+        self.stdout.write(f"Wrote {critical_path} ({len(critical.encode('utf-8')) // 1024} KB)")
+        self.stdout.write(self.style.SUCCESS("Set TAILWIND_MODE=build to use the built stylesheet."))
+
+    def build_critical_css(self, css, static_dir):
+        """Rules needed by the above-the-fold partials, including classes scripts.js toggles."""
+        classes, ids = set(), set()
+        for template_name in ABOVE_FOLD_TEMPLATES:
+            found_classes, found_ids = html_tokens(render_to_string(template_name))
+            classes |= found_classes
+            ids |= found_ids
+        scripts = (static_dir / 'js' / 'scripts.js').read_text(encoding='utf-8')
+        for literal in re.findall(r"['\"`]([\w\-\s:/\[\]#.]+)['\"`]", scripts):
+            classes.update(literal.split())
+        return extract_critical_css(css, classes, ids)
@@ -0,0 +1,36 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.images import build_variants, supported_formats
+
+
+class Command(BaseCommand):
+    help = "Generate resized, content-hashed AVIF/WebP variants of static/images for the {% picture %} tag."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--widths', type=int, nargs='+', default=settings.IMAGE_VARIANT_WIDTHS,
+            help="Target widths in pixels (never upscaled). Defaults to settings.IMAGE_VARIANT_WIDTHS.",
+        )
+
+    def handle(self, *args, **options):
+        formats = supported_formats()
+        if not formats:
+            raise CommandError("Pillow with WebP or AVIF support is required: pip install Pillow")
+
+        source_dir = Path(settings.STATICFILES_DIRS[0]) / 'images'
+        manifest = build_variants(source_dir, settings.IMAGE_BUILD_DIR, options['widths'], formats)
+
+        static_root = Path(settings.STATICFILES_DIRS[0])
+        for path, entry in manifest.items():
+            sizes = ', '.join(
+                f"{fmt} {(static_root / variants[-1]['path']).stat().st_size // 1024} KB"
+                for fmt, variants in entry['variants'].items()
+            )
+            original = (static_root / path).stat().st_size // 1024
+            self.stdout.write(f"{path} ({entry['width']}px): {original} KB -> {sizes}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Built {', '.join(formats)} variants for {len(manifest)} images in {settings.IMAGE_BUILD_DIR}"
+        ))
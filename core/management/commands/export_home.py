@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from core.export import brotli, export_home_page
+
+
+class Command(BaseCommand):
+    help = "Render the landing page to static, pre-compressed HTML for the web server to serve directly."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir',
+            help="Directory to write index.html(.gz/.br) to. Defaults to settings.STATIC_EXPORT_ROOT.",
+        )
+
+    def handle(self, *args, **options):
+        written = export_home_page(options['output_dir'])
+        for path in written:
+            self.stdout.write(f"Wrote {path} ({path.stat().st_size} bytes)")
+        if brotli is None:
+            self.stdout.write(self.style.WARNING("brotli is not installed; skipped index.html.br"))
+        self.stdout.write(self.style.SUCCESS("Landing page exported."))
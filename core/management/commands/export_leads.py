@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.leads import EXPORT_FORMATS, export_queryset, stream_leads
+
+
+class Command(BaseCommand):
+    help = "Stream consultation leads as CSV or JSON Lines, in constant memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument(
+            '--output', help="File to write to (appended to when resuming with --after-id). Defaults to stdout.",
+        )
+        parser.add_argument('--since', help="Only leads created on or after this date (YYYY-MM-DD).")
+        parser.add_argument('--until', help="Only leads created on or before this date (YYYY-MM-DD).")
+        parser.add_argument('--district')
+        parser.add_argument('--after-id', type=int, help="Resume after this lead id.")
+
+    def handle(self, *args, **options):
+        try:
+            queryset = export_queryset(
+                since=options['since'], until=options['until'],
+                district=options['district'], after_id=options['after_id'],
+            )
+        except ValueError as e:
+            raise CommandError(e)
+
+        chunks = stream_leads(queryset, options['format'])
+        if options['format'] == 'csv':
+            header = next(chunks)
+            if not options['after_id']:  # A resumed file already has its header row.
+                chunks = _prepend(header, chunks)
+
+        if not options['output']:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+
+        rows = 0
+        with open(options['output'], 'a' if options['after_id'] else 'w', encoding='utf-8', newline='') as out:
+            for chunk in chunks:
+                out.write(chunk)
+                rows += 1
+        if options['format'] == 'csv' and not options['after_id']:
+            rows -= 1
+        self.stderr.write(self.style.SUCCESS(f"Exported {rows} lead(s) to {options['output']}"))
+
+
+def _prepend(first, rest):
+    yield first
+    yield from rest
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.notifications import process_jobs, requeue_stale_jobs
+
+
+class Command(BaseCommand):
+    help = "Deliver queued lead notifications, retrying failures with exponential backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Process due jobs once and exit.")
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--interval', type=float, default=2.0, help="Seconds to sleep when the queue is empty.")
+
+    def handle(self, *args, **options):
+        while True:
+            requeued = requeue_stale_jobs()
+            if requeued:
+                self.stdout.write(self.style.WARNING(f"Requeued {requeued} stale job(s)"))
+
+            processed = process_jobs(options['batch_size'])
+            if processed:
+                self.stdout.write(f"Processed {processed} job(s)")
+
+            if options['once']:
+                break
+            if processed < options['batch_size']:
+                time.sleep(options['interval'])
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.faq_sync import DEFAULT_FAQ_FILE, load_faq_file, sync_faqs
+
+
+class Command(BaseCommand):
+    help = "Create, update and deactivate FAQs so they match a JSON/YAML file. Safe to run repeatedly."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default=DEFAULT_FAQ_FILE,
+            help="FAQ file: {category: [{question, answer}, ...]}. Defaults to core/data/faqs.json.",
+        )
+        parser.add_argument('--dry-run', action='store_true', help="Report what would change without writing.")
+
+    def handle(self, *args, **options):
+        try:
+            data = load_faq_file(options['path'])
+        except (OSError, ValueError) as e:
+            raise CommandError(e)
+
+        counts = sync_faqs(data, dry_run=options['dry_run'])
+        summary = ', '.join(f"{count} {action}" for action, count in counts.items())
+        prefix = "Dry run: " if options['dry_run'] else ""
+        self.stdout.write(self.style.SUCCESS(f"{prefix}{summary}"))
@@ -0,0 +1,221 @@
+"""Per-view request metrics, aggregated in-process and rendered as Prometheus text.
+
+MetricsMiddleware times each request and, while it runs, counts database
+queries and time spent rendering templates. Both hooks are installed once
+per process: an execute wrapper on every database connection (see
+install_query_counter) and a wrapper around django.template.base.Template.render.
+They find the request being measured through a ContextVar, which asgiref
+copies into sync_to_async threads, so queries the async ORM runs on another
+thread are counted too. Numbers are kept per process, so with several
+gunicorn workers each scrape of /metrics/ sees the worker that answered it.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.template import base as template_base
+
+# Upper bounds in seconds; Prometheus' default buckets.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+PREFIX = 'ayush_solar'
+UNRESOLVED = '<unresolved>'
+METHODS = frozenset(('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'))
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestStats:
+    """Counters for the request currently being handled."""
+
+    __slots__ = ('queries', 'query_seconds', 'template_seconds', 'rendering')
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.template_seconds = 0.0
+        self.rendering = False
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.query_seconds += time.perf_counter() - start
+
+
+class ViewMetrics:
+    __slots__ = ('buckets', 'count', 'seconds', 'queries', 'query_seconds', 'template_seconds', 'response_bytes')
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.seconds = 0.0
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.template_seconds = 0.0
+        self.response_bytes = 0
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.views = {}
+        self.requests = {}
+
+    def record(self, view, method, status, seconds, stats, response_bytes):
+        with self._lock:
+            metrics = self.views.get(view)
+            if metrics is None:
+                metrics = self.views[view] = ViewMetrics()
+            metrics.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            metrics.count += 1
+            metrics.seconds += seconds
+            metrics.queries += stats.queries
+            metrics.query_seconds += stats.query_seconds
+            metrics.template_seconds += stats.template_seconds
+            metrics.response_bytes += response_bytes
+            key = (view, method, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self.views.clear()
+            self.requests.clear()
+
+    def render(self):
+        """Everything recorded so far in the Prometheus text exposition format."""
+        with self._lock:
+            views = sorted(self.views.items())
+            requests = sorted(self.requests.items())
+            lines = []
+
+            def family(name, kind, help_text):
+                lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+                lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+
+            family('requests_total', 'counter', "Requests handled, by view, method and status.")
+            for (view, method, status), count in requests:
+                lines.append(f'{PREFIX}_requests_total{{view="{_escape(view)}",method="{method}",status="{status}"}} {count}')
+
+            family('request_duration_seconds', 'histogram', "Time from the first middleware to the response, by view.")
+            for view, m in views:
+                label = f'view="{_escape(view)}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), m.buckets):
+                    cumulative += count
+                    lines.append(f'{PREFIX}_request_duration_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+                lines.append(f'{PREFIX}_request_duration_seconds_sum{{{label}}} {m.seconds:.6f}')
+                lines.append(f'{PREFIX}_request_duration_seconds_count{{{label}}} {m.count}')
+
+            for name, attr, help_text in (
+                ('db_queries_total', 'queries', "Database queries run, by view."),
+                ('db_query_seconds_total', 'query_seconds', "Time spent in database queries, by view."),
+                ('template_render_seconds_total', 'template_seconds', "Time spent rendering templates, by view."),
+                ('response_bytes_total', 'response_bytes', "Response body bytes, by view (streamed bodies not counted)."),
+            ):
+                family(name, 'counter', help_text)
+                for view, m in views:
+                    value = getattr(m, attr)
+                    value = f'{value:.6f}' if isinstance(value, float) else value
+                    lines.append(f'{PREFIX}_{name}{{view="{_escape(view)}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"')
+
+
+registry = Registry()
+
+_original_render = template_base.Template.render
+
+
+def count_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    return stats(execute, sql, params, many, context)
+
+
+def install_query_counter(sender, connection, **kwargs):
+    """connection_created receiver: count this connection's queries for whichever request runs them.
+
+    Connections are per thread, so wrapping them from the middleware would
+    miss queries run in sync_to_async's thread pool.
+    """
+    if settings.METRICS_ENABLED and count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+def _timed_render(self, context):
+    # Only the outermost render is timed, so {% include %}/{% extends %} aren't counted twice.
+    stats = _current.get()
+    if stats is None or stats.rendering:
+        return _original_render(self, context)
+    stats.rendering = True
+    start = time.perf_counter()
+    try:
+        return _original_render(self, context)
+    finally:
+        stats.template_seconds += time.perf_counter() - start
+        stats.rendering = False
+
+
+class MetricsMiddleware:
+    """Record latency, query count/time, template time and response size per view.
+
+    Put it first in MIDDLEWARE so the latency covers the whole stack. With
+    METRICS_ENABLED=False it removes itself at startup and costs nothing.
+    Works in both sync (WSGI) and async (ASGI) stacks.
+
+    Note that __init__ replaces Template.render for the whole process; the
+    wrapper only does work while a request is being measured.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        template_base.Template.render = _timed_render
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.record(request, response, stats, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.record(request, response, stats, time.perf_counter() - start)
+
+    @staticmethod
+    def record(request, response, stats, seconds):
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match is not None else UNRESOLVED
+        size = 0 if response.streaming else len(response.content)
+        method = request.method if request.method in METHODS else 'OTHER'
+        registry.record(view, method, response.status_code, seconds, stats, size)
+        return response
@@ -0,0 +1,139 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from whitenoise.middleware import WhiteNoiseMiddleware as BaseWhiteNoiseMiddleware
+
+from .cache import get_cached_page, set_cached_page, variant_key
+from .compression import COMPRESSIBLE_TYPES, acompress_stream, choose_encoding, compress, compress_stream, minify_html
+
+# Not worth compressing; matches Django's GZipMiddleware.
+MIN_COMPRESS_LENGTH = 200
+
+# URL namespace whose HTML responses are minified.
+MINIFY_APP = 'core'
+
+
+class WhiteNoiseMiddleware(BaseWhiteNoiseMiddleware):
+    """WhiteNoise that also runs natively in an async (ASGI) middleware stack.
+
+    WhiteNoise's own middleware is sync-only, so under ASGI Django would run
+    it, and every request passing through it, via a worker thread. Here the
+    lookup stays in the event loop (it's a dict lookup unless autorefresh is
+    on) and only opening a matched file goes to a thread.
+
+    Relies on WhiteNoise internals (files, find_file, autorefresh, serve), so
+    whitenoise is pinned in requirements.txt; re-check this class when
+    upgrading it.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+class CompressionMiddleware:
+    """Minify the site's HTML and compress text responses with brotli or gzip, per Accept-Encoding.
+
+    A body that carries an ETag (on a URL without a query string) is cached
+    per encoding under that ETag, so a cached page is minified and compressed
+    once instead of on every visit.
+    Streaming responses are compressed chunk by chunk. Place it below
+    WhiteNoise, which serves its own precompressed static files.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        content_type = response.get('Content-Type', '').partition(';')[0].strip().lower()
+        if content_type not in COMPRESSIBLE_TYPES or response.has_header('Content-Encoding'):
+            return response
+        encoding = None
+        if settings.COMPRESS_RESPONSES:
+            patch_vary_headers(response, ('Accept-Encoding',))
+            encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+
+        if response.streaming:
+            if encoding:
+                stream = acompress_stream if response.is_async else compress_stream
+                response.streaming_content = stream(response.streaming_content, encoding)
+                del response.headers['Content-Length']
+                self.mark_encoded(response, encoding)
+            return response
+
+        minify = settings.HTML_MINIFY and content_type == 'text/html' and self.is_site_page(request)
+        if not (minify or encoding):
+            return response
+        key = None
+        etag = response.get('ETag')
+        # A query string could give every visitor their own cached copy, so only bare URLs are cached.
+        if etag and response.status_code == 200 and request.method in ('GET', 'HEAD') and not request.GET:
+            key = variant_key(request.path, etag, encoding or 'identity')
+        cached = get_cached_page(key) if key else None
+        if cached is None:
+            cached = self.encode(response, minify, encoding)
+            if key:
+                set_cached_page(key, cached)
+        encoding, response.content = cached
+        if response.has_header('Content-Length'):
+            response.headers['Content-Length'] = str(len(response.content))
+        if encoding:
+            self.mark_encoded(response, encoding)
+        return response
+
+    @staticmethod
+    def is_site_page(request):
+        # Only our own pages are minified; admin forms etc. pass through unchanged.
+        match = getattr(request, 'resolver_match', None)
+        return match is not None and match.app_name == MINIFY_APP
+
+    @staticmethod
+    def encode(response, minify, encoding):
+        """(encoding actually applied or None, body)."""
+        body = response.content
+        if minify:
+            body = minify_html(body.decode(response.charset)).encode(response.charset)
+        if encoding and len(body) >= MIN_COMPRESS_LENGTH:
+            compressed = compress(body, encoding)
+            if len(compressed) < len(body):
+                return encoding, compressed
+        return None, body
+
+    @staticmethod
+    def mark_encoded(response, encoding):
+        # Compressed bytes differ from the original, so a strong ETag becomes weak (RFC 9110 8.8.1).
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
@@ -0,0 +1,129 @@
+# Generated by Django 5.0.10 on 2026-10-18 07:06
+
+from django.db import migrations, models
+
+LEGACY_TABLES = {
+    'general': 'GeneralFAQ',
+    'subsidy': 'SubsidyFAQ',
+    'technical': 'TechnicalFAQ',
+    'installation': 'InstallationFAQ',
+}
+
+
+def copy_legacy_faqs(apps, schema_editor):
+    """Move rows from the four per-category tables into core_faq, keeping timestamps."""
+    qn = schema_editor.quote_name
+    faq_table = apps.get_model('core', 'FAQ')._meta.db_table
+    for category, model_name in LEGACY_TABLES.items():
+        legacy_table = apps.get_model('core', model_name)._meta.db_table
+        schema_editor.execute(
+            f"INSERT INTO {qn(faq_table)} (category, question, answer, is_active, created_at) "
+            f"SELECT %s, question, answer, is_active, created_at FROM {qn(legacy_table)} ORDER BY id",
+            [category],
+        )
+
+
+def restore_legacy_faqs(apps, schema_editor):
+    qn = schema_editor.quote_name
+    faq_table = apps.get_model('core', 'FAQ')._meta.db_table
+    for category, model_name in LEGACY_TABLES.items():
+        legacy_table = apps.get_model('core', model_name)._meta.db_table
+        schema_editor.execute(
+            f"INSERT INTO {qn(legacy_table)} (question, answer, is_active, created_at) "
+            f"SELECT question, answer, is_active, created_at FROM {qn(faq_table)} WHERE category = %s ORDER BY id",
+            [category],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_generalfaq_installationfaq_subsidyfaq_technicalfaq'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FAQ',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question', models.CharField(max_length=255)),
+                ('answer', models.TextField()),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('category', models.CharField(choices=[('general', 'General'), ('subsidy', 'Subsidy & Cost'), ('technical', 'Technical'), ('installation', 'Installation')], max_length=20)),
+            ],
+            options={
+                'verbose_name': 'FAQ',
+                'verbose_name_plural': 'FAQs',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='faq',
+            index=models.Index(fields=['category', 'is_active'], name='core_faq_category_active_idx'),
+        ),
+        migrations.RunPython(copy_legacy_faqs, restore_legacy_faqs),
+        migrations.DeleteModel(
+            name='GeneralFAQ',
+        ),
+        migrations.DeleteModel(
+            name='InstallationFAQ',
+        ),
+        migrations.DeleteModel(
+            name='SubsidyFAQ',
+        ),
+        migrations.DeleteModel(
+            name='TechnicalFAQ',
+        ),
+        migrations.CreateModel(
+            name='GeneralFAQ',
+            fields=[
+            ],
+            options={
+                'verbose_name': 'General FAQ',
+                'verbose_name_plural': 'General FAQs',
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('core.faq',),
+        ),
+        migrations.CreateModel(
+            name='InstallationFAQ',
+            fields=[
+            ],
+            options={
+                'verbose_name': 'Installation FAQ',
+                'verbose_name_plural': 'Installation FAQs',
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('core.faq',),
+        ),
+        migrations.CreateModel(
+            name='SubsidyFAQ',
+            fields=[
+            ],
+            options={
+                'verbose_name': 'Subsidy FAQ',
+                'verbose_name_plural': 'Subsidy FAQs',
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('core.faq',),
+        ),
+        migrations.CreateModel(
+            name='TechnicalFAQ',
+            fields=[
+            ],
+            options={
+                'verbose_name': 'Technical FAQ',
+                'verbose_name_plural': 'Technical FAQs',
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('core.faq',),
+        ),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 5.0.10 on 2026-10-18 07:18
+
+from django.db import migrations, models
+
+FTS_TABLE = 'core_consultationrequest_fts'
+LEAD_TABLE = 'core_consultationrequest'
+
+# External-content FTS5 index over full_name, kept in sync by triggers.
+CREATE_FTS = [
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+    f"full_name, content='{LEAD_TABLE}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {LEAD_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, full_name) VALUES (new.id, new.full_name); END",
+    f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {LEAD_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, full_name) VALUES ('delete', old.id, old.full_name); END",
+    f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF full_name ON {LEAD_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, full_name) VALUES ('delete', old.id, old.full_name); "
+    f"INSERT INTO {FTS_TABLE}(rowid, full_name) VALUES (new.id, new.full_name); END",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+DROP_FTS = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def create_lead_fts(apps, schema_editor):
+    """SQLite only; other backends (and SQLite builds without FTS5) fall back to icontains."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        if 'ENABLE_FTS5' not in {row[0] for row in cursor.fetchall()}:
+            return
+    for sql in CREATE_FTS:
+        schema_editor.execute(sql)
+
+
+def drop_lead_fts(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        for sql in DROP_FTS:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_notificationjob'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='consultationrequest',
+            index=models.Index(fields=['mobile_number'], name='core_lead_mobile_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consultationrequest',
+            index=models.Index(fields=['created_at'], name='core_lead_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consultationrequest',
+            index=models.Index(fields=['district', 'created_at'], name='core_lead_district_created_idx'),
+        ),
+        migrations.RunPython(create_lead_fts, drop_lead_fts),
+    ]
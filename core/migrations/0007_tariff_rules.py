@@ -0,0 +1,63 @@
+# Generated by Django 5.0.10 on 2026-10-18 07:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_default_rules(apps, schema_editor):
+    """The constants the calculator used before rules moved to the database."""
+    TariffRuleSet = apps.get_model('core', 'TariffRuleSet')
+    SubsidySlab = apps.get_model('core', 'SubsidySlab')
+    rule_set = TariffRuleSet.objects.create(
+        name='West Bengal residential', district='', tariff='7.50',
+        generation_per_kw='135.0', area_per_kw=100, cost_per_kw=65000,
+    )
+    SubsidySlab.objects.bulk_create([
+        SubsidySlab(rule_set=rule_set, min_kw=min_kw, amount=amount)
+        for min_kw, amount in (('1.00', 30000), ('2.00', 60000), ('3.00', 78000))
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_consultationrequest_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TariffRuleSet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('discom', models.CharField(blank=True, max_length=100)),
+                ('district', models.CharField(blank=True, help_text='Leave blank for the default rule set.', max_length=100, unique=True)),
+                ('tariff', models.DecimalField(decimal_places=2, help_text='₹ per unit', max_digits=6)),
+                ('generation_per_kw', models.DecimalField(decimal_places=1, help_text='Units per kW per month', max_digits=6)),
+                ('area_per_kw', models.PositiveIntegerField(help_text='Shadow-free sq ft per kW')),
+                ('cost_per_kw', models.PositiveIntegerField(help_text='Installed cost in ₹ per kW')),
+                ('is_active', models.BooleanField(default=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['district'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SubsidySlab',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('min_kw', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('amount', models.PositiveIntegerField(help_text='Subsidy in ₹')),
+                ('rule_set', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='subsidy_slabs', to='core.tariffruleset')),
+            ],
+            options={
+                'ordering': ['min_kw'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='subsidyslab',
+            constraint=models.UniqueConstraint(fields=('rule_set', 'min_kw'), name='core_slab_rule_set_min_kw_uniq'),
+        ),
+        migrations.RunPython(create_default_rules, migrations.RunPython.noop),
+    ]
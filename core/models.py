@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 class ConsultationRequest(models.Model):
     full_name = models.CharField(max_length=255)
@@ -8,14 +9,88 @@ class ConsultationRequest(models.Model):
     message = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        # Backing the admin changelist; name search goes through the FTS5
+        # table created in migration 0006 (see core/leads.py).
+        indexes = [
+            models.Index(fields=['mobile_number'], name='core_lead_mobile_idx'),
+            models.Index(fields=['created_at'], name='core_lead_created_idx'),
+            models.Index(fields=['district', 'created_at'], name='core_lead_district_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.full_name} - {self.mobile_number}"
 
+class NotificationJob(models.Model):
+    """One pending delivery of an event to one notifier backend."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    DEAD = 'dead'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (DEAD, 'Dead'),
+    ]
+
+    event = models.CharField(max_length=50)
+    backend = models.CharField(max_length=255)
+    payload = models.JSONField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='core_job_status_run_after_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event} via {self.backend} ({self.status})"
+
+class TariffRuleSet(models.Model):
+    """Calculator constants for one district's DISCOM. The rule set with a blank district is the default."""
+    name = models.CharField(max_length=100)
+    discom = models.CharField(max_length=100, blank=True)
+    district = models.CharField(max_length=100, blank=True, unique=True, help_text="Leave blank for the default rule set.")
+    tariff = models.DecimalField(max_digits=6, decimal_places=2, help_text="₹ per unit")
+    generation_per_kw = models.DecimalField(max_digits=6, decimal_places=1, help_text="Units per kW per month")
+    area_per_kw = models.PositiveIntegerField(help_text="Shadow-free sq ft per kW")
+    cost_per_kw = models.PositiveIntegerField(help_text="Installed cost in ₹ per kW")
+    is_active = models.BooleanField(default=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['district']
+
+    def __str__(self):
+        return f"{self.name} ({self.district or 'default'})"
+
+class SubsidySlab(models.Model):
+    """Systems of at least `min_kw` get `amount`; the highest matching slab applies."""
+    rule_set = models.ForeignKey(TariffRuleSet, on_delete=models.CASCADE, related_name='subsidy_slabs')
+    min_kw = models.DecimalField(max_digits=5, decimal_places=2)
+    amount = models.PositiveIntegerField(help_text="Subsidy in ₹")
+
+    class Meta:
+        ordering = ['min_kw']
+        constraints = [
+            models.UniqueConstraint(fields=['rule_set', 'min_kw'], name='core_slab_rule_set_min_kw_uniq'),
+        ]
+
+    def __str__(self):
+        return f"≥ {self.min_kw} kW: ₹{self.amount}"
+
 class FAQBase(models.Model):
     question = models.CharField(max_length=255)
     answer = models.TextField()
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         abstract = True
@@ -23,22 +98,116 @@ class FAQBase(models.Model):
     def __str__(self):
         return self.question
 
-class GeneralFAQ(FAQBase):
+class FAQQuerySet(models.QuerySet):
+    def active_by_category(self):
+        """Return active FAQs as {category: [{'id', 'question', 'answer'}, ...]} in one query."""
+        return self._group_by_category(self._active_rows())
+
+    async def aactive_by_category(self):
+        return self._group_by_category([row async for row in self._active_rows()])
+
+    def _active_rows(self):
+        return self.filter(is_active=True).order_by('category', 'id').values('id', 'category', 'question', 'answer')
+
+    @staticmethod
+    def _group_by_category(rows):
+        grouped = {category: [] for category, _ in FAQ.CATEGORY_CHOICES}
+        for row in rows:
+            category = row.pop('category')
+            grouped.setdefault(category, []).append(row)
+        return grouped
+
+    def active_page(self, category, after=None, limit=10):
+        """One keyset page of a category: ([{'id', 'question', 'answer'}, ...], id to pass as `after` or None).
+
+        Served straight from core_faq_category_active_idx (SQLite appends the
+        rowid to every index), however deep the page.
+        """
+        return self._split_page(list(self._page_rows(category, after, limit)), limit)
+
+    async def aactive_page(self, category, after=None, limit=10):
+        return self._split_page([row async for row in self._page_rows(category, after, limit)], limit)
+
+    def _page_rows(self, category, after, limit):
+        rows = self.filter(category=category, is_active=True)
+        if after is not None:
+            rows = rows.filter(id__gt=after)
+        return rows.order_by('id').values('id', 'question', 'answer')[:limit + 1]
+
+    @staticmethod
+    def _split_page(rows, limit):
+        next_after = rows[limit - 1]['id'] if len(rows) > limit else None
+        return rows[:limit], next_after
+
+class CategoryFAQManager(models.Manager.from_queryset(FAQQuerySet)):
+    """Restricts a per-category proxy model to its own rows."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(category=self.model.category_code)
+
+class FAQ(FAQBase):
+    GENERAL = 'general'
+    SUBSIDY = 'subsidy'
+    TECHNICAL = 'technical'
+    INSTALLATION = 'installation'
+    CATEGORY_CHOICES = [
+        (GENERAL, 'General'),
+        (SUBSIDY, 'Subsidy & Cost'),
+        (TECHNICAL, 'Technical'),
+        (INSTALLATION, 'Installation'),
+    ]
+
+    category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
+
+    # Set by the per-category proxies below.
+    category_code = None
+
+    objects = FAQQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "FAQ"
+        verbose_name_plural = "FAQs"
+        indexes = [
+            models.Index(fields=['category', 'is_active'], name='core_faq_category_active_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.category_code:
+            self.category = self.category_code
+        super().save(*args, **kwargs)
+
+class GeneralFAQ(FAQ):
+    category_code = FAQ.GENERAL
+    objects = CategoryFAQManager()
+
     class Meta:
+        proxy = True
         verbose_name = "General FAQ"
         verbose_name_plural = "General FAQs"
 
-class SubsidyFAQ(FAQBase):
+class SubsidyFAQ(FAQ):
+    category_code = FAQ.SUBSIDY
+    objects = CategoryFAQManager()
+
     class Meta:
+        proxy = True
         verbose_name = "Subsidy FAQ"
         verbose_name_plural = "Subsidy FAQs"
 
-class TechnicalFAQ(FAQBase):
+class TechnicalFAQ(FAQ):
+    category_code = FAQ.TECHNICAL
+    objects = CategoryFAQManager()
+
     class Meta:
+        proxy = True
         verbose_name = "Technical FAQ"
         verbose_name_plural = "Technical FAQs"
 
-class InstallationFAQ(FAQBase):
+class InstallationFAQ(FAQ):
+    category_code = FAQ.INSTALLATION
+    objects = CategoryFAQManager()
+
     class Meta:
+        proxy = True
         verbose_name = "Installation FAQ"
         verbose_name_plural = "Installation FAQs"
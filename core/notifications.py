@@ -0,0 +1,138 @@
+import json
+import logging
+import sys
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import NotificationJob
+
+logger = logging.getLogger(__name__)
+
+LEAD_CREATED = 'lead_created'
+
+# Sent by the local-memory backend, like django.core.mail.outbox in tests.
+outbox = []
+
+
+class BaseNotifier:
+    """Deliver one event. Raise any exception to have the job retried."""
+
+    def send(self, event, payload):
+        raise NotImplementedError
+
+
+class ConsoleNotifier(BaseNotifier):
+    """Write events to stdout; the default until real email/SMS/CRM backends are configured."""
+
+    def send(self, event, payload):
+        sys.stdout.write(f"[{event}] {json.dumps(payload, cls=DjangoJSONEncoder)}\n")
+        sys.stdout.flush()
+
+
+class FileNotifier(BaseNotifier):
+    """Append events as JSON lines to settings.LEAD_NOTIFICATION_FILE."""
+
+    def send(self, event, payload):
+        line = json.dumps({'event': event, 'payload': payload}, cls=DjangoJSONEncoder)
+        with open(settings.LEAD_NOTIFICATION_FILE, 'a', encoding='utf-8') as f:
+            f.write(line + '\n')
+
+
+class LocmemNotifier(BaseNotifier):
+    """Collect events in notifications.outbox; for tests."""
+
+    def send(self, event, payload):
+        outbox.append((event, payload))
+
+
+@lru_cache(maxsize=None)
+def get_notifier(path):
+    return import_string(path)()
+
+
+def lead_payload(lead):
+    return {
+        'id': lead.pk,
+        'full_name': lead.full_name,
+        'mobile_number': lead.mobile_number,
+        'district': lead.district,
+        'pin_code': lead.pin_code,
+        'message': lead.message,
+        'created_at': lead.created_at.isoformat(),
+    }
+
+
+def enqueue_lead_notifications(leads):
+    """Queue one job per lead per configured notifier. Call inside the lead's transaction."""
+    NotificationJob.objects.bulk_create([
+        NotificationJob(event=LEAD_CREATED, backend=backend, payload=lead_payload(lead))
+        for lead in leads
+        for backend in settings.LEAD_NOTIFIERS
+    ])
+
+
+def retry_delay(attempts):
+    """Exponential backoff: base, 2*base, 4*base, ... capped at one hour."""
+    return timedelta(seconds=min(settings.NOTIFICATION_RETRY_BASE_SECONDS * 2 ** (attempts - 1), 3600))
+
+
+def requeue_stale_jobs():
+    """Return jobs stuck in RUNNING (e.g. the worker was killed) to the queue."""
+    cutoff = timezone.now() - timedelta(seconds=settings.NOTIFICATION_STALE_SECONDS)
+    return NotificationJob.objects.filter(
+        status=NotificationJob.RUNNING, updated_at__lt=cutoff,
+    ).update(status=NotificationJob.PENDING, updated_at=timezone.now())
+
+
+def claim_jobs(limit):
+    """Mark up to `limit` due jobs as RUNNING and return them.
+
+    Each job is claimed with a conditional UPDATE, so several workers can poll
+    the same table without delivering a job twice (SQLite has no SKIP LOCKED).
+    """
+    due = NotificationJob.objects.filter(
+        status=NotificationJob.PENDING, run_after__lte=timezone.now(),
+    ).order_by('run_after', 'id').values_list('id', flat=True)[:limit]
+
+    claimed = []
+    for job_id in list(due):
+        updated = NotificationJob.objects.filter(id=job_id, status=NotificationJob.PENDING).update(
+            status=NotificationJob.RUNNING, attempts=F('attempts') + 1, updated_at=timezone.now(),
+        )
+        if updated:
+            claimed.append(job_id)
+    return list(NotificationJob.objects.filter(id__in=claimed).order_by('run_after', 'id'))
+
+
+def run_job(job):
+    """Deliver a claimed job, scheduling a retry or dead-lettering it on failure."""
+    try:
+        get_notifier(job.backend).send(job.event, job.payload)
+    except Exception as exc:
+        job.last_error = f"{type(exc).__name__}: {exc}"
+        if job.attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+            job.status = NotificationJob.DEAD
+            logger.error("Notification job %s is dead after %s attempts: %s", job.pk, job.attempts, job.last_error)
+        else:
+            job.status = NotificationJob.PENDING
+            job.run_after = timezone.now() + retry_delay(job.attempts)
+            logger.warning("Notification job %s failed (attempt %s): %s", job.pk, job.attempts, job.last_error)
+    else:
+        job.status = NotificationJob.DONE
+        job.last_error = ''
+    job.save(update_fields=['status', 'run_after', 'last_error', 'updated_at'])
+    return job.status
+
+
+def process_jobs(limit=50):
+    """Run one batch of due jobs. Returns the number processed."""
+    jobs = claim_jobs(limit)
+    for job in jobs:
+        run_job(job)
+    return len(jobs)
@@ -0,0 +1,133 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import JsonResponse
+
+
+def parse_rate(rate):
+    """'10/60' -> (capacity 10, refill 10 tokens per 60 seconds). Empty disables the limit."""
+    if not rate:
+        return None
+    count, seconds = rate.split('/')
+    return int(count), int(count) / float(seconds)
+
+
+def take_token(state, now, capacity, refill):
+    """Token bucket step: return (new state, seconds until a token is available or 0)."""
+    tokens, updated = state if state is not None else (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) * refill)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / refill
+
+
+class MemoryBackend:
+    """Buckets in this process only; bounded to the `maxsize` most recently seen keys."""
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key, capacity, refill):
+        with self._lock:
+            state, wait = take_token(self._buckets.get(key), time.monotonic(), capacity, refill)
+            self._buckets[key] = state
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return wait
+
+    async def ahit(self, key, capacity, refill):
+        return self.hit(key, capacity, refill)  # No I/O; the lock is only held briefly.
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBackend:
+    """Buckets in the default cache, shared by every worker using it (CACHE_BACKEND=file).
+
+    The read-modify-write isn't atomic, so concurrent hits from different
+    processes can occasionally both spend the last token; fine for abuse control.
+    """
+
+    prefix = 'ratelimit:'
+
+    def hit(self, key, capacity, refill):
+        cache_key = self.prefix + key
+        state, wait = take_token(cache.get(cache_key), time.time(), capacity, refill)
+        cache.set(cache_key, state, math.ceil(capacity / refill))
+        return wait
+
+    async def ahit(self, key, capacity, refill):
+        cache_key = self.prefix + key
+        state, wait = take_token(await cache.aget(cache_key), time.time(), capacity, refill)
+        await cache.aset(cache_key, state, math.ceil(capacity / refill))
+        return wait
+
+    def reset(self):
+        pass  # Entries expire once their bucket would be full again.
+
+
+BACKENDS = {'memory': MemoryBackend, 'cache': CacheBackend}
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    backend_class = BACKENDS[settings.RATELIMIT_BACKEND]
+    if not isinstance(_backend, backend_class):
+        _backend = backend_class()
+    return _backend
+
+
+def reset():
+    """Forget all in-process buckets (used by tests)."""
+    get_backend().reset()
+
+
+def hit(scope, key, rate):
+    """Spend one token from the `scope`/`key` bucket. Returns 0, or seconds to wait if it's empty."""
+    parsed = parse_rate(rate)
+    if parsed is None or not key:
+        return 0
+    return get_backend().hit(f'{scope}:{key}', *parsed)
+
+
+async def ahit(scope, key, rate):
+    """hit() for async views."""
+    parsed = parse_rate(rate)
+    if parsed is None or not key:
+        return 0
+    return await get_backend().ahit(f'{scope}:{key}', *parsed)
+
+
+def client_ip(request):
+    """The client's address as recorded by the outermost of RATELIMIT_TRUSTED_PROXIES proxies.
+
+    Each proxy appends the address it received the request from to
+    X-Forwarded-For, so anything left of those entries is client-supplied
+    and can't be trusted.
+    """
+    proxies = settings.RATELIMIT_TRUSTED_PROXIES
+    hops = [hop.strip() for hop in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if hop.strip()]
+    if proxies and hops:
+        return hops[-min(proxies, len(hops))]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def too_many_requests(retry_after):
+    """429 in the same {'success', 'errors'} shape the contact form already handles."""
+    response = JsonResponse({
+        'success': False,
+        'errors': {'general': 'Too many requests. Please wait a few minutes and try again.'},
+    }, status=429)
+    response['Retry-After'] = str(math.ceil(retry_after))
+    return response
@@ -0,0 +1,117 @@
+"""Tariff and subsidy rules, compiled from the database into in-memory lookups.
+
+The compiled rules are rebuilt when an admin edit bumps the rules version
+in the cache (see core.signals), which the editing worker and any worker
+sharing that cache see at once. Workers with their own cache (locmem) notice
+within RULES_RECHECK_SECONDS, when one aggregate query finds a rule set
+updated since the last compile. Other calculator requests never query the
+rule tables.
+"""
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, Max
+
+from .cache import get_rules_version
+from .models import TariffRuleSet
+
+
+class CompiledRules:
+    """One rule set with its subsidy slabs as sorted arrays for np.searchsorted."""
+
+    def __init__(self, tariff, generation_per_kw, area_per_kw, cost_per_kw, slabs, name='default'):
+        self.name = name
+        self.tariff = float(tariff)
+        self.generation_per_kw = float(generation_per_kw)
+        self.area_per_kw = float(area_per_kw)
+        self.cost_per_kw = int(cost_per_kw)
+        slabs = sorted((float(min_kw), int(amount)) for min_kw, amount in slabs)
+        self.slab_min_kw = np.array([min_kw for min_kw, _ in slabs], dtype=float)
+        # Index 0 is "below every slab".
+        self.slab_amounts = np.array([0] + [amount for _, amount in slabs], dtype=np.int64)
+
+    def subsidy(self, kw):
+        """Subsidy for system size(s) in kW: O(log slabs) per value."""
+        return self.slab_amounts[np.searchsorted(self.slab_min_kw, kw, side='right')]
+
+    @property
+    def signature(self):
+        """Everything that affects calculator output, for detecting stale precomputed grids."""
+        return [self.tariff, self.generation_per_kw, self.area_per_kw, self.cost_per_kw,
+                self.slab_min_kw.tolist(), self.slab_amounts.tolist()]
+
+    @classmethod
+    def from_model(cls, rule_set):
+        return cls(
+            rule_set.tariff, rule_set.generation_per_kw, rule_set.area_per_kw, rule_set.cost_per_kw,
+            [(slab.min_kw, slab.amount) for slab in rule_set.subsidy_slabs.all()],
+            name=rule_set.name,
+        )
+
+
+# Used when the database has no active default rule set.
+DEFAULT_RULES = CompiledRules(7.5, 135, 100, 65000, [(1, 30000), (2, 60000), (3, 78000)])
+
+
+class RuleBook:
+    """Compiled rule sets by district, falling back to the default."""
+
+    def __init__(self, default, by_district):
+        self.default = default
+        self.by_district = by_district
+
+    def for_district(self, district):
+        return self.by_district.get(normalize_district(district), self.default)
+
+    @classmethod
+    def from_database(cls):
+        default, by_district = DEFAULT_RULES, {}
+        for rule_set in TariffRuleSet.objects.filter(is_active=True).prefetch_related('subsidy_slabs'):
+            compiled = CompiledRules.from_model(rule_set)
+            if rule_set.district.strip():
+                by_district[normalize_district(rule_set.district)] = compiled
+            else:
+                default = compiled
+        return cls(default, by_district)
+
+
+def normalize_district(district):
+    return (district or '').strip().casefold()
+
+
+def rules_fingerprint():
+    """(rule set count, latest updated_at); slab edits touch their rule set (see core.signals)."""
+    aggregate = TariffRuleSet.objects.aggregate(count=Count('id'), updated=Max('updated_at'))
+    return aggregate['count'], aggregate['updated']
+
+
+_compiled = {'version': None, 'book': None, 'fingerprint': None, 'checked': 0.0}
+_compile_lock = threading.Lock()
+
+
+def get_rule_book():
+    """The current RuleBook, recompiled (two queries) only after the rules change."""
+    version = get_rules_version()
+    book = _compiled['book']
+    if (book is not None and _compiled['version'] == version
+            and time.monotonic() - _compiled['checked'] < settings.RULES_RECHECK_SECONDS):
+        return book
+    with _compile_lock:
+        if _compiled['book'] is None or _compiled['version'] != version:
+            _compile(version, rules_fingerprint())
+        elif time.monotonic() - _compiled['checked'] >= settings.RULES_RECHECK_SECONDS:
+            fingerprint = rules_fingerprint()
+            if fingerprint != _compiled['fingerprint']:
+                _compile(version, fingerprint)
+            else:
+                _compiled['checked'] = time.monotonic()
+        return _compiled['book']
+
+
+def _compile(version, fingerprint):
+    # The fingerprint is taken first, so an edit committed while compiling is caught by the next check.
+    _compiled.update(
+        book=RuleBook.from_database(), version=version, fingerprint=fingerprint, checked=time.monotonic(),
+    )
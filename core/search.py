@@ -0,0 +1,166 @@
+"""In-memory inverted index over active FAQs for /faqs/search/.
+
+Questions and answers are tokenized (Latin, Devanagari and Bengali script),
+lightly stemmed and indexed once per process. Saves and deletes update the
+index incrementally; other changes (bulk syncs, edits in another worker)
+are noticed by comparing against the cached FAQ state and trigger a rebuild.
+Ranking is BM25 with question matches weighted above answer matches.
+"""
+import bisect
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+
+from .cache import get_faq_state
+from .models import FAQ
+
+# \w misses Indic vowel signs and viramas (category Mn/Mc), so include the
+# Devanagari and Bengali blocks whole, minus the danda sentence marks.
+TOKEN_RE = re.compile(r'[\w\u0900-\u0963\u0966-\u09ff]+')
+
+STOPWORDS = frozenset("""
+    a an and are as at be by can do does for from how i if in is it my of on or so the to what when where which who
+    will with you your
+    का की के को में है हैं और से पर भी तो यह वह क्या कैसे
+    এবং এর কি কী কে তে থেকে না হয় আমি আমার
+""".split())
+
+# Longest first; a suffix is only stripped if enough of the word remains.
+SUFFIXES = sorted([
+    # English
+    'ational', 'ization', 'fulness', 'ousness', 'iveness', 'ations', 'ation', 'ments', 'ment', 'ness',
+    'ings', 'ing', 'ies', 'ied', 'edly', 'ed', 'ers', 'er', 'ly', 'es', 's', 'y',
+    # Hindi (after Ramanathan & Rao's lightweight stemmer)
+    'ियों', 'ाओं', 'ाएं', 'ाएँ', 'ियां', 'ियाँ', 'ों', 'ें', 'ाँ', 'ां', 'ाई', 'ीय', 'ता', 'ती', 'ते', 'ना', 'नी', 'ने',
+    'ि', 'ी', 'ा', 'े', 'ो', 'ु', 'ू',
+    # Bengali
+    'গুলো', 'গুলি', 'দের', 'েরা', 'ের', 'টি', 'টা', 'রা', 'কে', 'তে', 'ে',
+], key=len, reverse=True)
+
+QUESTION_WEIGHT = 2.0
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def stem(token):
+    for suffix in SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[:-len(suffix)]
+    return token
+
+
+def tokenize(text):
+    """Normalized, stemmed search terms in `text`, stopwords removed."""
+    text = unicodedata.normalize('NFC', text).casefold()
+    return [stem(token) for token in TOKEN_RE.findall(text) if token not in STOPWORDS]
+
+
+class FAQIndex:
+    def __init__(self):
+        self.documents = {}                 # id -> {'id', 'category', 'question', 'answer'}
+        self.postings = defaultdict(dict)   # term -> {id: weighted term frequency}
+        self.lengths = {}                   # id -> weighted document length
+        self.terms = []                     # sorted vocabulary, for prefix matches
+        self.state = None                   # get_faq_state() this index reflects
+        self._lock = threading.RLock()
+
+    def rebuild(self):
+        rows = FAQ.objects.filter(is_active=True).values('id', 'category', 'question', 'answer')
+        with self._lock:
+            self.state = get_faq_state()
+            self.documents.clear()
+            self.postings.clear()
+            self.lengths.clear()
+            for row in rows:
+                self._add(row)
+            self.terms = sorted(self.postings)
+
+    def update(self, faq):
+        """Reindex one saved FAQ (removing it if inactive)."""
+        with self._lock:
+            self._remove(faq.pk)
+            if faq.is_active:
+                self._add({'id': faq.pk, 'category': faq.category, 'question': faq.question, 'answer': faq.answer})
+            self.terms = sorted(self.postings)
+            self.state = None
+
+    def remove(self, faq_id):
+        with self._lock:
+            self._remove(faq_id)
+            self.terms = sorted(self.postings)
+            self.state = None
+
+    def _add(self, row):
+        weights = Counter()
+        for term in tokenize(row['question']):
+            weights[term] += QUESTION_WEIGHT
+        for term in tokenize(row['answer']):
+            weights[term] += 1
+        self.documents[row['id']] = row
+        self.lengths[row['id']] = sum(weights.values())
+        for term, weight in weights.items():
+            self.postings[term][row['id']] = weight
+
+    def _remove(self, faq_id):
+        if self.documents.pop(faq_id, None) is None:
+            return
+        self.lengths.pop(faq_id, None)
+        for term in [term for term, docs in self.postings.items() if faq_id in docs]:
+            del self.postings[term][faq_id]
+            if not self.postings[term]:
+                del self.postings[term]
+
+    def ensure_current(self):
+        """Rebuild if FAQs changed in a way the incremental updates didn't see."""
+        state = get_faq_state()
+        with self._lock:
+            if self.state is None and self.documents:
+                self.state = state  # Incremental updates brought us up to date.
+        if self.state != state:
+            self.rebuild()
+
+    def _expand(self, term, prefix):
+        if not prefix:
+            return [term] if term in self.postings else []
+        start = bisect.bisect_left(self.terms, term)
+        matches = []
+        for candidate in self.terms[start:start + 50]:
+            if not candidate.startswith(term):
+                break
+            matches.append(candidate)
+        return matches
+
+    def search(self, query, category=None, limit=10):
+        """Return [(score, document)] best first. The last word also matches as a prefix."""
+        words = tokenize(query)
+        if not words:
+            return []
+        with self._lock:
+            total = len(self.documents)
+            if not total:
+                return []
+            average_length = sum(self.lengths.values()) / total
+            scores = defaultdict(float)
+            for position, word in enumerate(words):
+                for term in self._expand(word, prefix=position == len(words) - 1):
+                    docs = self.postings[term]
+                    idf = math.log(1 + (total - len(docs) + 0.5) / (len(docs) + 0.5))
+                    for doc_id, tf in docs.items():
+                        norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[doc_id] / average_length)
+                        scores[doc_id] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+            ranked = [
+                (score, self.documents[doc_id]) for doc_id, score in scores.items()
+                if category is None or self.documents[doc_id]['category'] == category
+            ]
+        ranked.sort(key=lambda item: (-item[0], item[1]['id']))
+        return ranked[:limit]
+
+
+faq_index = FAQIndex()
+
+
+def search_faqs(query, category=None, limit=10):
+    faq_index.ensure_current()
+    return faq_index.search(query, category=category, limit=limit)
@@ -0,0 +1,27 @@
+# Rendered in the first response; build_css extracts the critical CSS from these.
+ABOVE_FOLD_TEMPLATES = (
+    'base.html',
+    'partials/_loader.html',
+    'partials/_navbar.html',
+    'partials/_hero.html',
+)
+
+# name -> (template, placeholder min-height in px). Sections whose markup is wired
+# up by scripts.js on DOMContentLoaded (stats counters, calculator sliders,
+# process scroll sync, contact form) are always rendered inline.
+DEFERRED_SECTIONS = {
+    'about': ('partials/_about.html', 900),
+    'benefits': ('partials/_benefits.html', 800),
+    'subsidy': ('partials/_subsidy.html', 700),
+    'eligibility': ('partials/_eligibility.html', 1400),
+    'documents': ('partials/_documents.html', 1200),
+    'faqs': ('partials/_faqs.html', 1000),
+    'footer': ('partials/_footer.html', 500),
+}
+
+# Partials rendered from database rows -> the context variable holding the
+# version of that data (set by views.get_home_context). Cached fragments of
+# every other partial only change on deploy (RELEASE_VERSION).
+FRAGMENT_VERSIONS = {
+    'partials/_faqs.html': 'faq_version',
+}
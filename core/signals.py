@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from .cache import bump_rules_version, invalidate_faq_caches
+from .db import on_connection_created
+from .export import export_home_page
+from .metrics import install_query_counter
+from .models import FAQ, GeneralFAQ, SubsidyFAQ, TechnicalFAQ, InstallationFAQ, SubsidySlab, TariffRuleSet
+from .search import faq_index
+
+# Signals are sent with the class that was saved, so the proxies need their own receivers.
+FAQ_MODELS = (FAQ, GeneralFAQ, SubsidyFAQ, TechnicalFAQ, InstallationFAQ)
+
+
+def faq_changed(sender, **kwargs):
+    """Any FAQ edit changes the landing page content.
+
+    Invalidated again on commit: until then other requests still read the
+    old rows and may put a stale page or FAQ state back into the cache.
+    """
+    invalidate_faq_caches()
+    transaction.on_commit(invalidate_faq_caches)
+    if settings.STATIC_EXPORT_ON_CHANGE:
+        queue_home_export()
+
+
+def queue_home_export():
+    """Re-export the landing page when the current transaction commits, once per transaction.
+
+    A bulk delete or sync_faqs run touches many FAQs; the export is a full
+    render plus brotli-11, so it is queued only once. robust=True logs a
+    failure instead of turning a write that already committed into a 500.
+    """
+    connection = transaction.get_connection()
+    if any(func is export_home_page for _, func, _ in connection.run_on_commit):
+        return
+    transaction.on_commit(export_home_page, robust=True)
+
+
+def reindex_faq(sender, instance, **kwargs):
+    transaction.on_commit(lambda: faq_index.update(instance))
+
+
+def unindex_faq(sender, instance, **kwargs):
+    faq_id = instance.pk  # Cleared once the delete finishes.
+    transaction.on_commit(lambda: faq_index.remove(faq_id))
+
+
+for model in FAQ_MODELS:
+    post_save.connect(faq_changed, sender=model, dispatch_uid=f'faq_changed_save_{model.__name__}')
+    post_delete.connect(faq_changed, sender=model, dispatch_uid=f'faq_changed_delete_{model.__name__}')
+    post_save.connect(reindex_faq, sender=model, dispatch_uid=f'reindex_faq_{model.__name__}')
+    post_delete.connect(unindex_faq, sender=model, dispatch_uid=f'unindex_faq_{model.__name__}')
+
+
+def rules_changed(sender, instance, **kwargs):
+    """Make every worker recompile its tariff/subsidy lookups on next use.
+
+    Bumped again on commit so no worker keeps rules it compiled from the
+    database before this transaction was visible. A slab edit also touches its
+    rule set, whose updated_at workers without a shared cache poll
+    (see core.rules.get_rule_book).
+    """
+    if sender is SubsidySlab:
+        TariffRuleSet.objects.filter(pk=instance.rule_set_id).update(updated_at=timezone.now())
+    bump_rules_version()
+    transaction.on_commit(bump_rules_version)
+
+
+for model in (TariffRuleSet, SubsidySlab):
+    post_save.connect(rules_changed, sender=model, dispatch_uid=f'rules_changed_save_{model.__name__}')
+    post_delete.connect(rules_changed, sender=model, dispatch_uid=f'rules_changed_delete_{model.__name__}')
+
+connection_created.connect(on_connection_created, dispatch_uid='sqlite_pragmas')
+connection_created.connect(install_query_counter, dispatch_uid='metrics_query_counter')
@@ -0,0 +1,11 @@
+from django import template
+
+from core import assets
+
+register = template.Library()
+
+
+@register.simple_tag
+def site_css_url():
+    """URL of the built stylesheet, or None in Tailwind CDN mode."""
+    return assets.site_css_url()
@@ -0,0 +1,55 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from core.images import FORMATS, load_manifest
+
+register = template.Library()
+
+MIME_TYPES = {'avif': 'image/avif', 'webp': 'image/webp'}
+
+
+@register.simple_tag
+def picture(path, alt='', sizes='100vw', **attrs):
+    """Render <picture> with AVIF/WebP srcsets, falling back to the original image.
+
+    Extra keyword arguments become attributes on the <img>, e.g.
+    {% picture 'images/logo.png' alt="Logo" class="h-12 w-auto" loading="lazy" %}
+    """
+    entry = load_manifest().get(path)
+    img_attrs = {'src': static(path), 'alt': alt, **attrs}
+    if entry:
+        img_attrs.setdefault('width', entry['width'])
+        img_attrs.setdefault('height', entry['height'])
+    img = format_html('<img {}>', format_html_join(' ', '{}="{}"', img_attrs.items()))
+    if not entry:
+        return img
+
+    sources = []
+    for fmt in FORMATS:
+        variants = entry['variants'].get(fmt)
+        if not variants:
+            continue
+        srcset = ', '.join(f"{static(v['path'])} {v['width']}w" for v in variants)
+        sources.append(format_html(
+            '<source type="{}" srcset="{}" sizes="{}">', MIME_TYPES[fmt], srcset, sizes,
+        ))
+    # display: contents keeps the <img> laid out as if <picture> were not there.
+    return format_html(
+        '<picture style="display: contents">{}{}</picture>',
+        format_html_join('', '{}', ((source,) for source in sources)),
+        img,
+    )
+
+
+@register.simple_tag
+def image_url(path, width, fmt='webp'):
+    """URL of the smallest variant at least `width` pixels wide, or the original."""
+    entry = load_manifest().get(path)
+    variants = entry['variants'].get(fmt) if entry else None
+    if not variants:
+        return static(path)
+    for variant in variants:
+        if variant['width'] >= width:
+            return static(variant['path'])
+    return static(variants[-1]['path'])
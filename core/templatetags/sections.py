@@ -0,0 +1,60 @@
+from django import template
+from django.conf import settings
+from django.urls import reverse
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from core import assets
+from core.cache import fragment_key, get_cached_page, set_cached_page
+from core.sections import DEFERRED_SECTIONS, FRAGMENT_VERSIONS
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def section(context, name):
+    """Include a below-the-fold partial, or a placeholder that scripts.js fills in on scroll."""
+    template_name, min_height = DEFERRED_SECTIONS[name]
+    if settings.DEFER_BELOW_FOLD:
+        return format_html(
+            '<div data-deferred-section="{}" style="min-height: {}px"></div>',
+            reverse('core:section', args=[name]), min_height,
+        )
+    return render_cached(context, template_name)
+
+
+@register.simple_tag(takes_context=True)
+def cached_include(context, template_name):
+    """Like {% include %}, but the output is cached per release (and data version, see FRAGMENT_VERSIONS)."""
+    return render_cached(context, template_name)
+
+
+def render_cached(context, template_name):
+    version = ''
+    if template_name in FRAGMENT_VERSIONS:
+        version = context.get(FRAGMENT_VERSIONS[template_name])
+        if version is None:
+            return render_partial(context, template_name)
+    if not settings.TEMPLATE_FRAGMENT_CACHE:
+        return render_partial(context, template_name)
+    key = fragment_key(template_name, version)
+    content = get_cached_page(key)
+    if content is None:
+        content = render_partial(context, template_name)
+        set_cached_page(key, content)
+    return mark_safe(content)
+
+
+def render_partial(context, template_name):
+    partial = context.template.engine.get_template(template_name)
+    with context.render_context.push_state(partial):
+        return mark_safe(partial.render(context))
+
+
+@register.simple_tag
+def critical_css():
+    """Inline critical CSS for the above-the-fold partials, when deferring the rest."""
+    if not settings.DEFER_BELOW_FOLD:
+        return ''
+    css = assets.critical_css()
+    return format_html('<style>{}</style>', mark_safe(css)) if css else ''
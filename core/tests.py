@@ -1,8 +1,55 @@
-from django.test import TestCase, Client
-from django.urls import reverse
-from .models import GeneralFAQ, ConsultationRequest
+import asyncio
+import gzip
+import importlib
+from datetime import timedelta
+import tempfile
+import threading
+from io import StringIO
+from unittest import skipUnless
+from pathlib import Path
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.template import Context, Template
+from django.templatetags.static import static
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.test import AsyncClient, SimpleTestCase, TestCase, TransactionTestCase, Client, override_settings
+from django.urls import clear_url_caches, resolve, reverse
+from django.utils import timezone
+from .models import (
+    FAQ, GeneralFAQ, SubsidyFAQ, TechnicalFAQ, InstallationFAQ, ConsultationRequest, NotificationJob,
+    SubsidySlab, TariffRuleSet,
+)
+from . import notifications
+from . import ratelimit
+from . import dedup
+from . import calculator
+from . import metrics
+from . import benchmark
+from . import compression
+from .rules import DEFAULT_RULES, get_rule_book
+from .export import export_home_page
+from .cache import FAQ_STATE_KEY, HOME_PAGE_KEY, fragment_key, get_cached_page, invalidate_faq_caches, set_cached_page, variant_key
+from .ingest import LeadBatcher, get_batcher
+from . import views
+from .dedup import RecentLeadIndex, find_duplicate, get_index, remember
+from .db import configure_sqlite
+from .search import faq_index, tokenize
+from .leads import normalize_mobile, search_leads
+from .admin import EstimatedCountPaginator
 from .forms import ConsultationForm
+from .assets import extract_critical_css, write_hashed_css
+from .images import supported_formats
+import csv
 import json
+import re
+import shutil
+import sqlite3
+import sys
 
 class ModelTests(TestCase):
     def test_general_faq_creation(self):
@@ -20,6 +67,22 @@ class ModelTests(TestCase):
         )
         self.assertEqual(str(req), "John Doe - 1234567890")
 
+class FAQModelTests(TestCase):
+    def test_proxy_sets_category(self):
+        faq = SubsidyFAQ.objects.create(question="Subsidy Q?", answer="A")
+        self.assertEqual(FAQ.objects.get(pk=faq.pk).category, FAQ.SUBSIDY)
+        self.assertFalse(GeneralFAQ.objects.filter(pk=faq.pk).exists())
+
+    def test_active_by_category_single_query(self):
+        g1 = GeneralFAQ.objects.create(question="G1?", answer="A")
+        GeneralFAQ.objects.create(question="G2?", answer="A", is_active=False)
+        SubsidyFAQ.objects.create(question="S1?", answer="A")
+        with self.assertNumQueries(1):
+            grouped = FAQ.objects.active_by_category()
+        self.assertEqual(grouped[FAQ.GENERAL], [{'id': g1.pk, 'question': "G1?", 'answer': "A"}])
+        self.assertEqual(len(grouped[FAQ.SUBSIDY]), 1)
+        self.assertEqual(grouped[FAQ.INSTALLATION], [])
+
 class FormTests(TestCase):
     def test_valid_consultation_form(self):
         data = {
@@ -59,17 +122,24 @@ class ViewTests(TestCase):
         self.client = Client()
         self.home_url = reverse('core:home')
         self.submit_url = reverse('core:submit_consultation')
+        ratelimit.reset()
+        dedup.reset()
         
         # Create some FAQs for the home page test
         GeneralFAQ.objects.create(question="Q1?", answer="A1")
 
     def test_home_view(self):
-        response = self.client.get(self.home_url)
+        cache.clear()
+        # One aggregate for the ETag/Last-Modified validators, one for the FAQs.
+        with self.assertNumQueries(2):
+            response = self.client.get(self.home_url)
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'index.html')
         # Check context
         self.assertIn('general_faqs', response.context)
         self.assertEqual(len(response.context['general_faqs']), 1)
+        # The favicon stays a PNG; only content images get AVIF/WebP variants.
+        self.assertContains(response, f'<link rel="icon" type="image/png" href="{static("images/favicon_rounded.png")}" />')
 
     def test_submit_consultation_success(self):
         data = {
@@ -233,3 +303,1564 @@ class FrontendIntegrationTests(TestCase):
             self.assertIn('function toggleMobileMenu', js_content, "toggleMobileMenu function not found in scripts.js")
         except FileNotFoundError:
             self.fail("static/js/scripts.js file not found")
+
+class HomePageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.home_url = reverse('core:home')
+        self.faq = GeneralFAQ.objects.create(question="Cached Q?", answer="Cached A")
+
+    def test_second_request_served_from_cache(self):
+        first = self.client.get(self.home_url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.home_url)
+        self.assertTemplateNotUsed(second, 'index.html')
+        self.assertEqual(first.content, second.content)
+
+    def test_cached_response_sets_csrf_cookie(self):
+        self.client.get(self.home_url)
+        response = Client().get(self.home_url)
+        self.assertIn('csrftoken', response.cookies)
+
+    def test_faq_save_invalidates_cache(self):
+        self.client.get(self.home_url)
+        GeneralFAQ.objects.create(question="Fresh Q?", answer="Fresh A")
+        response = self.client.get(self.home_url)
+        self.assertContains(response, "Fresh Q?")
+
+    def test_faq_delete_invalidates_cache(self):
+        self.client.get(self.home_url)
+        self.faq.delete()
+        response = self.client.get(self.home_url)
+        self.assertNotContains(response, "Cached Q?")
+
+    def test_cache_refilled_before_commit_is_invalidated(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.faq.question = "Edited Q?"
+                self.faq.save()
+                # Stands in for a concurrent request caching the page before the commit.
+                set_cached_page(HOME_PAGE_KEY, 'stale')
+                set_cached_page(FAQ_STATE_KEY, {'count': 0, 'last_modified': None})
+        self.assertIsNone(get_cached_page(HOME_PAGE_KEY))
+        self.assertIsNone(get_cached_page(FAQ_STATE_KEY))
+        self.assertContains(self.client.get(self.home_url), "Edited Q?")
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.home_url = reverse('core:home')
+        self.faq = GeneralFAQ.objects.create(question="Etag Q?", answer="Etag A")
+
+    def test_validators_present(self):
+        response = self.client.get(self.home_url)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+
+    def test_if_none_match_returns_304_without_rendering(self):
+        etag = self.client.get(self.home_url)['ETag']
+        cache.clear()
+        self.client.get(self.home_url, HTTP_IF_NONE_MATCH=etag)  # warm the FAQ state only
+        with self.assertNumQueries(0):
+            response = self.client.get(self.home_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertTemplateNotUsed(response, 'index.html')
+        self.assertEqual(response.content, b'')
+
+    def test_if_modified_since_returns_304(self):
+        last_modified = self.client.get(self.home_url)['Last-Modified']
+        response = self.client.get(self.home_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+        self.assertTemplateNotUsed(response, 'index.html')
+
+    def test_faq_edit_changes_etag(self):
+        etag = self.client.get(self.home_url)['ETag']
+        self.faq.answer = "Changed"
+        self.faq.save()
+        response = self.client.get(self.home_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_restart_changes_etag(self):
+        etag = self.client.get(self.home_url)['ETag']
+        self.assertEqual(self.client.get(self.home_url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        # A deploy restarts the process; RELEASE_VERSION stays at its default.
+        self.addCleanup(setattr, views, 'PROCESS_STARTED_AT', views.PROCESS_STARTED_AT)
+        views.PROCESS_STARTED_AT += timedelta(minutes=5)
+        response = self.client.get(self.home_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class StaticExportTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.output_dir = Path(tmp.name)
+        GeneralFAQ.objects.create(question="Exported Q?", answer="Exported A")
+
+    def test_export_writes_compressed_variants(self):
+        call_command('export_home', output_dir=str(self.output_dir), stdout=StringIO())
+        html = (self.output_dir / 'index.html').read_bytes()
+        self.assertIn(b"Exported Q?", html)
+        self.assertIn(b'id="consultation-form"', html)
+        self.assertEqual(gzip.decompress((self.output_dir / 'index.html.gz').read_bytes()), html)
+
+    def test_faq_change_reexports_on_commit(self):
+        with override_settings(STATIC_EXPORT_ON_CHANGE=True, STATIC_EXPORT_ROOT=self.output_dir):
+            with self.captureOnCommitCallbacks(execute=True):
+                GeneralFAQ.objects.create(question="Later Q?", answer="Later A")
+        self.assertIn(b"Later Q?", (self.output_dir / 'index.html').read_bytes())
+
+    def test_one_export_per_transaction(self):
+        with override_settings(STATIC_EXPORT_ON_CHANGE=True, STATIC_EXPORT_ROOT=self.output_dir):
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                with transaction.atomic():
+                    for i in range(3):
+                        GeneralFAQ.objects.create(question=f"Bulk Q{i}?", answer="Bulk A")
+                    GeneralFAQ.objects.filter(question="Exported Q?").delete()
+        self.assertEqual(callbacks.count(export_home_page), 1)
+        html = (self.output_dir / 'index.html').read_bytes()
+        self.assertIn(b"Bulk Q2?", html)
+        self.assertNotIn(b"Exported Q?", html)
+
+    def test_export_failure_is_logged(self):
+        not_a_dir = self.output_dir / 'index'
+        not_a_dir.write_text('')
+        with override_settings(STATIC_EXPORT_ON_CHANGE=True, STATIC_EXPORT_ROOT=not_a_dir):
+            with self.assertLogs(level='ERROR'), self.captureOnCommitCallbacks(execute=True):
+                GeneralFAQ.objects.create(question="Saved anyway?", answer="Yes")
+        self.assertTrue(GeneralFAQ.objects.filter(question="Saved anyway?").exists())
+
+    def test_csrf_endpoint_sets_cookie(self):
+        response = Client().get(reverse('core:csrf'))
+        self.assertEqual(response.status_code, 204)
+        self.assertIn('csrftoken', response.cookies)
+
+class ResponsiveImageTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.static_root = Path(tmp.name)
+        (self.static_root / 'images').mkdir()
+        self.build_dir = self.static_root / 'build' / 'images'
+        settings_override = override_settings(
+            STATICFILES_DIRS=[self.static_root], IMAGE_BUILD_DIR=self.build_dir,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def render(self, source):
+        return Template("{% load images %}" + source).render(Context())
+
+    def test_picture_without_manifest_falls_back_to_img(self):
+        html = self.render("{% picture 'images/logo.png' alt='Logo' class='h-12' %}")
+        self.assertNotIn('<picture', html)
+        self.assertIn('src="/static/images/logo.png"', html)
+        self.assertIn('class="h-12"', html)
+
+    def test_picture_with_manifest_emits_srcset(self):
+        self.build_dir.mkdir(parents=True)
+        (self.build_dir / 'manifest.json').write_text(json.dumps({
+            'images/logo.png': {'width': 640, 'height': 320, 'variants': {
+                'webp': [
+                    {'width': 320, 'path': 'build/images/logo-320.aaa.webp'},
+                    {'width': 640, 'path': 'build/images/logo-640.bbb.webp'},
+                ],
+            }},
+        }))
+        html = self.render("{% picture 'images/logo.png' alt='Logo' sizes='48px' %}")
+        self.assertIn('<source type="image/webp" srcset="/static/build/images/logo-320.aaa.webp 320w, '
+                      '/static/build/images/logo-640.bbb.webp 640w" sizes="48px">', html)
+        self.assertIn('width="640" height="320"', html)
+        self.assertEqual(
+            self.render("{% image_url 'images/logo.png' 64 %}"), '/static/build/images/logo-320.aaa.webp',
+        )
+
+    @skipUnless(supported_formats(), "Pillow with WebP/AVIF support is not installed")
+    def test_build_images_command(self):
+        from PIL import Image
+
+        Image.new('RGB', (400, 200), 'orange').save(self.static_root / 'images' / 'sun.png')
+        call_command('build_images', widths=[100, 800], stdout=StringIO())
+        manifest = json.loads((self.build_dir / 'manifest.json').read_text())
+        for fmt, variants in manifest['images/sun.png']['variants'].items():
+            self.assertEqual([v['width'] for v in variants], [100, 400])
+            for variant in variants:
+                self.assertTrue((self.static_root / variant['path']).exists())
+
+class TailwindBuildModeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.static_root = Path(tmp.name)
+        self.css_dir = self.static_root / 'build' / 'css'
+
+    def test_cdn_mode_is_default(self):
+        content = self.client.get(reverse('core:home')).content.decode()
+        self.assertIn('cdn.tailwindcss.com', content)
+
+    def test_build_mode_links_hashed_stylesheet(self):
+        with override_settings(STATICFILES_DIRS=[self.static_root], CSS_BUILD_DIR=self.css_dir):
+            path = write_hashed_css('.a{color:red}', self.css_dir)
+            with override_settings(TAILWIND_MODE='build'):
+                content = self.client.get(reverse('core:home')).content.decode()
+        self.assertRegex(path.name, r'^site\.[0-9a-f]{12}\.css$')
+        self.assertIn(f'/static/build/css/{path.name}', content)
+        self.assertNotIn('cdn.tailwindcss.com', content)
+
+    def test_build_css_command(self):
+        for name in ('css', 'js'):
+            shutil.copytree(Path(settings.STATICFILES_DIRS[0]) / name, self.static_root / name)
+        # Stands in for the Tailwind CLI: checks the arguments and writes a tiny stylesheet.
+        fake_cli = self.static_root / 'fake_tailwind.py'
+        fake_cli.write_text(
+            "import sys\n"
+            "args = sys.argv[1:]\n"
+            "assert args[args.index('--config') + 1].endswith('tailwind.config.js')\n"
+            "assert '@tailwind utilities' in open(args[args.index('--input') + 1]).read()\n"
+            "with open(args[args.index('--output') + 1], 'w') as f:\n"
+            "    f.write('.flex{display:flex}.unused-xyz{color:red}')\n"
+        )
+        with override_settings(STATICFILES_DIRS=[self.static_root], CSS_BUILD_DIR=self.css_dir):
+            call_command('build_css', cli=f'{sys.executable} {fake_cli}', stdout=StringIO())
+        manifest = json.loads((self.css_dir / 'manifest.json').read_text())
+        site_css = (self.static_root / manifest['site.css']).read_text()
+        self.assertEqual(site_css, '.flex{display:flex}.unused-xyz{color:red}')
+        self.assertEqual((self.css_dir / 'critical.css').read_text(), '.flex{display:flex}')
+
+    def test_build_css_without_cli(self):
+        with self.assertRaisesMessage(CommandError, 'not found'):
+            call_command('build_css', cli='no-such-tailwindcss', stdout=StringIO())
+
+    def test_build_mode_without_manifest_falls_back_to_cdn(self):
+        with override_settings(TAILWIND_MODE='build', CSS_BUILD_DIR=self.css_dir):
+            with self.assertLogs('core.assets', level='WARNING'):
+                content = self.client.get(reverse('core:home')).content.decode()
+        self.assertIn('cdn.tailwindcss.com', content)
+
+class ManifestStaticFilesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        tmp = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(tmp.cleanup)
+        # Collect only the checked-in sources: no admin assets or locally built image variants.
+        static_dir = Path(tmp.name) / 'static'
+        for name in ('css', 'js', 'images'):
+            shutil.copytree(Path(settings.STATICFILES_DIRS[0]) / name, static_dir / name)
+        storages = {
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+            'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+        }
+        settings_override = override_settings(
+            STATICFILES_DIRS=[static_dir],
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+            STATIC_ROOT=Path(tmp.name) / 'staticfiles',
+            IMAGE_BUILD_DIR=static_dir / 'build' / 'images',
+            STORAGES=storages,
+        )
+        settings_override.enable()
+        cls.addClassCleanup(settings_override.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_home_references_hashed_urls(self):
+        content = self.client.get(reverse('core:home')).content.decode()
+        self.assertRegex(content, r'/static/js/scripts\.[0-9a-f]{12}\.js')
+        self.assertNotIn('/static/js/scripts.js', content)
+
+    def test_hashed_files_are_served_compressed_and_immutable(self):
+        content = self.client.get(reverse('core:home')).content.decode()
+        url = re.search(r'/static/js/scripts\.[0-9a-f]{12}\.js', content).group()
+        response = Client().get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('immutable', response['Cache-Control'])
+        response.close()
+
+@override_settings(DEFER_BELOW_FOLD=True)
+class DeferredSectionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        GeneralFAQ.objects.create(question="Deferred Q?", answer="Deferred A")
+
+    def test_home_renders_placeholders_for_below_the_fold(self):
+        response = self.client.get(reverse('core:home'))
+        self.assertContains(response, 'data-deferred-section="/sections/eligibility/"')
+        self.assertNotContains(response, 'id="eligibility"')
+        self.assertNotContains(response, "Deferred Q?")
+        # Sections wired up by scripts.js on load stay inline.
+        self.assertContains(response, 'id="calculator"')
+        self.assertContains(response, 'id="consultation-form"')
+
+    def test_section_endpoint_returns_cacheable_fragment(self):
+        response = self.client.get(reverse('core:section', args=['faqs']))
+        self.assertContains(response, "Deferred Q?")
+        self.assertNotContains(response, '<html')
+        self.assertIn('public', response['Cache-Control'])
+        self.assertEqual(
+            self.client.get(reverse('core:section', args=['faqs']), HTTP_IF_NONE_MATCH=response['ETag']).status_code,
+            304,
+        )
+
+    def test_faq_change_invalidates_faq_fragment(self):
+        self.client.get(reverse('core:section', args=['faqs']))
+        GeneralFAQ.objects.create(question="Newer Q?", answer="A")
+        self.assertContains(self.client.get(reverse('core:section', args=['faqs'])), "Newer Q?")
+
+    def test_unknown_section_404(self):
+        self.assertEqual(self.client.get(reverse('core:section', args=['admin'])).status_code, 404)
+
+
+class CriticalCSSTests(SimpleTestCase):
+    def test_keeps_only_rules_for_used_selectors(self):
+        css = (
+            "/* c */*{box-sizing:border-box}.hero{a:1}.unused{b:2}.md\\:py-20{c:3}"
+            "@media (min-width:768px){.md\\:py-20{d:4}.unused{e:5}}"
+            "#page-loader img{f:6}@keyframes spin{to{transform:rotate(1turn)}}"
+        )
+        critical = extract_critical_css(css, {'hero', 'md:py-20'}, {'page-loader'})
+        self.assertEqual(
+            critical,
+            "*{box-sizing:border-box}.hero{a:1}.md\\:py-20{c:3}"
+            "@media (min-width:768px){.md\\:py-20{d:4}}"
+            "#page-loader img{f:6}@keyframes spin{to{transform:rotate(1turn)}}",
+        )
+
+    def test_escaped_selectors(self):
+        css = (
+            ".text-\\[\\#111827\\]{color:#111827}.bg-\\[\\#fff\\]{a:1}"
+            ".\\32xl\\:text-5xl{b:2}.\\31 0\\/10{c:3}.\\33xl\\:p-1{d:4}"
+            "a[href=\"#top\"]{e:5}.w-1\\.5{f:6}"
+        )
+        critical = extract_critical_css(css, {'text-[#111827]', '2xl:text-5xl', '10/10', 'w-1.5'}, set())
+        self.assertEqual(
+            critical,
+            ".text-\\[\\#111827\\]{color:#111827}.\\32xl\\:text-5xl{b:2}.\\31 0\\/10{c:3}"
+            "a[href=\"#top\"]{e:5}.w-1\\.5{f:6}",
+        )
+
+class FailingNotifier(notifications.BaseNotifier):
+    def send(self, event, payload):
+        raise ConnectionError("CRM unavailable")
+
+
+@override_settings(
+    LEAD_NOTIFIERS=['core.notifications.LocmemNotifier'],
+    NOTIFICATION_MAX_ATTEMPTS=3,
+    NOTIFICATION_RETRY_BASE_SECONDS=10,
+)
+class NotificationQueueTests(TestCase):
+    def setUp(self):
+        notifications.outbox.clear()
+        ratelimit.reset()
+        dedup.reset()
+        self.lead_data = {
+            'full_name': 'Queue User',
+            'mobile_number': '9000000001',
+            'district': 'Nadia',
+            'pin_code': '741101',
+        }
+
+    def test_submit_enqueues_without_delivering(self):
+        response = self.client.post(reverse('core:submit_consultation'), self.lead_data)
+        self.assertEqual(response.status_code, 200)
+        job = NotificationJob.objects.get()
+        self.assertEqual(job.status, NotificationJob.PENDING)
+        self.assertEqual(job.payload['mobile_number'], '9000000001')
+        self.assertEqual(notifications.outbox, [])
+
+    def test_worker_delivers_pending_jobs(self):
+        self.client.post(reverse('core:submit_consultation'), self.lead_data)
+        call_command('process_notifications', once=True, stdout=StringIO())
+        self.assertEqual(len(notifications.outbox), 1)
+        self.assertEqual(notifications.outbox[0][0], notifications.LEAD_CREATED)
+        self.assertEqual(NotificationJob.objects.get().status, NotificationJob.DONE)
+
+    @override_settings(LEAD_NOTIFIERS=['core.tests.FailingNotifier'])
+    def test_failures_back_off_then_dead_letter(self):
+        self.client.post(reverse('core:submit_consultation'), self.lead_data)
+        job = NotificationJob.objects.get()
+
+        self.assertEqual(notifications.process_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (NotificationJob.PENDING, 1))
+        self.assertIn("CRM unavailable", job.last_error)
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=5))
+        # Not due yet, so nothing is picked up.
+        self.assertEqual(notifications.process_jobs(), 0)
+
+        for attempt in (2, 3):
+            NotificationJob.objects.update(run_after=timezone.now())
+            notifications.process_jobs()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (NotificationJob.DEAD, 3))
+
+    def test_job_is_claimed_once(self):
+        self.client.post(reverse('core:submit_consultation'), self.lead_data)
+        self.assertEqual(len(notifications.claim_jobs(10)), 1)
+        self.assertEqual(notifications.claim_jobs(10), [])
+
+@override_settings(LEAD_NOTIFIERS=['core.notifications.LocmemNotifier'])
+class BatchedIngestTests(TransactionTestCase):
+    def make_lead(self, i):
+        return ConsultationRequest(
+            full_name=f"Burst {i}", mobile_number=f"90000{i:05d}", district="Hooghly", pin_code="712101",
+        )
+
+    def submit_concurrently(self, batcher, count):
+        results, errors = [], []
+
+        def worker(i):
+            try:
+                results.append(batcher.submit(self.make_lead(i)))
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, errors
+
+    def test_concurrent_submissions_share_transactions(self):
+        batcher = LeadBatcher(max_batch_size=10, max_wait=0.2)
+        results, errors = self.submit_concurrently(batcher, 25)
+        self.assertEqual(errors, [])
+        self.assertEqual(ConsultationRequest.objects.count(), 25)
+        self.assertEqual(NotificationJob.objects.count(), 25)
+        # Every caller got its committed row back.
+        self.assertTrue(all(lead.pk for lead in results))
+        self.assertLess(batcher.batches_flushed, 25)
+
+    def test_repeats_within_a_batch_share_one_row(self):
+        batcher = LeadBatcher(max_batch_size=10, max_wait=0.5)
+        original = self.make_lead
+        self.make_lead = lambda i: original(0)
+        results, errors = self.submit_concurrently(batcher, 5)
+        self.assertEqual(errors, [])
+        self.assertEqual(ConsultationRequest.objects.count(), 1)
+        self.assertEqual({lead.pk for lead in results}, {ConsultationRequest.objects.get().pk})
+
+    def test_failed_flush_is_reported_to_every_submitter(self):
+        batcher = LeadBatcher(max_batch_size=5, max_wait=0.1)
+        bad = self.make_lead(0)
+        bad.full_name = None  # NOT NULL violation fails the whole batch
+        with self.assertRaises(Exception):
+            batcher.submit(bad)
+        self.assertEqual(ConsultationRequest.objects.count(), 0)
+        self.assertEqual(batcher.submit(self.make_lead(1)).full_name, "Burst 1")
+
+    @override_settings(LEAD_INGEST_MODE='batched', LEAD_BATCH_MAX_WAIT_MS=1)
+    def test_view_in_batched_mode(self):
+        ratelimit.reset()
+        dedup.reset()
+        response = self.client.post(reverse('core:submit_consultation'), {
+            'full_name': 'Batch View', 'mobile_number': '9123456780', 'district': 'Howrah', 'pin_code': '711101',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(ConsultationRequest.objects.filter(full_name='Batch View').exists())
+
+
+class SQLiteTransactionModeTests(TransactionTestCase):
+    def test_atomic_begins_immediate(self):
+        with CaptureQueriesContext(connection) as queries, transaction.atomic():
+            ConsultationRequest.objects.create(
+                full_name="Asha", mobile_number="9876543210", district="Nadia", pin_code="741101",
+            )
+        self.assertEqual(queries.captured_queries[0]['sql'], f"BEGIN {settings.SQLITE_TRANSACTION_MODE}")
+        self.assertEqual(settings.SQLITE_TRANSACTION_MODE, 'IMMEDIATE')
+
+
+class SQLiteTuningTests(TestCase):
+    """Run against a throwaway database file; the test database lives in memory."""
+
+    # Production pragmas; DEBUG keeps the rollback journal by default.
+    PRAGMAS = dict(settings.SQLITE_PRAGMAS, journal_mode='WAL')
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / 'leads.sqlite3'
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT sql FROM sqlite_master WHERE name = 'core_consultationrequest'")
+            self.schema = cursor.fetchone()[0]
+
+    def open(self, pragmas):
+        raw = sqlite3.connect(self.path, timeout=0, isolation_level=None)
+        self.addCleanup(raw.close)
+        configure_sqlite(raw, pragmas)
+        return raw
+
+    def read_during_insert(self, pragmas):
+        writer = self.open(pragmas)
+        writer.execute(self.schema)
+        reader = self.open(dict(pragmas, busy_timeout=0))
+        writer.execute("BEGIN EXCLUSIVE")
+        writer.execute(
+            "INSERT INTO core_consultationrequest (full_name, mobile_number, district, pin_code, message, created_at) "
+            "VALUES ('Asha', '9876543210', 'Nadia', '741101', '', '2024-01-01')"
+        )
+        try:
+            return reader.execute("SELECT COUNT(*) FROM core_consultationrequest").fetchone()[0]
+        finally:
+            writer.execute("COMMIT")
+
+    def test_pragmas_applied(self):
+        raw = self.open(self.PRAGMAS)
+        self.assertEqual(raw.execute("PRAGMA journal_mode").fetchone()[0], 'wal')
+        self.assertEqual(raw.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+        self.assertEqual(raw.execute("PRAGMA busy_timeout").fetchone()[0], settings.SQLITE_PRAGMAS['busy_timeout'])
+
+    def test_readers_not_blocked_by_insert_in_wal_mode(self):
+        # The reader sees the last committed state instead of waiting for the writer.
+        self.assertEqual(self.read_during_insert(self.PRAGMAS), 0)
+
+    def test_readers_blocked_by_insert_in_rollback_journal_mode(self):
+        with self.assertRaisesRegex(sqlite3.OperationalError, 'locked'):
+            self.read_during_insert({'journal_mode': 'DELETE'})
+
+    def test_deferred_transaction_fails_instead_of_waiting(self):
+        # Why core.backends.sqlite3 uses BEGIN IMMEDIATE: a deferred transaction
+        # whose snapshot went stale can't be upgraded to a writer, whatever busy_timeout says.
+        first = self.open(self.PRAGMAS)
+        first.execute(self.schema)
+        second = self.open(self.PRAGMAS)
+        insert = (
+            "INSERT INTO core_consultationrequest (full_name, mobile_number, district, pin_code, message, created_at) "
+            "VALUES ('Asha', '9876543210', 'Nadia', '741101', '', '2024-01-01')"
+        )
+        first.execute("BEGIN")
+        first.execute("SELECT COUNT(*) FROM core_consultationrequest").fetchone()
+        second.execute(insert)
+        with self.assertRaisesRegex(sqlite3.OperationalError, 'locked'):
+            first.execute(insert)
+        first.execute("ROLLBACK")
+
+    def test_django_connections_are_configured(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], settings.SQLITE_PRAGMAS['busy_timeout'])
+
+
+class LeadSearchTests(TestCase):
+    def setUp(self):
+        for name, mobile, district in [
+            ("Asha Ghosh", "9876543210", "Nadia"),
+            ("Ashok Mondal", "9876500000", "Hooghly"),
+            ("Bikash Roy", "9123456789", "Nadia"),
+        ]:
+            ConsultationRequest.objects.create(full_name=name, mobile_number=mobile, district=district, pin_code="741101")
+
+    def names(self, term):
+        return sorted(search_leads(ConsultationRequest.objects.all(), term).values_list('full_name', flat=True))
+
+    def test_normalize_mobile(self):
+        self.assertEqual(normalize_mobile("+91 98765-43210"), "9876543210")
+        self.assertEqual(normalize_mobile("09876543210"), "9876543210")
+        self.assertEqual(normalize_mobile("98765"), "98765")
+        self.assertIsNone(normalize_mobile("Asha"))
+
+    def test_mobile_prefix_and_exact(self):
+        self.assertEqual(self.names("98765"), ["Asha Ghosh", "Ashok Mondal"])
+        self.assertEqual(self.names("+91 9876543210"), ["Asha Ghosh"])
+
+    def test_mobile_search_uses_index(self):
+        qs = search_leads(ConsultationRequest.objects.all(), "98765")
+        self.assertIn('core_lead_mobile_idx', qs.explain())
+
+    def test_name_search_matches_word_prefixes(self):
+        self.assertEqual(self.names("ash"), ["Asha Ghosh", "Ashok Mondal"])
+        self.assertEqual(self.names("ash mon"), ["Ashok Mondal"])
+        self.assertEqual(self.names("\"roy"), ["Bikash Roy"])
+
+    def test_name_index_follows_updates_and_deletes(self):
+        lead = ConsultationRequest.objects.get(full_name="Bikash Roy")
+        lead.full_name = "Bikash Sen"
+        lead.save()
+        self.assertEqual(self.names("roy"), [])
+        self.assertEqual(self.names("sen"), ["Bikash Sen"])
+        lead.delete()
+        self.assertEqual(self.names("bikash"), [])
+
+    def test_admin_changelist_search(self):
+        admin_user = User.objects.create(username='admin', is_staff=True, is_superuser=True)
+        self.client.force_login(admin_user)
+        url = reverse('admin:core_consultationrequest_changelist')
+        response = self.client.get(url, {'q': 'ashok'})
+        self.assertContains(response, "Ashok Mondal")
+        self.assertNotContains(response, "Asha Ghosh")
+        response = self.client.get(url, {'district': 'Nadia'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Bikash Roy")
+
+    def test_estimated_count_skips_count_query_when_unfiltered(self):
+        paginator = EstimatedCountPaginator(ConsultationRequest.objects.order_by('-pk'), 100)
+        with self.assertNumQueries(1) as ctx:
+            self.assertGreaterEqual(paginator.count, 3)
+        self.assertNotIn('COUNT', ctx.captured_queries[0]['sql'])
+        filtered = EstimatedCountPaginator(ConsultationRequest.objects.filter(district="Nadia").order_by("-pk"), 100)
+        self.assertEqual(filtered.count, 2)
+
+
+@override_settings(LEAD_NOTIFIERS=['core.notifications.LocmemNotifier'])
+class DuplicateLeadTests(TestCase):
+    data = {'full_name': 'Asha Ghosh', 'mobile_number': '9876543210', 'district': 'Nadia', 'pin_code': '741101'}
+
+    def setUp(self):
+        ratelimit.reset()
+        dedup.reset()
+
+    def post(self, **overrides):
+        return self.client.post(reverse('core:submit_consultation'), dict(self.data, **overrides))
+
+    def test_repeat_submission_reuses_lead(self):
+        self.assertEqual(self.post().status_code, 200)
+        with self.assertNumQueries(1):  # The index hit, confirmed by primary key.
+            response = self.post(full_name='Asha G', message='Sent again')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['success'])
+        self.assertEqual(ConsultationRequest.objects.count(), 1)
+        self.assertEqual(NotificationJob.objects.count(), 1)
+
+    def test_different_pin_is_a_new_lead(self):
+        self.post()
+        self.post(pin_code='700001')
+        self.assertEqual(ConsultationRequest.objects.count(), 2)
+
+    def test_index_hit_returns_the_lead(self):
+        lead = ConsultationRequest.objects.create(**self.data)
+        remember(lead)
+        duplicate = find_duplicate(ConsultationRequest(**self.data))
+        self.assertEqual((duplicate.pk, duplicate.created_at), (lead.pk, lead.created_at))
+        self.assertEqual(duplicate.full_name, 'Asha Ghosh')  # Deferred; loaded on access.
+
+    def test_deleted_lead_is_not_a_duplicate(self):
+        self.post()
+        ConsultationRequest.objects.get().delete()
+        response = self.post()
+        self.assertTrue(response.json()['success'])
+        self.assertEqual(ConsultationRequest.objects.count(), 1)
+        self.assertEqual(NotificationJob.objects.count(), 2)  # The resubmission is notified too.
+
+    def test_falls_back_to_database_when_index_is_cold(self):
+        ConsultationRequest.objects.create(**self.data)
+        get_index()._entries.clear()
+        self.post()
+        self.assertEqual(ConsultationRequest.objects.count(), 1)
+
+    def test_leads_outside_window_are_not_duplicates(self):
+        lead = ConsultationRequest.objects.create(**self.data)
+        ConsultationRequest.objects.filter(pk=lead.pk).update(created_at=timezone.now() - timedelta(days=2))
+        get_index()._entries.clear()
+        self.post()
+        self.assertEqual(ConsultationRequest.objects.count(), 2)
+
+    @override_settings(LEAD_DEDUP_WINDOW_SECONDS=0)
+    def test_disabled(self):
+        self.post()
+        self.post()
+        self.assertEqual(ConsultationRequest.objects.count(), 2)
+
+    def test_index_is_bounded_and_expires(self):
+        index = RecentLeadIndex(maxsize=2, ttl=60)
+        index.add('a', 1)
+        index.add('b', 2)
+        index.get('a')
+        index.add('c', 3)  # evicts 'b', the least recently used
+        self.assertEqual((index.get('a'), index.get('b'), index.get('c')), (1, None, 3))
+        self.assertEqual(len(index), 2)
+        index.add('old', 4, age=61)
+        self.assertIsNone(index.get('old'))
+
+
+@override_settings(RATELIMIT_IP='3/60', RATELIMIT_MOBILE='2/3600', RATELIMIT_TRUSTED_PROXIES=1)
+class RateLimitTests(TestCase):
+    def setUp(self):
+        ratelimit.reset()
+        dedup.reset()
+        self.url = reverse('core:submit_consultation')
+
+    def post(self, mobile, ip='203.0.113.7'):
+        return self.client.post(self.url, {
+            'full_name': 'Rate Test', 'mobile_number': mobile, 'district': 'Nadia', 'pin_code': '741101',
+        }, HTTP_X_FORWARDED_FOR=ip)
+
+    def test_ip_limit_returns_429_json(self):
+        for i in range(3):
+            self.assertEqual(self.post(f'90000000{i:02d}').status_code, 200)
+        response = self.post('9000000099')
+        self.assertEqual(response.status_code, 429)
+        self.assertFalse(response.json()['success'])
+        self.assertIn('general', response.json()['errors'])
+        self.assertGreater(int(response['Retry-After']), 0)
+        # Other clients are unaffected.
+        self.assertEqual(self.post('9000000098', ip='198.51.100.1').status_code, 200)
+
+    def test_mobile_limit_applies_across_ips(self):
+        self.assertEqual(self.post('9111111111', ip='198.51.100.1').status_code, 200)
+        self.assertEqual(self.post('9111111111', ip='198.51.100.2').status_code, 200)
+        self.assertEqual(self.post('9111111111', ip='198.51.100.3').status_code, 429)
+
+    def test_spoofed_forwarded_for_entries_are_ignored(self):
+        for i in range(3):
+            self.post(f'90000000{i:02d}', ip=f'10.0.0.{i}, 203.0.113.7')
+        self.assertEqual(self.post('9000000099', ip='10.0.0.99, 203.0.113.7').status_code, 429)
+
+    def test_bucket_refills(self):
+        state, wait = ratelimit.take_token(None, 0, 2, 1 / 30)
+        state, wait = ratelimit.take_token(state, 0, 2, 1 / 30)
+        state, wait = ratelimit.take_token(state, 0, 2, 1 / 30)
+        self.assertAlmostEqual(wait, 30)
+        state, wait = ratelimit.take_token(state, 30, 2, 1 / 30)
+        self.assertEqual(wait, 0)
+
+    @override_settings(RATELIMIT_BACKEND='cache')
+    def test_cache_backend(self):
+        cache.clear()
+        for i in range(3):
+            self.post(f'90000000{i:02d}')
+        self.assertEqual(self.post('9000000099').status_code, 429)
+
+
+class CalculatorTests(TestCase):
+    def setUp(self):
+        self.url = reverse('core:calculator')
+
+    def post_json(self, payload):
+        return self.client.post(self.url, json.dumps(payload), content_type='application/json')
+
+    def test_matches_front_end_formulas(self):
+        result = calculator.as_records(calculator.calculate(3000, 300))[0]
+        self.assertEqual(result, {
+            'capacity_kw': 3, 'subsidy': 78000, 'total_cost': 195000, 'investment': 117000,
+            'yearly_savings': 36450.0, 'recovery_years': 3.2,
+        })
+        # Roof-limited, and never below 1 kW.
+        self.assertEqual(calculator.recommended_kw([10000, 500], [200, 100]).tolist(), [2, 1])
+
+    def test_rounds_half_up_like_math_round(self):
+        bill = 2.5 * DEFAULT_RULES.generation_per_kw * DEFAULT_RULES.tariff
+        self.assertEqual(calculator.recommended_kw(bill, 2000).tolist(), 3)
+
+    def test_single_get(self):
+        response = self.client.get(self.url, {'bill': 3000, 'area': 300})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['result']['capacity_kw'], 3)
+
+    def test_batch_inputs(self):
+        response = self.post_json({'inputs': [{'bill': 3000, 'area': 300}, {'bill': 1000, 'area': 1000}]})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual([r['capacity_kw'] for r in results], [3, 1])
+        self.assertEqual(results[1]['subsidy'], 30000)
+
+    def test_batch_columns(self):
+        response = self.post_json({'bill': [3000, 6000], 'area': [300, 2000]})
+        self.assertEqual([r['capacity_kw'] for r in response.json()['results']], [3, 6])
+
+    def test_invalid_inputs(self):
+        for payload in ({'bill': 'abc', 'area': 300}, {'bill': -5, 'area': 300}, {'bill': [1, 2], 'area': [1]}, {}):
+            response = self.post_json(payload)
+            self.assertEqual(response.status_code, 400, payload)
+            self.assertIn('general', response.json()['errors'])
+        response = self.client.post(self.url, 'not json', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(CALCULATOR_MAX_BATCH=2)
+    def test_batch_size_is_capped(self):
+        response = self.post_json({'bill': [1000] * 3, 'area': [300] * 3})
+        self.assertEqual(response.status_code, 400)
+
+    def test_huge_inputs_are_rejected(self):
+        response = self.client.get(self.url, {'bill': '1e300', 'area': '1e300'})
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.json()['success'])
+        self.assertIn('at most', response.json()['errors']['general'])
+        response = self.post_json({'bill': [3000, 1e300], 'area': [300, 300]})
+        self.assertEqual(response.status_code, 400)
+        with override_settings(CALCULATOR_MAX_BILL=1e9, CALCULATOR_MAX_AREA=1e9):
+            result = self.client.get(self.url, {'bill': 1e9, 'area': 1e9}).json()['result']
+        self.assertGreater(result['capacity_kw'], 0)
+        self.assertGreater(result['yearly_savings'], 0)
+
+    def test_grid_command_and_endpoint(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'grid.json'
+            with override_settings(CALCULATOR_GRID_PATH=path):
+                call_command('build_calculator_grid', stdout=StringIO())
+                grid = json.loads(path.read_text(encoding='utf-8'))
+                response = self.client.get(reverse('core:calculator_grid'))
+        self.assertEqual(response.json(), grid)
+        self.assertEqual(len(grid['kw']), 96)
+        self.assertEqual(len(grid['kw'][0]), 39)
+        # bill 3000 / area 300 -> row 25, column 4
+        kw = grid['kw'][25][4]
+        self.assertEqual(grid['by_kw'][str(kw)]['investment'], 117000)
+
+
+class TariffRuleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('core:calculator')
+        self.hills = TariffRuleSet.objects.create(
+            name='Hills', district='Darjeeling', tariff='5.00', generation_per_kw='100.0',
+            area_per_kw=100, cost_per_kw=70000,
+        )
+        SubsidySlab.objects.create(rule_set=self.hills, min_kw='1.00', amount=45000)
+        SubsidySlab.objects.create(rule_set=self.hills, min_kw='2.00', amount=90000)
+
+    def test_default_rule_set_is_seeded(self):
+        self.assertEqual(get_rule_book().default.signature, DEFAULT_RULES.signature)
+
+    def test_subsidy_interval_lookup(self):
+        self.assertEqual(DEFAULT_RULES.subsidy([0, 1, 2, 2.5, 3, 10]).tolist(), [0, 30000, 60000, 60000, 78000, 78000])
+
+    def test_compiled_rules_are_reused_without_queries(self):
+        get_rule_book()
+        with self.assertNumQueries(0):
+            book = get_rule_book()
+        self.assertIs(book.for_district(' darjeeling '), book.for_district('Darjeeling'))
+        self.assertIs(book.for_district('Nadia'), book.default)
+
+    def test_api_uses_district_rules(self):
+        response = self.client.get(self.url, {'bill': 1000, 'area': 1000, 'district': 'Darjeeling'})
+        self.assertEqual(response.json()['result']['capacity_kw'], 2)
+        self.assertEqual(response.json()['result']['subsidy'], 90000)
+
+    def test_batch_mixes_districts(self):
+        response = self.client.post(self.url, json.dumps({'inputs': [
+            {'bill': 1000, 'area': 1000, 'district': 'Darjeeling'},
+            {'bill': 1000, 'area': 1000},
+        ]}), content_type='application/json')
+        results = response.json()['results']
+        self.assertEqual([r['subsidy'] for r in results], [90000, 30000])
+
+    def test_admin_edit_recompiles(self):
+        get_rule_book()
+        slab = self.hills.subsidy_slabs.get(min_kw=2)
+        slab.amount = 100000
+        slab.save()
+        self.assertEqual(get_rule_book().for_district('Darjeeling').subsidy(2), 100000)
+        self.hills.is_active = False
+        self.hills.save()
+        self.assertIs(get_rule_book().for_district('Darjeeling'), get_rule_book().default)
+
+    def test_edit_from_another_worker_is_picked_up(self):
+        get_rule_book()
+        # A queryset update sends no signal, like an edit made by a worker with its own locmem cache.
+        TariffRuleSet.objects.filter(pk=self.hills.pk).update(cost_per_kw=80000, updated_at=timezone.now())
+        self.assertEqual(get_rule_book().for_district('Darjeeling').cost_per_kw, 70000)
+        with override_settings(RULES_RECHECK_SECONDS=0):
+            with self.assertNumQueries(3):  # The fingerprint, then rule sets and their slabs.
+                book = get_rule_book()
+            self.assertEqual(book.for_district('Darjeeling').cost_per_kw, 80000)
+            with self.assertNumQueries(1):
+                self.assertIs(get_rule_book(), book)
+
+    def test_slab_edit_touches_its_rule_set(self):
+        before = TariffRuleSet.objects.get(pk=self.hills.pk).updated_at
+        self.hills.subsidy_slabs.get(min_kw=1).delete()
+        self.assertGreater(TariffRuleSet.objects.get(pk=self.hills.pk).updated_at, before)
+
+    def test_grid_built_with_old_rules_is_recomputed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'grid.json'
+            with override_settings(CALCULATOR_GRID_PATH=path):
+                call_command('build_calculator_grid', stdout=StringIO())
+                TariffRuleSet.objects.filter(district='').update(cost_per_kw=60000)
+                cache.clear()
+                grid = calculator.load_grid()
+        self.assertEqual(grid['by_kw']['1']['total_cost'], 60000)
+
+
+class LeadExportTests(TestCase):
+    def setUp(self):
+        self.url = reverse('core:export_leads')
+        self.leads = [
+            ConsultationRequest.objects.create(
+                full_name=name, mobile_number=f"90000000{i:02d}", district=district, pin_code="741101", message=message,
+            )
+            for i, (name, district, message) in enumerate([
+                ("Asha Ghosh", "Nadia", "Roof is 400 sq ft, \"south\" facing"),
+                ("Bikash Roy", "Hooghly", ""),
+                ("Chitra Das", "Nadia", "Line one\nline two"),
+            ])
+        ]
+        ConsultationRequest.objects.filter(pk=self.leads[0].pk).update(created_at=timezone.now() - timedelta(days=10))
+        self.client.force_login(User.objects.create(username='staff', is_staff=True))
+
+    def content(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_staff_only(self):
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+        self.client.force_login(User.objects.create(username='visitor'))
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    def test_csv_stream(self):
+        response = self.client.get(self.url)
+        self.assertTrue(response.streaming)
+        self.assertIn('attachment', response['Content-Disposition'])
+        rows = list(csv.DictReader(StringIO(self.content(response))))
+        self.assertEqual([row['full_name'] for row in rows], ["Asha Ghosh", "Bikash Roy", "Chitra Das"])
+        self.assertEqual(rows[0]['message'], 'Roof is 400 sq ft, "south" facing')
+        self.assertEqual(rows[2]['message'], "Line one\nline two")
+
+    def test_csv_neutralizes_formulas(self):
+        ConsultationRequest.objects.all().delete()
+        ConsultationRequest.objects.create(
+            full_name='=HYPERLINK("http://x.test","click")', mobile_number="9000000099", district="@SUM(A1)",
+            pin_code="741101", message="-2+3",
+        )
+        row = next(csv.DictReader(StringIO(self.content(self.client.get(self.url)))))
+        self.assertEqual(row['full_name'], '\'=HYPERLINK("http://x.test","click")')
+        self.assertEqual((row['district'], row['message'], row['mobile_number']), ("'@SUM(A1)", "'-2+3", "9000000099"))
+
+    def test_jsonl_with_filters(self):
+        response = self.client.get(self.url, {
+            'format': 'jsonl', 'district': 'Nadia', 'since': (timezone.now() - timedelta(days=1)).date().isoformat(),
+        })
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        records = [json.loads(line) for line in self.content(response).splitlines()]
+        self.assertEqual([r['full_name'] for r in records], ["Chitra Das"])
+        self.assertEqual(records[0]['id'], self.leads[2].pk)
+
+    def test_until_is_inclusive_and_after_id_resumes(self):
+        until = (timezone.now() - timedelta(days=10)).date().isoformat()
+        records = self.content(self.client.get(self.url, {'format': 'jsonl', 'until': until})).splitlines()
+        self.assertEqual(len(records), 1)
+        records = self.content(self.client.get(self.url, {'format': 'jsonl', 'after_id': self.leads[0].pk})).splitlines()
+        self.assertEqual([json.loads(r)['id'] for r in records], [self.leads[1].pk, self.leads[2].pk])
+
+    def test_bad_parameters(self):
+        self.assertEqual(self.client.get(self.url, {'format': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'since': 'yesterday'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'after_id': 'x'}).status_code, 400)
+
+    def test_command_writes_and_resumes_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'leads.csv'
+            call_command('export_leads', '--output', path, '--district', 'Nadia', stderr=StringIO())
+            call_command('export_leads', '--output', path, '--after-id', self.leads[0].pk, stderr=StringIO())
+            rows = list(csv.DictReader(StringIO(path.read_text(encoding='utf-8'))))
+        self.assertEqual([row['full_name'] for row in rows], ["Asha Ghosh", "Chitra Das", "Bikash Roy", "Chitra Das"])
+
+    def test_command_stdout_jsonl(self):
+        out = StringIO()
+        call_command('export_leads', '--format', 'jsonl', stdout=out)
+        self.assertEqual(len(out.getvalue().splitlines()), 3)
+
+
+class SyncFAQsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+
+    def sync(self, data, suffix='.json', *args):
+        path = self.dir / f'faqs{suffix}'
+        if suffix == '.json':
+            path.write_text(json.dumps(data), encoding='utf-8')
+        else:
+            path.write_text(data, encoding='utf-8')
+        out = StringIO()
+        call_command('sync_faqs', str(path), *args, stdout=out)
+        return out.getvalue()
+
+    def test_bundled_file_loads_and_is_idempotent(self):
+        call_command('sync_faqs', stdout=StringIO())
+        self.assertEqual(FAQ.objects.filter(is_active=True).count(), 13)
+        ids = list(FAQ.objects.values_list('id', flat=True))
+        out = StringIO()
+        with self.assertNumQueries(1):
+            call_command('sync_faqs', stdout=out)
+        self.assertIn('13 unchanged', out.getvalue())
+        self.assertEqual(list(FAQ.objects.values_list('id', flat=True)), ids)
+
+    def test_diff_upsert_keeps_ids_and_deactivates_removed(self):
+        kept = GeneralFAQ.objects.create(question="Kept?", answer="Old answer")
+        removed = SubsidyFAQ.objects.create(question="Removed?", answer="Gone")
+        output = self.sync({
+            'general': [{'question': 'Kept?', 'answer': 'New answer'}],
+            'technical': [{'question': 'New?', 'answer': 'Added'}],
+        })
+        self.assertIn('1 created, 1 updated, 1 deactivated, 0 unchanged', output)
+        kept.refresh_from_db()
+        removed.refresh_from_db()
+        self.assertEqual((kept.answer, kept.is_active), ("New answer", True))
+        self.assertFalse(removed.is_active)
+        self.assertTrue(FAQ.objects.filter(category=FAQ.TECHNICAL, question='New?').exists())
+
+    def test_reactivates_questions_added_back(self):
+        faq = GeneralFAQ.objects.create(question="Back?", answer="Same", is_active=False)
+        self.sync({'general': [{'question': 'Back?', 'answer': 'Same'}]})
+        faq.refresh_from_db()
+        self.assertTrue(faq.is_active)
+
+    def test_matches_questions_with_surrounding_whitespace(self):
+        padded = GeneralFAQ.objects.create(question="  Padded?\n", answer="Same")
+        output = self.sync({'general': [{'question': 'Padded?', 'answer': 'Same'}]})
+        self.assertIn('0 created, 1 updated, 0 deactivated', output)
+        padded.refresh_from_db()
+        self.assertEqual((padded.question, padded.is_active), ("Padded?", True))
+        self.assertEqual(FAQ.objects.count(), 1)
+
+    def test_rows_differing_only_in_whitespace_are_merged(self):
+        first = GeneralFAQ.objects.create(question="Twice?", answer="A")
+        second = GeneralFAQ.objects.create(question="Twice? ", answer="A")
+        self.sync({'general': [{'question': 'Twice?', 'answer': 'A'}]})
+        self.assertEqual(list(FAQ.objects.filter(is_active=True).values_list('id', flat=True)), [first.pk])
+        self.assertEqual(FAQ.objects.count(), 2)
+        self.assertFalse(FAQ.objects.get(pk=second.pk).is_active)
+
+    def test_changes_invalidate_page_cache(self):
+        self.client.get(reverse('core:home'))
+        self.sync({'general': [{'question': 'Fresh?', 'answer': 'Yes'}]})
+        self.assertContains(self.client.get(reverse('core:home')), "Fresh?")
+
+    def test_dry_run_writes_nothing(self):
+        output = self.sync({'general': [{'question': 'Q?', 'answer': 'A'}]}, '.json', '--dry-run')
+        self.assertIn('Dry run: 1 created', output)
+        self.assertFalse(FAQ.objects.exists())
+
+    def test_yaml_file(self):
+        self.sync("installation:\n  - question: How long?\n    answer: A day.\n", '.yaml')
+        self.assertEqual(FAQ.objects.get().category, FAQ.INSTALLATION)
+
+    def test_invalid_file(self):
+        with self.assertRaisesMessage(CommandError, "Unknown category"):
+            self.sync({'pricing': [{'question': 'Q?', 'answer': 'A'}]})
+        with self.assertRaisesMessage(CommandError, "question and an answer"):
+            self.sync({'general': [{'question': 'Q?'}]})
+
+
+class FAQSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        faq_index.documents.clear()
+        faq_index.state = None
+        self.url = reverse('core:faq_search')
+        self.subsidy = SubsidyFAQ.objects.create(
+            question="How much subsidy can I get?", answer="Up to ₹78,000 for systems of 3 kW and above.")
+        self.net = TechnicalFAQ.objects.create(
+            question="What is net metering?", answer="Surplus units are exported to the grid and adjusted in your bill.")
+        self.general = GeneralFAQ.objects.create(
+            question="Who can apply?", answer="Any household with a roof. Subsidies are paid after inspection.")
+
+    def ids(self, q, **params):
+        response = self.client.get(self.url, dict(params, q=q))
+        self.assertEqual(response.status_code, 200)
+        return [result['id'] for result in response.json()['results']]
+
+    def test_tokenize_stems_and_handles_indic_scripts(self):
+        self.assertEqual(tokenize("Subsidies"), tokenize("subsidy"))
+        self.assertEqual(tokenize("installing panels"), tokenize("install panel"))
+        self.assertEqual(tokenize("सब्सिडी कितनी मिलेगी। धन्यवाद"), ['सब्सिड', 'कित', 'मिलेग', 'धन्यवाद'])
+        self.assertEqual(tokenize("সোলার প্যানেলের দাম"), ['সোলার', 'প্যানেল', 'দাম'])
+        self.assertEqual(tokenize("সোলারের"), tokenize("সোলার"))
+
+    def test_question_matches_rank_first(self):
+        self.assertEqual(self.ids("subsidy"), [self.subsidy.pk, self.general.pk])
+
+    def test_last_word_matches_as_prefix(self):
+        self.assertEqual(self.ids("net met"), [self.net.pk])
+
+    def test_category_filter_and_validation(self):
+        self.assertEqual(self.ids("subsidy", category=FAQ.GENERAL), [self.general.pk])
+        self.assertEqual(self.client.get(self.url, {'q': 'x', 'category': 'pricing'}).status_code, 400)
+        self.assertEqual(self.ids(""), [])
+
+    def test_repeat_searches_skip_the_database(self):
+        self.ids("subsidy")
+        with self.assertNumQueries(0):
+            self.ids("grid")
+
+    def test_saves_update_index_incrementally(self):
+        self.ids("subsidy")
+        with self.captureOnCommitCallbacks(execute=True):
+            InstallationFAQ.objects.create(question="How long does installation take?", answer="About a week.")
+            self.net.is_active = False
+            self.net.save()
+        # Only the FAQ state aggregate runs; the index isn't rebuilt.
+        with self.assertNumQueries(1):
+            self.assertEqual(len(self.ids("installation")), 1)
+        self.assertEqual(self.ids("metering"), [])
+
+    def test_bulk_changes_trigger_rebuild(self):
+        self.ids("subsidy")
+        FAQ.objects.filter(pk=self.subsidy.pk).update(question="Subsidy amount?", updated_at=timezone.now())
+        cache.clear()
+        self.assertEqual(self.ids("amount"), [self.subsidy.pk])
+
+
+class FAQPageTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.general = [GeneralFAQ.objects.create(question=f"General {i}?", answer="A") for i in range(25)]
+        GeneralFAQ.objects.create(question="Hidden?", answer="A", is_active=False)
+        self.subsidy = SubsidyFAQ.objects.create(question="Lazy subsidy question?", answer="Fetched on click")
+
+    def page(self, category, **params):
+        response = self.client.get(reverse('core:faq_page', args=[category]), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_keyset_pages_cover_every_active_faq_once(self):
+        seen, after = [], None
+        while True:
+            data = self.page('general', **({'after': after} if after else {}))
+            seen += [faq['id'] for faq in data['results']]
+            after = data['next_after']
+            if after is None:
+                break
+        self.assertEqual(seen, [faq.pk for faq in self.general])
+        self.assertEqual(self.page('general', limit=5, after=self.general[19].pk)['next_after'], None)
+
+    def test_page_query_uses_category_index(self):
+        plan = FAQ.objects.filter(category=FAQ.GENERAL, is_active=True, id__gt=5).order_by('id').explain()
+        self.assertIn('core_faq_category_active_idx', plan)
+
+    def test_cached_and_conditional(self):
+        url = reverse('core:faq_page', args=['subsidy'])
+        first = self.client.get(url)
+        self.assertIn('max-age=300', first['Cache-Control'])
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).content, first.content)
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+        self.subsidy.answer = "Changed"
+        self.subsidy.save()
+        self.assertEqual(self.page('subsidy')['results'][0]['answer'], "Changed")
+
+    def test_only_real_pages_are_cached(self):
+        url = reverse('core:faq_page', args=['general'])
+
+        def cached(params):
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            return get_cached_page('faqs:' + response['ETag'].strip('"')) is not None
+
+        first = self.page('general')
+        self.assertTrue(cached({'after': first['next_after']}))
+        self.assertFalse(cached({'after': 10 ** 9}))
+        self.assertFalse(cached({'after': first['next_after'], 'limit': 7}))
+        # Non-positive cursors are the first page, not new keys.
+        response = self.client.get(url, {'after': -12345})
+        self.assertEqual(response.json(), first)
+        self.assertEqual(response['ETag'], self.client.get(url)['ETag'])
+
+    def test_bad_requests(self):
+        self.assertEqual(self.client.get(reverse('core:faq_page', args=['pricing'])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('core:faq_page', args=['general']), {'after': 'x'}).status_code, 400)
+
+    @override_settings(FAQ_LAZY_LOAD=True, FAQ_PAGE_SIZE=10)
+    def test_lazy_home_page_size_is_constant(self):
+        response = self.client.get(reverse('core:home'))
+        self.assertContains(response, 'data-faq-lazy')
+        self.assertContains(response, f'data-faq-next-general="{self.general[9].pk}"')
+        self.assertContains(response, 'id="faq-item-template"')
+        self.assertContains(response, "General 9?")
+        self.assertNotContains(response, "General 10?")
+        self.assertNotContains(response, "Lazy subsidy question?")
+
+        SubsidyFAQ.objects.bulk_create([SubsidyFAQ(category=FAQ.SUBSIDY, question=f"Extra {i}?", answer="A" * 200) for i in range(100)])
+        cache.clear()
+        self.assertEqual(len(self.client.get(reverse('core:home')).content), len(response.content))
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.registry.reset()
+        GeneralFAQ.objects.create(question="Metered?", answer="Yes")
+
+    def test_records_home_request(self):
+        response = self.client.get(reverse('core:home'))
+        home = metrics.registry.views['core:home']
+        self.assertEqual(home.count, 1)
+        self.assertGreater(home.queries, 0)
+        self.assertGreater(home.query_seconds, 0)
+        self.assertGreater(home.template_seconds, 0)
+        self.assertEqual(home.response_bytes, len(response.content))
+        self.assertEqual(metrics.registry.requests[('core:home', 'GET', 200)], 1)
+
+        # Served from the page cache: no queries, no rendering.
+        self.client.get(reverse('core:home'))
+        self.assertEqual(home.count, 2)
+        self.assertEqual(metrics.registry.requests[('core:home', 'GET', 200)], 2)
+
+    def test_counts_async_orm_queries(self):
+        with override_settings(ASYNC_VIEWS=True):
+            reload_urls()
+            self.addCleanup(reload_urls)
+            response = async_to_sync(AsyncClient().get)(reverse('core:home'))
+        self.assertContains(response, "Metered?")
+        home = metrics.registry.views['core:home']
+        self.assertGreater(home.queries, 0)
+        self.assertGreater(home.template_seconds, 0)
+
+    def test_unresolved_requests(self):
+        self.client.get('/no-such-page/')
+        self.assertIn(metrics.UNRESOLVED, metrics.registry.views)
+
+    def test_prometheus_text(self):
+        stats = metrics.RequestStats()
+        for seconds in (0.003, 0.2, 30):
+            metrics.registry.record('core:home', 'GET', 200, seconds, stats, 100)
+        text = metrics.registry.render()
+        self.assertIn('# TYPE ayush_solar_request_duration_seconds histogram', text)
+        self.assertIn('ayush_solar_request_duration_seconds_bucket{view="core:home",le="0.005"} 1', text)
+        self.assertIn('ayush_solar_request_duration_seconds_bucket{view="core:home",le="0.25"} 2', text)
+        self.assertIn('ayush_solar_request_duration_seconds_bucket{view="core:home",le="+Inf"} 3', text)
+        self.assertIn('ayush_solar_request_duration_seconds_count{view="core:home"} 3', text)
+        self.assertIn('ayush_solar_requests_total{view="core:home",method="GET",status="200"} 3', text)
+        self.assertIn('ayush_solar_response_bytes_total{view="core:home"} 300', text)
+
+    def test_endpoint_is_staff_only(self):
+        url = reverse('core:metrics')
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.client.force_login(User.objects.create(username='ops', is_staff=True))
+        self.client.get(reverse('core:home'))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        self.assertIn('ayush_solar_db_queries_total{view="core:home"}', response.content.decode())
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_disabled(self):
+        client = Client()
+        client.get(reverse('core:home'))
+        self.assertEqual(metrics.registry.views, {})
+        client.force_login(User.objects.create(username='ops', is_staff=True))
+        self.assertEqual(client.get(reverse('core:metrics')).status_code, 404)
+
+
+@override_settings(RATELIMIT_IP='', RATELIMIT_MOBILE='')
+class BenchmarkTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_summary_statistics(self):
+        self.assertEqual(benchmark.percentile([], 50), 0.0)
+        values = [i / 1000 for i in range(1, 101)]
+        summary = benchmark.summarize(values, errors=2, wall_seconds=2.0)
+        self.assertEqual(summary['requests'], 100)
+        self.assertEqual(summary['rps'], 50.0)
+        self.assertEqual((summary['p50_ms'], summary['p95_ms'], summary['p99_ms']), (50.0, 95.0, 99.0))
+        self.assertEqual(summary['max_ms'], 100.0)
+        self.assertEqual(summary['errors'], 2)
+
+    def test_compare_reports_regressions_as_positive(self):
+        before = {'home': {'rps': 100.0, 'p50_ms': 2.0, 'p95_ms': 4.0, 'p99_ms': 8.0}}
+        after = {'home': {'rps': 80.0, 'p50_ms': 1.0, 'p95_ms': 5.0, 'p99_ms': 8.0}, 'new': {'rps': 1.0}}
+        self.assertEqual(benchmark.compare(after, before), {
+            'home': {'rps': 20.0, 'p50_ms': -50.0, 'p95_ms': 25.0, 'p99_ms': 0.0},
+        })
+
+    def test_seed_and_run_in_process(self):
+        benchmark.seed(faqs=8, leads=25, batch_size=10)
+        self.assertEqual(FAQ.objects.filter(category=FAQ.SUBSIDY).count(), 2)
+        self.assertEqual(ConsultationRequest.objects.count(), 25)
+
+        home = benchmark.run_endpoint(benchmark.ClientSession, 'home', requests=5, warmup=1)
+        self.assertEqual((home['requests'], home['errors']), (5, 0))
+        submit = benchmark.run_endpoint(benchmark.ClientSession, 'submit_consultation', requests=5)
+        self.assertEqual(submit['errors'], 0)
+        self.assertEqual(ConsultationRequest.objects.count(), 30)
+
+        with self.assertRaises(ValueError):
+            benchmark.run_endpoint(benchmark.ClientSession, 'admin', requests=1)
+
+
+@override_settings(RATELIMIT_IP='', RATELIMIT_MOBILE='', ALLOWED_HOSTS=['127.0.0.1'])
+class BenchmarkServerTests(TransactionTestCase):
+    def test_requests_through_local_server(self):
+        # The in-memory test database locks whole tables, so only reads run concurrently here.
+        with benchmark.local_server() as (host, port):
+            make_session = lambda: benchmark.HTTPSession(host, port)
+            home = benchmark.run_endpoint(make_session, 'home', requests=12, concurrency=3)
+            submit = benchmark.run_endpoint(make_session, 'submit_consultation', requests=4)
+        self.assertEqual((home['requests'], home['errors']), (12, 0))
+        self.assertEqual((submit['requests'], submit['errors']), (4, 0))  # Posted with the CSRF cookie and token.
+        self.assertEqual(ConsultationRequest.objects.count(), 4)
+
+
+def reload_urls():
+    """Re-read ASYNC_VIEWS, which core/urls.py checks at import time."""
+    importlib.reload(importlib.import_module('core.urls'))
+    importlib.reload(importlib.import_module(settings.ROOT_URLCONF))
+    clear_url_caches()
+
+
+class AsyncViewTestMixin:
+    def setUp(self):
+        cache.clear()
+        ratelimit.reset()
+        dedup.reset()
+        self.enterContext(override_settings(ASYNC_VIEWS=True))
+        reload_urls()
+        self.addCleanup(reload_urls)
+        self.client = AsyncClient()
+
+    def form_data(self, **overrides):
+        data = {'full_name': 'Async Lead', 'mobile_number': '9123456700', 'district': 'Nadia', 'pin_code': '741101'}
+        return dict(data, **overrides)
+
+
+class AsyncViewTests(AsyncViewTestMixin, TestCase):
+    def test_urls_use_async_views(self):
+        self.assertIs(resolve(reverse('core:home')).func, views.async_home)
+        self.assertTrue(asyncio.iscoroutinefunction(resolve(reverse('core:submit_consultation')).func))
+
+    async def test_home_matches_sync_view(self):
+        await GeneralFAQ.objects.acreate(question="Async question?", answer="Async answer")
+        response = await self.client.get(reverse('core:home'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Async question?")
+        self.assertIn('csrftoken', response.cookies)
+
+        await cache.aclear()
+        sync_response = await sync_to_async(Client().get)(reverse('core:home'))
+        self.assertEqual(response.content, sync_response.content)
+        self.assertEqual(response['ETag'], sync_response['ETag'])
+        self.assertEqual(response['Last-Modified'], sync_response['Last-Modified'])
+
+    async def test_home_conditional_get(self):
+        first = await self.client.get(reverse('core:home'))
+        again = await self.client.get(reverse('core:home'), headers={'If-None-Match': first['ETag']})
+        self.assertEqual(again.status_code, 304)
+        await GeneralFAQ.objects.acreate(question="Changed?", answer="Yes")
+        await sync_to_async(invalidate_faq_caches)()
+        changed = await self.client.get(reverse('core:home'), headers={'If-None-Match': first['ETag']})
+        self.assertEqual(changed.status_code, 200)
+        self.assertContains(changed, "Changed?")
+
+    @override_settings(FAQ_LAZY_LOAD=True, FAQ_PAGE_SIZE=1)
+    async def test_home_lazy_faqs(self):
+        await GeneralFAQ.objects.acreate(question="First?", answer="A")
+        await GeneralFAQ.objects.acreate(question="Second?", answer="B")
+        response = await self.client.get(reverse('core:home'))
+        self.assertContains(response, "First?")
+        self.assertNotContains(response, "Second?")
+
+    async def test_submit_saves_lead_and_notifications(self):
+        response = await self.client.post(reverse('core:submit_consultation'), self.form_data())
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['success'])
+        lead = await ConsultationRequest.objects.aget(mobile_number='9123456700')
+        self.assertEqual(await NotificationJob.objects.filter(payload__id=lead.pk).acount(), len(settings.LEAD_NOTIFIERS))
+
+        # A repeat returns the same lead without a second row.
+        await self.client.post(reverse('core:submit_consultation'), self.form_data())
+        self.assertEqual(await ConsultationRequest.objects.acount(), 1)
+
+    async def test_submit_validation_errors(self):
+        response = await self.client.post(reverse('core:submit_consultation'), self.form_data(mobile_number='123'))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('mobile_number', response.json()['errors'])
+        self.assertEqual(await ConsultationRequest.objects.acount(), 0)
+
+    @override_settings(RATELIMIT_IP='1/600')
+    async def test_submit_rate_limited(self):
+        await self.client.post(reverse('core:submit_consultation'), self.form_data())
+        response = await self.client.post(reverse('core:submit_consultation'), self.form_data(mobile_number='9123456701'))
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    async def test_submit_requires_csrf_token(self):
+        client = AsyncClient(enforce_csrf_checks=True)
+        response = await client.post(reverse('core:submit_consultation'), self.form_data())
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(LEAD_INGEST_MODE='batched', LEAD_BATCH_MAX_SIZE=5, LEAD_BATCH_MAX_WAIT_MS=200)
+class AsyncBatchedIngestTests(AsyncViewTestMixin, TransactionTestCase):
+    async def test_concurrent_posts_share_a_batch(self):
+        flushed = get_batcher().batches_flushed
+        responses = await asyncio.gather(*[
+            self.client.post(reverse('core:submit_consultation'), self.form_data(mobile_number=f'91234567{i:02d}'))
+            for i in range(5)
+        ])
+        self.assertEqual([r.status_code for r in responses], [200] * 5)
+        self.assertEqual(await ConsultationRequest.objects.acount(), 5)
+        self.assertEqual(get_batcher().batches_flushed, flushed + 1)
+
+
+@override_settings(TEMPLATE_FRAGMENT_CACHE=True)
+class FragmentCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        GeneralFAQ.objects.create(question="Cached question?", answer="Cached answer")
+
+    def test_output_matches_uncached_render(self):
+        cached = self.client.get(reverse('core:home')).content
+        cache.clear()
+        with override_settings(TEMPLATE_FRAGMENT_CACHE=False):
+            self.assertEqual(self.client.get(reverse('core:home')).content, cached)
+
+    def test_static_partials_rendered_once_per_release(self):
+        set_cached_page(fragment_key('partials/_about.html'), '<p>cached about</p>')
+        set_cached_page(fragment_key('partials/_hero.html'), '<p>cached hero</p>')
+        response = self.client.get(reverse('core:home'))
+        self.assertContains(response, '<p>cached about</p>')
+        self.assertContains(response, '<p>cached hero</p>')
+
+        with override_settings(RELEASE_VERSION='next'):
+            self.assertNotContains(self.client.get(reverse('core:home')), '<p>cached about</p>')
+
+    def test_faq_fragment_follows_faq_edits(self):
+        set_cached_page(fragment_key('partials/_about.html'), '<p>cached about</p>')
+        self.assertContains(self.client.get(reverse('core:home')), "Cached question?")
+        faq = GeneralFAQ.objects.get()
+        faq.question = "Edited question?"
+        faq.save()
+        response = self.client.get(reverse('core:home'))
+        self.assertContains(response, "Edited question?")
+        self.assertNotContains(response, "Cached question?")
+        self.assertContains(response, '<p>cached about</p>')
+
+    @override_settings(TEMPLATE_FRAGMENT_CACHE=False)
+    def test_disabled(self):
+        set_cached_page(fragment_key('partials/_about.html'), '<p>cached about</p>')
+        self.assertNotContains(self.client.get(reverse('core:home')), '<p>cached about</p>')
+
+    def test_uses_cached_template_loader(self):
+        loaders = Template('').engine.template_loaders
+        self.assertEqual([type(loader).__name__ for loader in loaders], ['Loader'])
+        self.assertEqual(loaders[0].__module__, 'django.template.loaders.cached')
+
+
+class MinifyHTMLTests(SimpleTestCase):
+    def test_collapses_whitespace_and_drops_comments(self):
+        html = """
+            <div class="flex
+                        items-center">  <!-- Hero -->
+                <span>a</span>   <span>b</span>&nbsp;\xa0 <!--[if IE]><p>old</p><![endif]-->
+            </div>
+        """
+        self.assertEqual(
+            compression.minify_html(html),
+            '<div class="flex\n                        items-center">\n<span>a</span> <span>b</span>&nbsp;\xa0 <!--[if IE]><p>old</p><![endif]-->\n</div>',
+        )
+
+    def test_leaves_attribute_values_alone(self):
+        html = '<input  type="text" value="Net  metering   cost?" data-x=\'a  >  b\'>\n   <b>Net  metering</b>'
+        self.assertEqual(
+            compression.minify_html(html),
+            '<input  type="text" value="Net  metering   cost?" data-x=\'a  >  b\'>\n<b>Net metering</b>',
+        )
+
+    def test_preserves_whitespace_sensitive_elements(self):
+        html = "<pre>  a\n   b</pre>\n\n  <SCRIPT>if (a  &&  b) {\n  x();\n}</SCRIPT> <style>a  { }</style><textarea>\n  hi</textarea>"
+        self.assertEqual(
+            compression.minify_html(html),
+            "<pre>  a\n   b</pre>\n<SCRIPT>if (a  &&  b) {\n  x();\n}</SCRIPT> <style>a  { }</style><textarea>\n  hi</textarea>",
+        )
+
+    def test_choose_encoding(self):
+        self.assertIsNone(compression.choose_encoding(''))
+        self.assertIsNone(compression.choose_encoding('identity'))
+        self.assertEqual(compression.choose_encoding('gzip, deflate'), 'gzip')
+        self.assertEqual(compression.choose_encoding('gzip;q=0.5, br;q=0.4'), 'gzip')
+        self.assertIsNone(compression.choose_encoding('gzip;q=0, br;q=0'))
+
+    @skipUnless(compression.brotli, "brotli is not installed")
+    def test_prefers_brotli(self):
+        self.assertEqual(compression.choose_encoding('gzip, deflate, br'), 'br')
+        self.assertEqual(compression.choose_encoding('*'), 'br')
+        self.assertEqual(compression.choose_encoding('br;q=0, *'), 'gzip')
+
+
+class CompressionMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        GeneralFAQ.objects.create(question="Compressed question?", answer="Compressed answer")
+
+    def test_html_is_minified(self):
+        with self.settings(HTML_MINIFY=False):
+            raw = self.client.get(reverse('core:home')).content.decode()
+        response = self.client.get(reverse('core:home'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertNotIn(b'<!-- Hero Section -->', response.content)
+        self.assertEqual(response.content.decode(), compression.minify_html(raw))
+        self.assertLess(len(response.content), len(raw) * 0.8)
+        self.assertContains(response, "Compressed question?")
+        self.assertEqual(response['Vary'].count('Accept-Encoding'), 1)
+
+    def test_gzip_variant_is_cached_under_the_etag(self):
+        plain = self.client.get(reverse('core:home')).content
+        response = self.client.get(reverse('core:home'), HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain)
+        self.assertLess(len(response.content), len(plain) / 4)
+        self.assertTrue(response['ETag'].startswith('W/"'))
+
+        etag = response['ETag'][2:]
+        self.assertIsNotNone(get_cached_page(variant_key(reverse('core:home'), etag, 'gzip')))
+        with self.assertNumQueries(0):
+            again = self.client.get(reverse('core:home'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(gzip.decompress(again.content), plain)
+
+        not_modified = self.client.get(reverse('core:home'), HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+        faq = GeneralFAQ.objects.get()
+        faq.question = "Recompressed question?"
+        faq.save()
+        edited = self.client.get(reverse('core:home'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertIn(b"Recompressed question?", gzip.decompress(edited.content))
+
+    def test_query_strings_are_not_cached(self):
+        response = self.client.get(reverse('core:home'), {'utm_source': 'x'}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        etag = response['ETag'][2:]
+        self.assertIsNone(get_cached_page(variant_key(reverse('core:home'), etag, 'gzip')))
+        self.assertIsNone(get_cached_page(variant_key('/?utm_source=x', etag, 'gzip')))
+
+    @skipUnless(compression.brotli, "brotli is not installed")
+    def test_brotli(self):
+        plain = self.client.get(reverse('core:home')).content
+        response = self.client.get(reverse('core:home'), HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(compression.brotli.decompress(response.content), plain)
+
+    def test_streaming_export_is_compressed(self):
+        ConsultationRequest.objects.create(full_name="Zip", mobile_number="9000000000", district="Nadia", pin_code="741101")
+        self.client.force_login(User.objects.create(username='staff', is_staff=True))
+        response = self.client.get(reverse('core:export_leads'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        rows = gzip.decompress(b''.join(response.streaming_content)).decode().splitlines()
+        self.assertEqual(len(rows), 2)
+        self.assertIn('Zip', rows[1])
+
+    def test_small_and_binary_responses_untouched(self):
+        response = self.client.get(reverse('core:faq_search'), {'q': 'nothing'}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        response = self.client.get(reverse('core:csrf'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_admin_html_is_not_minified(self):
+        faq = GeneralFAQ.objects.create(question="Net  metering   cost?", answer="Depends")
+        self.client.force_login(User.objects.create(username='admin', is_staff=True, is_superuser=True))
+        response = self.client.get(reverse('admin:core_generalfaq_change', args=[faq.pk]))
+        self.assertContains(response, "Net  metering   cost?")
+
+    @override_settings(HTML_MINIFY=False, COMPRESS_RESPONSES=False)
+    def test_disabled(self):
+        response = self.client.get(reverse('core:home'), HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn(b'<!-- Hero Section -->', response.content)
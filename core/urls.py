@@ -1,9 +1,24 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'core'
 
+# Native async versions for ASGI deployments (uvicorn); see ASYNC_VIEWS.
+if settings.ASYNC_VIEWS:
+    home, submit_consultation = views.async_home, views.async_submit_consultation
+else:
+    home, submit_consultation = views.home, views.submit_consultation
+
 urlpatterns = [
-    path('', views.home, name='home'),
-    path('submit-consultation/', views.submit_consultation, name='submit_consultation'),
+    path('', home, name='home'),
+    path('submit-consultation/', submit_consultation, name='submit_consultation'),
+    path('csrf/', views.csrf, name='csrf'),
+    path('sections/<slug:name>/', views.section, name='section'),
+    path('api/calculator/', views.calculator_api, name='calculator'),
+    path('api/calculator/grid/', views.calculator_grid, name='calculator_grid'),
+    path('leads/export/', views.export_leads, name='export_leads'),
+    path('faqs/search/', views.faq_search, name='faq_search'),
+    path('faqs/<slug:category>/', views.faq_page, name='faq_page'),
+    path('metrics/', views.metrics_view, name='metrics'),
 ]
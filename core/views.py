@@ -1,28 +1,262 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.shortcuts import render
-from django.http import JsonResponse
-from django.views.decorators.http import require_POST
-from django.views.decorators.csrf import csrf_protect
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_http_methods, require_POST
+from django.views.decorators.csrf import csrf_exempt, csrf_protect, ensure_csrf_cookie
+from functools import wraps
 import json
 
 
-from .models import GeneralFAQ, SubsidyFAQ, TechnicalFAQ, InstallationFAQ
+from .cache import (
+    HOME_PAGE_KEY, aget_cached_page, aget_faq_state, aset_cached_page, get_cached_page, get_faq_state, section_key,
+    set_cached_page,
+)
+from .models import FAQ
+from .sections import DEFERRED_SECTIONS
 from .forms import ConsultationForm
+from . import calculator, metrics, ratelimit
+from .leads import EXPORT_FORMATS, export_queryset, stream_leads
+from .search import search_faqs
+from .ingest import asave_lead, save_lead
 
-def home(request):
-    """Render the main landing page with dynamic data."""
-    context = {
-        'general_faqs': GeneralFAQ.objects.filter(is_active=True).values('question', 'answer'),
-        'subsidy_faqs': SubsidyFAQ.objects.filter(is_active=True).values('question', 'answer'),
-        'technical_faqs': TechnicalFAQ.objects.filter(is_active=True).values('question', 'answer'),
-        'installation_faqs': InstallationFAQ.objects.filter(is_active=True).values('question', 'answer'),
+def get_home_context():
+    """Template context for index.html."""
+    # Read the version before the rows: an edit in between then only leaves a fragment under a retired key.
+    version = faq_fragment_version(get_faq_state())
+    if settings.FAQ_LAZY_LOAD:
+        context = lazy_home_context(*FAQ.objects.active_page(FAQ.GENERAL, limit=settings.FAQ_PAGE_SIZE))
+    else:
+        context = home_context(FAQ.objects.active_by_category())
+    return dict(context, faq_version=version)
+
+
+async def aget_home_context():
+    version = faq_fragment_version(await aget_faq_state())
+    if settings.FAQ_LAZY_LOAD:
+        context = lazy_home_context(*await FAQ.objects.aactive_page(FAQ.GENERAL, limit=settings.FAQ_PAGE_SIZE))
+    else:
+        context = home_context(await FAQ.objects.aactive_by_category())
+    return dict(context, faq_version=version)
+
+
+def faq_fragment_version(state):
+    """Cache version for the rendered _faqs.html partial."""
+    version = faq_state_etag(state)
+    if settings.FAQ_LAZY_LOAD:
+        version += f'-lazy{settings.FAQ_PAGE_SIZE}'
+    return version
+
+
+def lazy_home_context(general, general_next):
+    return {
+        'faq_lazy': True,
+        'general_faqs': general,
+        'general_faqs_next': general_next,
+        'subsidy_faqs': [],
+        'technical_faqs': [],
+        'installation_faqs': [],
     }
-    return render(request, 'index.html', context)
+
+
+def home_context(faqs):
+    return {
+        'general_faqs': faqs[FAQ.GENERAL],
+        'subsidy_faqs': faqs[FAQ.SUBSIDY],
+        'technical_faqs': faqs[FAQ.TECHNICAL],
+        'installation_faqs': faqs[FAQ.INSTALLATION],
+    }
+
+
+# Templates only change on deploy, and a deploy restarts the process.
+PROCESS_STARTED_AT = timezone.now().replace(microsecond=0)
+
+
+def faq_state_etag(state):
+    """Identify the landing page content by release and FAQ state."""
+    last_modified = state['last_modified'].timestamp() if state['last_modified'] else 0
+    return f"{settings.RELEASE_VERSION}-{state['count']}-{last_modified}"
+
+
+def page_etag(state):
+    """ETag for pages built from the FAQ state: faq_state_etag() plus the process start.
+
+    Browsers send If-None-Match ahead of If-Modified-Since, so without the
+    process token a deploy that didn't bump RELEASE_VERSION would keep
+    answering 304 for the old HTML. Workers started in different seconds
+    give different ETags, which only costs the odd 200 instead of a 304.
+    """
+    return f"{faq_state_etag(state)}-{int(PROCESS_STARTED_AT.timestamp())}"
+
+
+def faq_state_last_modified(state):
+    """Latest FAQ edit, or the process start if the templates are newer."""
+    if state['last_modified'] is None:
+        return PROCESS_STARTED_AT
+    return max(state['last_modified'], PROCESS_STARTED_AT)
+
+
+def home_etag(request):
+    return page_etag(get_faq_state())
+
+
+def home_last_modified(request):
+    return faq_state_last_modified(get_faq_state())
+
+
+@ensure_csrf_cookie
+@condition(etag_func=home_etag, last_modified_func=home_last_modified)
+def home(request):
+    """Render the main landing page with dynamic data.
+
+    The page carries no per-user data (the consultation form reads its CSRF
+    token from the cookie), so the rendered HTML is cached and shared by
+    every visitor until an FAQ changes.
+    """
+    content = get_cached_page(HOME_PAGE_KEY)
+    if content is not None:
+        return HttpResponse(content)
+
+    response = render(request, 'index.html', get_home_context())
+    set_cached_page(HOME_PAGE_KEY, response.content.decode(response.charset))
+    return response
+
+
+def async_condition(etag_func, last_modified_func):
+    """condition() for async views whose validator functions are coroutines.
+
+    Django's condition() calls its functions synchronously, which can't
+    query the database from inside the event loop.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            etag = quote_etag(await etag_func(request, *args, **kwargs))
+            last_modified = int((await last_modified_func(request, *args, **kwargs)).timestamp())
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            if request.method in ('GET', 'HEAD'):
+                response.headers.setdefault('ETag', etag)
+                if not response.has_header('Last-Modified'):
+                    response.headers['Last-Modified'] = http_date(last_modified)
+            return response
+        return inner
+    return decorator
+
+
+async def async_home_etag(request):
+    return page_etag(await aget_faq_state())
+
+
+async def async_home_last_modified(request):
+    return faq_state_last_modified(await aget_faq_state())
+
+
+@ensure_csrf_cookie
+@async_condition(async_home_etag, async_home_last_modified)
+async def async_home(request):
+    """home() as a native async view, used when ASYNC_VIEWS is on.
+
+    FAQs are read with the async ORM and the cache with aget/aset. Rendering
+    is plain CPU work on already-fetched rows, so it runs in the event loop.
+    """
+    content = await aget_cached_page(HOME_PAGE_KEY)
+    if content is None:
+        content = render_to_string('index.html', await aget_home_context(), request=request)
+        await aset_cached_page(HOME_PAGE_KEY, content)
+    return HttpResponse(content)
+
+
+def section_etag(request, name):
+    """Fragments change exactly when the landing page does."""
+    return home_etag(request)
+
+
+@cache_control(public=True, max_age=300)
+@condition(etag_func=section_etag)
+def section(request, name):
+    """Render one below-the-fold partial as an HTML fragment for DEFER_BELOW_FOLD mode."""
+    if name not in DEFERRED_SECTIONS:
+        raise Http404("Unknown section")
+    key = section_key(name)
+    content = get_cached_page(key)
+    if content is None:
+        template_name, _ = DEFERRED_SECTIONS[name]
+        context = get_home_context() if name == 'faqs' else {}
+        content = render_to_string(template_name, context)
+        set_cached_page(key, content)
+    return HttpResponse(content)
+
+
+FAQ_PAGE_MAX_SIZE = 50
+
+
+def faq_page_params(request):
+    """(after, limit) from the query string; raises ValueError."""
+    after = request.GET.get('after')
+    after = int(after) if after else None
+    if after is not None and after < 1:
+        after = None  # Ids start at 1, so this is the first page.
+    return after, faq_page_limit(int(request.GET.get('limit', settings.FAQ_PAGE_SIZE)))
+
+
+def faq_page_limit(limit):
+    return min(max(limit, 1), FAQ_PAGE_MAX_SIZE)
+
+
+def faq_page_etag(request, category):
+    try:
+        after, limit = faq_page_params(request)
+    except ValueError:
+        return None
+    return f"{home_etag(request)}-{category}-{after}-{limit}"
+
+
+@cache_control(public=True, max_age=300)
+@condition(etag_func=faq_page_etag)
+def faq_page(request, category):
+    """One page of a category's active FAQs as JSON, for the lazily loaded FAQ tabs."""
+    if category not in dict(FAQ.CATEGORY_CHOICES):
+        raise Http404("Unknown category")
+    try:
+        after, limit = faq_page_params(request)
+    except ValueError:
+        return JsonResponse({'success': False, 'errors': {'general': "'after' and 'limit' must be numbers."}}, status=400)
+
+    # The FAQ state is part of the key, so any FAQ edit retires every cached page.
+    # Only pages scripts.js asks for are cached: the default size, with no cursor
+    # or one that has rows after it (at most one entry per FAQ id). Arbitrary
+    # limits or cursors would let any client fill the shared cache.
+    key = f"faqs:{faq_page_etag(request, category)}"
+    cacheable = limit == faq_page_limit(settings.FAQ_PAGE_SIZE)
+    content = get_cached_page(key) if cacheable else None
+    if content is None:
+        results, next_after = FAQ.objects.active_page(category, after, limit)
+        content = json.dumps({'success': True, 'category': category, 'results': results, 'next_after': next_after})
+        if cacheable and (results or after is None):
+            set_cached_page(key, content)
+    return HttpResponse(content, content_type='application/json')
+
+
+@ensure_csrf_cookie
+def csrf(request):
+    """Issue the CSRF cookie for pages served from the static export."""
+    return HttpResponse(status=204)
 
 
 @require_POST
 @csrf_protect
 def submit_consultation(request):
     """Handle form submission via AJAX."""
+    retry_after = ratelimit.hit('ip', ratelimit.client_ip(request), settings.RATELIMIT_IP)
+    if retry_after:
+        return ratelimit.too_many_requests(retry_after)
     try:
         # Use the form for validation and saving
         form = ConsultationForm(request.POST)
@@ -31,15 +265,14 @@ def submit_consultation(request):
             # Convert form errors to the format expected by the frontend
             errors = {field: error[0] for field, error in form.errors.items()}
             return JsonResponse({'success': False, 'errors': errors}, status=400)
+
+        retry_after = ratelimit.hit('mobile', form.cleaned_data['mobile_number'], settings.RATELIMIT_MOBILE)
+        if retry_after:
+            return ratelimit.too_many_requests(retry_after)
         
-        form.save()
-        
-        # Here you can add logic to:
-        # 1. Send email notification
-        # 2. Send SMS confirmation
-        # 3. Integrate with CRM
-        
-        # For now, just return success
+        # Email/SMS/CRM delivery happens in `manage.py process_notifications`
+        save_lead(form)
+
         return JsonResponse({
             'success': True,
             'message': 'Thank you! Our team will contact you shortly.'
@@ -50,3 +283,125 @@ def submit_consultation(request):
             'success': False,
             'errors': {'general': 'An error occurred. Please try again.'}
         }, status=500)
+
+
+@require_POST
+@csrf_protect
+async def async_submit_consultation(request):
+    """submit_consultation() as a native async view, used when ASYNC_VIEWS is on."""
+    retry_after = await ratelimit.ahit('ip', ratelimit.client_ip(request), settings.RATELIMIT_IP)
+    if retry_after:
+        return ratelimit.too_many_requests(retry_after)
+    try:
+        form = ConsultationForm(request.POST)
+        if not form.is_valid():
+            errors = {field: error[0] for field, error in form.errors.items()}
+            return JsonResponse({'success': False, 'errors': errors}, status=400)
+
+        retry_after = await ratelimit.ahit('mobile', form.cleaned_data['mobile_number'], settings.RATELIMIT_MOBILE)
+        if retry_after:
+            return ratelimit.too_many_requests(retry_after)
+
+        await asave_lead(form)
+        return JsonResponse({
+            'success': True,
+            'message': 'Thank you! Our team will contact you shortly.'
+        })
+    except Exception:
+        return JsonResponse({
+            'success': False,
+            'errors': {'general': 'An error occurred. Please try again.'}
+        }, status=500)
+
+
+@csrf_exempt  # Pure computation with no side effects; callable from scripts and other sites.
+@require_http_methods(['GET', 'POST'])
+def calculator_api(request):
+    """Solar estimate for one (bill, area) pair, or a batch posted as JSON."""
+    if request.method == 'GET':
+        data = request.GET.dict()
+    else:
+        try:
+            data = json.loads(request.body)
+        except ValueError:
+            return JsonResponse({'success': False, 'errors': {'general': 'Invalid JSON.'}}, status=400)
+    try:
+        bills, areas, districts, is_batch = calculator.parse_inputs(
+            data, settings.CALCULATOR_MAX_BATCH, settings.CALCULATOR_MAX_BILL, settings.CALCULATOR_MAX_AREA,
+        )
+    except ValueError as e:
+        return JsonResponse({'success': False, 'errors': {'general': str(e)}}, status=400)
+
+    records = calculator.as_records(calculator.calculate_by_district(bills, areas, districts))
+    if is_batch:
+        return JsonResponse({'success': True, 'results': records})
+    return JsonResponse({'success': True, 'result': records[0]})
+
+
+@cache_control(public=True, max_age=3600)
+def calculator_grid(request):
+    """Every calculator slider position, precomputed for the front end."""
+    return JsonResponse(calculator.load_grid())
+
+
+EXPORT_CONTENT_TYPES = {'csv': 'text/csv; charset=utf-8', 'jsonl': 'application/x-ndjson; charset=utf-8'}
+
+
+@staff_member_required
+@require_http_methods(['GET'])
+def export_leads(request):
+    """Stream consultation leads as CSV or JSON Lines.
+
+    Query parameters: format, since/until (YYYY-MM-DD, inclusive), district,
+    and after_id to resume from the last id received.
+    """
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return JsonResponse({'success': False, 'errors': {'format': 'Use csv or jsonl.'}}, status=400)
+    try:
+        queryset = export_queryset(
+            since=request.GET.get('since'), until=request.GET.get('until'),
+            district=request.GET.get('district'), after_id=request.GET.get('after_id'),
+        )
+    except ValueError as e:
+        return JsonResponse({'success': False, 'errors': {'general': str(e)}}, status=400)
+
+    response = StreamingHttpResponse(stream_leads(queryset, fmt), content_type=EXPORT_CONTENT_TYPES[fmt])
+    filename = f"leads-{timezone.now():%Y%m%d-%H%M%S}.{fmt}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Cache-Control'] = 'private, no-store'
+    return response
+
+
+FAQ_SEARCH_MAX_RESULTS = 50
+
+
+@require_http_methods(['GET'])
+def faq_search(request):
+    """Ranked FAQ matches for ?q=, optionally within one ?category=, from the in-memory index."""
+    query = request.GET.get('q', '').strip()[:200]
+    category = request.GET.get('category') or None
+    if category is not None and category not in dict(FAQ.CATEGORY_CHOICES):
+        return JsonResponse({'success': False, 'errors': {'category': 'Unknown category.'}}, status=400)
+    try:
+        limit = min(max(int(request.GET.get('limit', 10)), 1), FAQ_SEARCH_MAX_RESULTS)
+    except ValueError:
+        return JsonResponse({'success': False, 'errors': {'limit': 'Must be a number.'}}, status=400)
+
+    results = search_faqs(query, category=category, limit=limit)
+    return JsonResponse({
+        'success': True,
+        'query': query,
+        'results': [dict(faq, score=round(score, 4)) for score, faq in results],
+    })
+
+
+@staff_member_required
+@require_http_methods(['GET'])
+def metrics_view(request):
+    """Request metrics for this process in the Prometheus text format."""
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    response = HttpResponse(metrics.registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+    response['Cache-Control'] = 'private, no-store'
+    return response
@@ -25,8 +25,15 @@ if (document.readyState === 'loading') {
     initScrollAnimations();
 }
 
+// Elements matching selector inside root, including root itself
+function selectWithin(root, selector) {
+    const matches = Array.from(root.querySelectorAll(selector));
+    if (root.matches && root.matches(selector)) matches.unshift(root);
+    return matches;
+}
+
 // Scroll Animations Observer
-function initScrollAnimations() {
+function initScrollAnimations(root = document) {
     const observerOptions = {
         root: null,
         rootMargin: '0px',
@@ -42,7 +49,7 @@ function initScrollAnimations() {
         });
     }, observerOptions);
 
-    const animatedElements = document.querySelectorAll('.animate-on-scroll');
+    const animatedElements = selectWithin(root, '.animate-on-scroll');
     animatedElements.forEach(el => observer.observe(el));
 }
 
@@ -68,10 +75,49 @@ function initSlider(sliderId, tooltipId, formatFn) {
     update(); // Init state
 }
 
+// Every slider position, precomputed by core/calculator.py; null until loaded
+let calculatorGrid = null;
+
+function loadCalculatorGrid() {
+    if (!document.getElementById('bill-slider')) return;
+    fetch('/api/calculator/grid/')
+        .then(response => (response.ok ? response.json() : null))
+        .then(grid => { calculatorGrid = grid; })
+        .catch(() => {}); // calculateSolar() falls back to computing locally
+}
+
+function lookupCalculatorGrid(bill, area) {
+    const grid = calculatorGrid;
+    if (!grid) return null;
+    const row = (bill - grid.bill.min) / grid.bill.step;
+    const col = (area - grid.area.min) / grid.area.step;
+    if (!Number.isInteger(row) || !Number.isInteger(col) || !grid.kw[row] || grid.kw[row][col] === undefined) {
+        return null;
+    }
+    return grid.by_kw[grid.kw[row][col]];
+}
+
+function renderCalculatorResult(recommendedKw, subsidy, investment, recovery) {
+    document.getElementById('output-capacity').textContent = `${recommendedKw} kW`;
+    document.getElementById('output-subsidy').textContent = `₹${subsidy.toLocaleString()}`;
+    document.getElementById('output-investment').textContent = `₹${investment.toLocaleString()}`;
+    document.getElementById('output-recovery').textContent = recovery;
+}
+
 function calculateSolar() {
     const bill = Number(document.getElementById('bill-slider').value);
     const area = Number(document.getElementById('area-slider').value);
 
+    const precomputed = lookupCalculatorGrid(bill, area);
+    if (precomputed) {
+        renderCalculatorResult(
+            precomputed.capacity_kw, precomputed.subsidy, precomputed.investment,
+            precomputed.recovery_years.toFixed(1),
+        );
+        return;
+    }
+
+    // Same formulas as core/calculator.py
     // Constants
     const TARIFF = 7.5;
     const GEN_PER_KW = 135;
@@ -112,10 +158,7 @@ function calculateSolar() {
     const recovery = (investment / yearlySavings).toFixed(1);
 
     // Update UI
-    document.getElementById('output-capacity').textContent = `${recommendedKw} kW`;
-    document.getElementById('output-subsidy').textContent = `₹${subsidy.toLocaleString()}`;
-    document.getElementById('output-investment').textContent = `₹${investment.toLocaleString()}`;
-    document.getElementById('output-recovery').textContent = recovery;
+    renderCalculatorResult(recommendedKw, subsidy, investment, recovery);
 }
 
 function filterFaq(category, btn) {
@@ -127,15 +170,102 @@ function filterFaq(category, btn) {
     });
     btn.classList.remove('bg-gray-100', 'text-gray-600', 'hover:bg-gray-200', 'dark:bg-slate-800', 'dark:text-gray-400', 'dark:hover:bg-slate-700');
     btn.classList.add('bg-[#6DBE45]', 'text-white', 'shadow-lg', 'shadow-green-200/50');
+    activeFaqCategory = category;
     // Handle FAQ Item Visibility
+    showFaqCategory(category);
+    if (isFaqLazy() && !faqPageState(category).loaded) {
+        loadFaqPage(category).then(() => showFaqCategory(activeFaqCategory));
+    }
+}
+
+function showFaqCategory(category) {
     const items = document.querySelectorAll('#faq-grid > div');
     items.forEach(item => {
-        if (item.dataset.category === category) {
+        if (category === null || item.dataset.category === category) {
             item.classList.remove('hidden');
         } else {
             item.classList.add('hidden');
         }
     });
+    const loadMore = document.getElementById('faq-load-more');
+    if (loadMore) {
+        const hasMore = category !== null && faqPageState(category).next !== null;
+        loadMore.classList.toggle('hidden', !hasMore);
+    }
+}
+
+// Lazy FAQ mode (FAQ_LAZY_LOAD): only the first page of General FAQs is in the
+// HTML; other categories and pages are fetched from /faqs/<category>/ on demand.
+let activeFaqCategory = 'general';
+const faqPages = {};
+
+function isFaqLazy() {
+    const grid = document.getElementById('faq-grid');
+    return Boolean(grid && grid.hasAttribute('data-faq-lazy'));
+}
+
+function faqPageState(category) {
+    if (!faqPages[category]) {
+        const grid = document.getElementById('faq-grid');
+        const next = category === 'general' && grid ? grid.dataset.faqNextGeneral : undefined;
+        faqPages[category] = next === undefined
+            ? { loaded: !isFaqLazy(), next: null, loading: null }
+            : { loaded: true, next: next || null, loading: null };
+    }
+    return faqPages[category];
+}
+
+function appendFaqItems(category, faqs) {
+    const grid = document.getElementById('faq-grid');
+    const template = document.getElementById('faq-item-template');
+    if (!grid || !template) return;
+    faqs.forEach(faq => {
+        if (grid.querySelector(`[data-faq-id="${faq.id}"]`)) return;
+        const item = template.content.firstElementChild.cloneNode(true);
+        item.dataset.category = category;
+        item.dataset.faqId = faq.id;
+        item.querySelector('.faq-question').textContent = faq.question;
+        item.querySelector('.faq-answer p').textContent = faq.answer;
+        grid.appendChild(item);
+    });
+}
+
+function loadFaqPage(category) {
+    const state = faqPageState(category);
+    if (state.loading) return state.loading;
+    const query = state.next ? `?after=${encodeURIComponent(state.next)}` : '';
+    state.loading = fetch(`/faqs/${category}/${query}`)
+        .then(response => {
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+            return response.json();
+        })
+        .then(data => {
+            appendFaqItems(category, data.results);
+            state.loaded = true;
+            state.next = data.next_after;
+        })
+        .catch(error => console.error('Failed to load FAQs:', error))
+        .finally(() => { state.loading = null; });
+    return state.loading;
+}
+
+function loadMoreFaqs() {
+    const category = activeFaqCategory;
+    if (category) loadFaqPage(category).then(() => showFaqCategory(activeFaqCategory));
+}
+
+async function loadAllFaqs() {
+    const categories = Array.from(document.querySelectorAll('#faq-tabs button'))
+        .map(button => (button.getAttribute('onclick').match(/filterFaq\('(\w+)'/) || [])[1])
+        .filter(Boolean);
+    await Promise.all(categories.map(async category => {
+        const state = faqPageState(category);
+        while (!state.loaded || state.next !== null) {
+            const before = state.next;
+            await loadFaqPage(category);
+            if (!state.loaded || state.next === before) break; // Request failed
+        }
+    }));
 }
 
 function toggleFaq(button) {
@@ -186,11 +316,10 @@ function toggleFaq(button) {
     }
 }
 
-function showAllFaqs() {
-    const items = document.querySelectorAll('#faq-grid > div');
-    items.forEach(item => {
-        item.classList.remove('hidden');
-    });
+async function showAllFaqs() {
+    activeFaqCategory = null;
+    if (isFaqLazy()) await loadAllFaqs();
+    showFaqCategory(null);
     // Reset tabs to inactive style
     const buttons = document.querySelectorAll('#faq-tabs button');
     buttons.forEach(b => {
@@ -199,9 +328,52 @@ function showAllFaqs() {
     });
 }
 
+// FAQ search via /faqs/search/; delegated because the FAQ section may be loaded later
+let faqSearchTimer = null;
+document.addEventListener('input', (e) => {
+    if (e.target.id !== 'faq-search') return;
+    clearTimeout(faqSearchTimer);
+    faqSearchTimer = setTimeout(() => searchFaqs(e.target.value.trim()), 200);
+});
+
+async function searchFaqs(query) {
+    const items = Array.from(document.querySelectorAll('#faq-grid > div'));
+    const empty = document.getElementById('faq-search-empty');
+    if (!query) {
+        items.forEach(item => { item.style.order = ''; });
+        if (empty) empty.classList.add('hidden');
+        const activeTab = document.querySelector('#faq-tabs button.text-white') || document.querySelector('#faq-tabs button');
+        if (activeTab) activeTab.click();
+        return;
+    }
+    try {
+        const response = await fetch(`/faqs/search/?q=${encodeURIComponent(query)}`);
+        const data = await response.json();
+        if (document.getElementById('faq-search').value.trim() !== query) return; // A newer search is pending
+        const rank = new Map(data.results.map((result, i) => [String(result.id), i]));
+        // In lazy mode a match may belong to a category that hasn't been loaded yet.
+        data.results.forEach(result => appendFaqItems(result.category, [result]));
+        Array.from(document.querySelectorAll('#faq-grid > div')).forEach(item => {
+            const position = rank.get(item.dataset.faqId);
+            item.classList.toggle('hidden', position === undefined);
+            item.style.order = position === undefined ? '' : position;
+        });
+        if (empty) empty.classList.toggle('hidden', rank.size > 0);
+    } catch (error) {
+        console.error('FAQ search failed:', error);
+    }
+}
+
 // Smooth scroll with offset
 function smoothScrollTo(targetId, event) {
     if (event) event.preventDefault();
+    // Load every deferred section first so nothing above the target shifts after scrolling
+    if (document.querySelector('[data-deferred-section]')) {
+        loadAllDeferredSections().then(() => {
+            if (!document.querySelector('[data-deferred-section]')) smoothScrollTo(targetId, null);
+        });
+        return;
+    }
     const target = document.querySelector(targetId);
     if (!target) return;
     const headerOffset = 80;
@@ -213,8 +385,8 @@ function smoothScrollTo(targetId, event) {
     });
 }
 
-function highlightActiveSection() {
-    const sections = document.querySelectorAll('section[id]');
+function highlightActiveSection(root = document) {
+    const sections = selectWithin(root, 'section[id]');
     const navLinks = document.querySelectorAll('.nav-link[href^="#"], .mobile-nav-link[href^="#"]');
     const observer = new IntersectionObserver((entries) => {
         entries.forEach(entry => {
@@ -234,6 +406,53 @@ function highlightActiveSection() {
     });
 }
 
+// Below-the-fold sections rendered as placeholders (DEFER_BELOW_FOLD mode)
+function loadDeferredSection(placeholder) {
+    if (!placeholder.deferredLoad) {
+        placeholder.deferredLoad = fetch(placeholder.dataset.deferredSection)
+            .then(response => {
+                if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                return response.text();
+            })
+            .then(html => {
+                const fragment = document.createRange().createContextualFragment(html);
+                const nodes = Array.from(fragment.children);
+                placeholder.replaceWith(fragment);
+                nodes.forEach(node => {
+                    initScrollAnimations(node);
+                    highlightActiveSection(node);
+                });
+            })
+            .catch(error => {
+                console.error('Failed to load section:', error);
+                placeholder.removeAttribute('data-deferred-section');
+            });
+    }
+    return placeholder.deferredLoad;
+}
+
+function loadAllDeferredSections() {
+    const placeholders = document.querySelectorAll('[data-deferred-section]');
+    return Promise.all(Array.from(placeholders).map(loadDeferredSection));
+}
+
+function initDeferredSections() {
+    const placeholders = document.querySelectorAll('[data-deferred-section]');
+    if (!placeholders.length) return;
+
+    const observer = new IntersectionObserver((entries, observer) => {
+        entries.forEach(entry => {
+            if (entry.isIntersecting) {
+                observer.unobserve(entry.target);
+                loadDeferredSection(entry.target);
+            }
+        });
+    }, {
+        rootMargin: '800px 0px' // Start fetching well before the section is visible
+    });
+    placeholders.forEach(placeholder => observer.observe(placeholder));
+}
+
 function initHeroCarousel() {
     const slides = document.querySelectorAll('.hero-slide');
     if (slides.length < 2) return;
@@ -265,6 +484,7 @@ function toggleMobileMenu(isOpen) {
 document.addEventListener('DOMContentLoaded', () => {
     initSlider('bill-slider', 'bill-tooltip', (val) => '₹' + parseInt(val).toLocaleString());
     initSlider('area-slider', 'area-tooltip', (val) => val + ' sq ft');
+    loadCalculatorGrid();
 
     // Auto-bind all anchor links for smooth scroll
     document.querySelectorAll('a[href^="#"]').forEach(anchor => {
@@ -284,6 +504,7 @@ document.addEventListener('DOMContentLoaded', () => {
     });
 
     highlightActiveSection();
+    initDeferredSections();
     initHeroCarousel();
 
     // Persistent Scroll Indicator Logic
@@ -330,9 +551,14 @@ document.addEventListener('DOMContentLoaded', () => {
             e.preventDefault();
 
             const formData = new FormData(consultationForm);
-            const csrftoken = getCookie('csrftoken');
 
             try {
+                // Pages served from the static export never set the cookie themselves
+                if (!getCookie('csrftoken')) {
+                    await fetch('/csrf/', { credentials: 'same-origin' });
+                }
+                const csrftoken = getCookie('csrftoken');
+
                 const response = await fetch('/submit-consultation/', {
                     method: 'POST',
                     body: formData,
@@ -357,7 +583,11 @@ document.addEventListener('DOMContentLoaded', () => {
                 } else {
                     // Handle validation errors
                     console.error('Form submission errors:', data.errors || 'Unknown error');
-                    alert('There was an error submitting your request. Please check your information and try again.');
+                    if (response.status === 429 && data.errors && data.errors.general) {
+                        alert(data.errors.general);
+                    } else {
+                        alert('There was an error submitting your request. Please check your information and try again.');
+                    }
                 }
             } catch (error) {
                 console.error('Form submission error:', error);
@@ -0,0 +1,33 @@
+/** Used by `python manage.py build_css`. Keep in sync with the inline config in templates/base.html. */
+module.exports = {
+    content: [
+        './templates/**/*.html',
+        './static/js/scripts.js',
+    ],
+    darkMode: "class",
+    theme: {
+        extend: {
+            colors: {
+                primary: "#F7931E", // Solar Orange
+                "brand-green": "#6DBE45", // Leaf Green
+                "brand-blue": "#1F4FA3", // Deep Blue
+                "background-light": "#ffffff",
+                "background-dark": "#0f172a", // Slate 900
+                "surface-light": "#f3f4f6", // Gray 100
+                "surface-dark": "#1e293b", // Slate 800
+                "card-dark": "#1f2937", // Gray 800
+            },
+            fontFamily: {
+                display: ["Inter", "sans-serif"],
+                body: ["Inter", "sans-serif"],
+            },
+            borderRadius: {
+                DEFAULT: "0.5rem",
+            },
+        },
+    },
+    plugins: [
+        require('@tailwindcss/forms'),
+        require('@tailwindcss/container-queries'),
+    ],
+};